@@ -1,18 +1,29 @@
+import os
+import sys
+
 import gymnasium as gym
-from pong_env import PongEnv
 
-env = PongEnv()
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai.pong_env import PongEnv
+
+def demo():
+    env = PongEnv()
+
+    obs = env.reset()
 
-obs = env.reset()
+    print("Initial state:", obs)
 
-print("Initial state:", obs)
+    for i in range(100):
 
-for i in range(100):
+        action = env.action_space.sample()
 
-    action = env.action_space.sample()
+        obs, reward, done, info = env.step(action)
 
-    obs, reward, done, info = env.step(action)
+        print(f"Step {i}: Action {action}, Reward {reward}, Scores {obs['scores']}")
 
-    print(f"Step {i}: Action {action}, Reward {reward}, Scores {obs['scores']}")
+    env.close()
 
-env.close()
\ No newline at end of file
+if __name__ == '__main__':
+    demo()
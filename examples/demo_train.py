@@ -1,9 +1,15 @@
+import os
+import sys
 import yaml
 import torch
 import numpy as np
 import random
-from pong_env import PongEnv
-from agent import DQNAgent
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai.pong_env import PongEnv
+from ai.agent import DQNAgent
 
 def demo():
     with open('config/train_config.yaml') as f:
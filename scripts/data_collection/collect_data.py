@@ -10,13 +10,22 @@ import numpy as np
 import os
 import time
 import socket
+import sys
 from collections import deque
 
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai import protocol as wire
+
 class HumanDataCollector:
-    def __init__(self, host='localhost', port=5000):
+    def __init__(self, host='localhost', port=5000, protocol='json'):
         self.host = host
         self.port = port
+        self.protocol = protocol
         self.sock = None
+        self.reader = None
+        self.binary = False
         self.data = []
         self.last_scores = {'player': 0, 'bot': 0}
         
@@ -25,6 +34,10 @@ class HumanDataCollector:
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.connect((self.host, self.port))
+            self.reader = wire.SocketReader(self.sock)
+            self.binary = self.protocol == 'binary' and wire.negotiate_binary(self.sock, self.reader)
+            if self.protocol == 'json':
+                self.sock.sendall(wire.encode_hello())
             print(f"Connected to game server at {self.host}:{self.port}")
             return True
         except Exception as e:
@@ -41,13 +54,12 @@ class HumanDataCollector:
     def get_state(self):
         """Get current game state"""
         try:
-            buffer = ""
-            while not buffer.endswith('\n'):
-                data = self.sock.recv(4096).decode('utf-8')
-                if not data:
-                    raise ConnectionError("Connection lost")
-                buffer += data
-            msg = json.loads(buffer.strip())
+            if self.binary:
+                while True:
+                    msg_type, payload = self.reader.read_frame()
+                    if msg_type == wire.STATE:
+                        return wire.decode_state(payload)
+            msg = json.loads(bytes(self.reader.read_line()))
             return msg['data']
         except Exception as e:
             print(f"Error receiving state: {e}")
@@ -56,6 +68,9 @@ class HumanDataCollector:
     def send_action(self, action):
         """Send action to game server"""
         try:
+            if self.binary:
+                self.sock.sendall(wire.encode_action(action))
+                return True
             action_msg = {
                 'type': 'action',
                 'data': {'action': action, 'timestamp': time.time()}
@@ -198,10 +213,12 @@ def main():
     parser.add_argument('--port', type=int, default=5000, help='Game server port')
     parser.add_argument('--max-samples', type=int, default=10000, help='Maximum samples to collect')
     parser.add_argument('--output', type=str, default='../../data/bc_data.npz', help='Output file path')
+    parser.add_argument('--protocol', type=str, choices=['json', 'binary'], default='json',
+                        help='Wire protocol to request from the game server')
     
     args = parser.parse_args()
     
-    collector = HumanDataCollector(args.host, args.port)
+    collector = HumanDataCollector(args.host, args.port, args.protocol)
     
     if not collector.connect():
         return 1
@@ -5,20 +5,22 @@ Tests agent performance against the game environment.
 """
 
 import argparse
-import torch
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 import sys
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
-from ai.pong_env import PongEnv
-from ai.model import DQN
+# torch, matplotlib and the environment are imported where used so --help stays fast
 
 class AgentEvaluator:
-    def __init__(self, model_path, device=None):
+    def __init__(self, model_path, device=None, int8=False, calibration_data=None):
+        self.int8 = int8  # Evaluate the int8 quantized model (CPU only)
+        self.calibration_data = calibration_data
+        import torch
+        if int8:
+            device = torch.device("cpu")
         self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model_path = model_path
         self.model = None
@@ -29,26 +31,28 @@ class AgentEvaluator:
             raise FileNotFoundError(f"Model file not found: {self.model_path}")
         
         print(f"Loading model from {self.model_path}")
+        from ai.model import DQN, load_policy_state_dict
         self.model = DQN().to(self.device)
         
-        # Try to load as state dict first, then as full checkpoint
+        # Accepts a bare state dict, a full checkpoint or raw weights
         try:
-            checkpoint = torch.load(self.model_path, map_location=self.device)
-            if 'policy_net' in checkpoint:
-                # Full checkpoint
-                self.model.load_state_dict(checkpoint['policy_net'])
-            else:
-                # Just state dict
-                self.model.load_state_dict(checkpoint)
+            self.model.load_state_dict(load_policy_state_dict(self.model_path, map_location=self.device))
         except Exception as e:
             print(f"Error loading model: {e}")
             raise
         
         self.model.eval()
+        
+        if self.int8:
+            from ai.quantize import quantize_dqn, load_calibration_states
+            states = load_calibration_states(self.calibration_data) if self.calibration_data else None
+            self.model = quantize_dqn(self.model, states)
+            print("Model quantized to int8")
         print("Model loaded successfully")
     
     def evaluate_episode(self, env, max_steps=1000, render=False):
         """Evaluate agent for one episode"""
+        import torch
         obs = env.reset()
         state = env._flatten_obs(obs)
         
@@ -75,14 +79,15 @@ class AgentEvaluator:
         
         return total_reward, steps
     
-    def evaluate(self, num_episodes=100, max_steps=1000, render=False):
+    def evaluate(self, num_episodes=100, max_steps=1000, render=False, env_mode='socket'):
         """Evaluate agent over multiple episodes"""
         if self.model is None:
             self.load_model()
         
         print(f"Evaluating agent over {num_episodes} episodes...")
         
-        env = PongEnv()
+        from ai.pong_env import PongEnv
+        env = PongEnv(mode=env_mode)
         rewards = []
         steps = []
         
@@ -126,6 +131,10 @@ class AgentEvaluator:
         """Plot evaluation results"""
         if results is None:
             return
+        from utils.plotting import load_pyplot
+        plt = load_pyplot()
+        if plt is None:
+            return
         
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
         
@@ -167,23 +176,33 @@ def main():
                        help='Render episodes (print step-by-step)')
     parser.add_argument('--plot', type=str, default='../../results/evaluation_results.png',
                        help='Path to save evaluation plot')
+    parser.add_argument('--no-plot', action='store_true',
+                       help='Skip plotting (headless runs); results are still saved')
+    parser.add_argument('--env', type=str, choices=['socket', 'sim'], default='socket',
+                       help='Environment: the game server (socket) or the in-process simulator (sim)')
+    parser.add_argument('--int8', action='store_true',
+                       help='Evaluate the int8 quantized model on CPU')
+    parser.add_argument('--calibration-data', type=str, default=None,
+                       help='bc_data.npz-style dataset used to calibrate int8 quantization')
     
     args = parser.parse_args()
     
     # Initialize evaluator
-    evaluator = AgentEvaluator(args.model)
+    evaluator = AgentEvaluator(args.model, int8=args.int8, calibration_data=args.calibration_data)
     
     try:
         # Evaluate agent
         results = evaluator.evaluate(
             num_episodes=args.episodes,
             max_steps=args.max_steps,
-            render=args.render
+            render=args.render,
+            env_mode=args.env
         )
         
         if results:
             # Plot results
-            evaluator.plot_results(results, args.plot)
+            if not args.no_plot:
+                evaluator.plot_results(results, args.plot)
             
             # Save results
             results_path = args.plot.replace('.png', '_data.npz')
@@ -2,164 +2,489 @@
 """
 Load testing script for the inference server.
 Tests server performance under various loads.
+
+Every request's latency is recorded individually in a fixed-bucket
+histogram. The sustained test is open-loop: requests go out on a fixed
+arrival schedule whether or not earlier ones were answered, and latency is
+measured from each request's scheduled send time. A server that stalls
+therefore shows up in the tail instead of quietly lowering the offered load
+(coordinated omission).
+
+Requests either open a new connection each, or share long-lived connections
+(--persistent) with up to --pipeline requests in flight per connection. The
+games test simulates game clients the way AIClient.cpp drives the server:
+one persistent connection per game and a state every frame (60 Hz), sent
+without waiting for the previous action. An action that takes longer than a
+frame arrives late for the game.
+
+The saturate test ramps the offered open-loop rate until a latency SLO
+(e.g. p99 < 5 ms) or the error budget is violated and reports the knee: the
+highest throughput that still met both.
 """
 
 import argparse
-import socket
+import asyncio
+import collections
 import json
+import os
+import socket
+import sys
 import time
-import threading
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai.metrics import Histogram, FINE_LATENCY_BOUNDS
+from ai import protocol as wire
+
+QUANTILES = (('p50', 0.50), ('p90', 0.90), ('p99', 0.99), ('p99.9', 0.999))
+# Offered load must be met to within this fraction for a step to pass
+THROUGHPUT_TOLERANCE = 0.95
+
+class LoadStats:
+    """Per-request outcomes of one test: latency histogram, errors, throughput"""
+
+    def __init__(self, target_rps=None, deadline=None):
+        self.latency = Histogram(FINE_LATENCY_BOUNDS)
+        self.errors = {}  # Server error message or client exception name -> count
+        self.target_rps = target_rps
+        self.deadline = deadline  # Answers slower than this many seconds count as late
+        self.late = 0
+        self.duration = None
+
+    @property
+    def successful(self):
+        return self.latency.count
+
+    @property
+    def failed(self):
+        return sum(self.errors.values())
+
+    def record(self, seconds):
+        self.latency.observe(seconds)
+        if self.deadline is not None and seconds > self.deadline:
+            self.late += 1
+
+    def record_error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def summary(self):
+        total = self.successful + self.failed
+        result = {
+            'requests': total,
+            'successful': self.successful,
+            'failed': self.failed,
+            'errors': dict(self.errors),
+            'duration_s': self.duration,
+            'target_rps': self.target_rps,
+            'achieved_rps': self.successful / self.duration if self.duration else 0.0,
+            'latency_ms': {},
+        }
+        if self.deadline is not None:
+            result['deadline_ms'] = self.deadline * 1000.0
+            result['late'] = self.late
+            result['on_time_fraction'] = (self.successful - self.late) / total if total else 0.0
+        if self.successful:
+            result['latency_ms'] = {
+                'mean': self.latency.sum / self.latency.count * 1000.0,
+                **{name: self.latency.quantile(q) * 1000.0 for name, q in QUANTILES},
+                'max': self.latency.max * 1000.0,
+            }
+        return result
+
+def print_summary(title, summary):
+    print(f"{title}:")
+    print(f"  Successful: {summary['successful']}/{summary['requests']}")
+    if summary['errors']:
+        print(f"  Failed: {summary['failed']} " +
+              ', '.join(f"{kind}={n}" for kind, n in sorted(summary['errors'].items())))
+    if summary['target_rps']:
+        print(f"  Throughput: {summary['achieved_rps']:.1f} req/s achieved, "
+              f"{summary['target_rps']:.1f} req/s target")
+    else:
+        print(f"  Throughput: {summary['achieved_rps']:.1f} req/s")
+    if 'on_time_fraction' in summary:
+        print(f"  On time (< {summary['deadline_ms']:.1f}ms): {summary['on_time_fraction'] * 100:.2f}%, "
+              f"late: {summary['late']}")
+    latency = summary['latency_ms']
+    if latency:
+        print("  Latency ms: " + ' '.join(f"{name}={latency[name]:.3f}"
+                                          for name in ('mean', 'p50', 'p90', 'p99', 'p99.9', 'max')))
+
+async def open_stream(host, port, binary=False):
+    """asyncio streams to the server, with binary framing negotiated if requested"""
+    reader, writer = await asyncio.open_connection(host, port)
+    if binary:
+        writer.write(wire.MAGIC)
+        await writer.drain()
+        if await reader.readexactly(len(wire.MAGIC)) != wire.MAGIC:
+            writer.close()
+            raise ConnectionError("Server did not accept the binary protocol")
+    return reader, writer
+
+async def read_reply(reader, binary=False):
+    """Next reply as a dict: {'action': n} or the server's JSON document"""
+    if not binary:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        return json.loads(line)
+    length, msg_type = wire.FRAME_HEADER.unpack(await reader.readexactly(wire.FRAME_HEADER.size))
+    payload = await reader.readexactly(length)
+    if msg_type == wire.ACTION:
+        return {'action': wire.ACTION_VALUE.unpack(payload)[0]}
+    if msg_type == wire.ACTIONS:
+        return {'actions': np.frombuffer(payload, dtype=np.int8).tolist()}
+    return json.loads(payload)
+
+class Connection:
+    """Long-lived connection carrying pipelined requests, answered in order.
+
+    Up to `pipeline` requests are in flight at once; further requests wait
+    for a slot (the wait is part of their latency).
+    """
+
+    def __init__(self, reader, writer, binary=False, pipeline=1):
+        self.reader = reader
+        self.writer = writer
+        self.binary = binary
+        self.slots = asyncio.Semaphore(pipeline)
+        self.waiting = collections.deque()  # Reply futures in send order
+        self.receiver = asyncio.create_task(self.receive())
+
+    @classmethod
+    async def open(cls, host, port, binary=False, pipeline=1):
+        reader, writer = await open_stream(host, port, binary)
+        return cls(reader, writer, binary, pipeline)
+
+    async def request(self, payload):
+        async with self.slots:
+            future = asyncio.get_running_loop().create_future()
+            self.waiting.append(future)
+            self.writer.write(payload)
+            await self.writer.drain()
+            return await future
+
+    async def receive(self):
+        try:
+            while True:
+                reply = await read_reply(self.reader, self.binary)
+                future = self.waiting.popleft()
+                if not future.done():  # Timed-out requests are already cancelled
+                    future.set_result(reply)
+        except Exception as e:
+            while self.waiting:
+                future = self.waiting.popleft()
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Connection lost: {e!r}"))
+
+    async def close(self):
+        self.receiver.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+async def open_connections(host, port, count, binary=False, pipeline=1, parallel=256):
+    """`count` Connections, opened at most `parallel` at a time to respect the listen backlog"""
+    gate = asyncio.Semaphore(parallel)
+
+    async def open_one():
+        async with gate:
+            return await Connection.open(host, port, binary, pipeline)
+
+    return await asyncio.gather(*(open_one() for _ in range(count)))
+
+async def close_connections(connections):
+    await asyncio.gather(*(conn.close() for conn in connections))
 
 class LoadTester:
-    def __init__(self, host='localhost', port=5001):
+    def __init__(self, host='localhost', port=5001, timeout=5.0, binary=False, batch_size=1):
         self.host = host
         self.port = port
-        
+        self.timeout = timeout  # Seconds before an unanswered request counts as failed
+        self.binary = binary  # Binary STATE/ACTION frames instead of JSON lines
+        self.batch_size = batch_size  # States per request; > 1 sends batched states requests
+
     def create_test_state(self):
         """Create a random test state"""
         return np.random.randn(14).tolist()
-    
+
+    def create_payloads(self, count):
+        """Encoded state requests, built before timing starts"""
+        if self.batch_size > 1:
+            batches = np.random.randn(count, self.batch_size, 14)
+            if self.binary:
+                return [wire.encode_states(batch) for batch in batches]
+            return [(json.dumps({'states': batch.tolist()}) + '\n').encode('utf-8') for batch in batches]
+        states = np.random.randn(count, 14)
+        if self.binary:
+            return [wire.encode_frame(wire.STATE, state.astype('<f4').tobytes()) for state in states]
+        return [(json.dumps({'state': state.tolist()}) + '\n').encode('utf-8') for state in states]
+
     def send_request(self, state):
         """Send a single inference request"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)  # 5 second timeout
-            sock.connect((self.host, self.port))
-            
-            # Send request
-            request = json.dumps({'state': state}) + '\n'
-            sock.send(request.encode('utf-8'))
-            
-            # Receive response
-            response = sock.recv(4096).decode('utf-8')
-            sock.close()
-            
-            # Parse response
-            result = json.loads(response.strip())
-            return result
-            
+            with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+                sock.sendall((json.dumps({'state': state}) + '\n').encode('utf-8'))
+                with sock.makefile('rb') as reader:
+                    return json.loads(reader.readline())
         except Exception as e:
             return {'error': str(e)}
-    
+
+    async def request(self, payload):
+        """One request on its own connection; returns the decoded reply"""
+        reader, writer = await open_stream(self.host, self.port, self.binary)
+        try:
+            writer.write(payload)
+            await writer.drain()
+            return await read_reply(reader, self.binary)
+        finally:
+            writer.close()
+
+    async def timed_request(self, stats, payload, start, conn=None):
+        """Send one request (on `conn`, or a new connection) and record its latency from `start`"""
+        try:
+            send = conn.request(payload) if conn is not None else self.request(payload)
+            reply = await asyncio.wait_for(send, self.timeout)
+        except Exception as e:
+            stats.record_error(type(e).__name__)
+            return
+        if 'error' in reply:
+            stats.record_error(reply['error'])
+        else:
+            stats.record(time.perf_counter() - start)
+
+    async def run_open_loop(self, rate, duration, max_outstanding=1000, connections=0, pipeline=1):
+        """Offer `rate` requests/s for `duration` seconds on a fixed schedule.
+
+        Request i is due at start + i / rate. Latency counts from that due
+        time, so delays in the client's own scheduling are charged to the
+        request too. Requests due while `max_outstanding` are unanswered are
+        not sent and count as 'client_backlog' failures. With `connections`
+        > 0 requests are spread round-robin over that many persistent
+        connections instead of opening one each.
+        """
+        stats = LoadStats(rate)
+        payloads = self.create_payloads(max(1, int(rate * duration)))
+        pool = await open_connections(self.host, self.port, connections, self.binary, pipeline)
+        outstanding = set()
+        start = time.perf_counter()
+        for i, payload in enumerate(payloads):
+            due = start + i / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(outstanding) >= max_outstanding:
+                stats.record_error('client_backlog')
+                continue
+            conn = pool[i % len(pool)] if pool else None
+            task = asyncio.create_task(self.timed_request(stats, payload, due, conn))
+            outstanding.add(task)
+            task.add_done_callback(outstanding.discard)
+        if outstanding:
+            await asyncio.wait(outstanding)
+        stats.duration = time.perf_counter() - start
+        await close_connections(pool)
+        return stats
+
+    async def run_closed_loop(self, num_requests, workers, persistent=False, pipeline=1):
+        """`workers` clients each sending their next request when the last is answered.
+
+        With `persistent` each worker keeps one connection and `pipeline`
+        requests in flight on it.
+        """
+        stats = LoadStats()
+        payloads = self.create_payloads(num_requests)
+        pool = await open_connections(self.host, self.port, workers if persistent else 0,
+                                      self.binary, pipeline)
+
+        async def worker(mine, conn):
+            for payload in mine:
+                await self.timed_request(stats, payload, time.perf_counter(), conn)
+
+        # Each worker's share is split into `pipeline` streams sharing its connection
+        streams = workers * (pipeline if persistent else 1)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(payloads[i::streams], pool[i % workers] if pool else None)
+                               for i in range(streams)))
+        stats.duration = time.perf_counter() - start
+        await close_connections(pool)
+        return stats
+
+    async def run_games(self, games, duration, fps=60.0):
+        """`games` simulated game clients, each sending a state every frame.
+
+        Every game has its own persistent connection and a random phase within
+        the frame. States are sent on schedule without waiting for earlier
+        actions; an action slower than one frame is counted late.
+        """
+        interval = 1.0 / fps
+        frames = max(1, int(duration * fps))
+        stats = LoadStats(games * fps, deadline=interval)
+        payloads = self.create_payloads(min(frames * games, 4096))
+        pool = await open_connections(self.host, self.port, games, self.binary, pipeline=frames)
+        phases = np.random.uniform(0.0, interval, games)
+
+        async def game(index, conn):
+            sends = []
+            base = start + phases[index]
+            for frame in range(frames):
+                due = base + frame * interval
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                payload = payloads[(index * frames + frame) % len(payloads)]
+                sends.append(asyncio.create_task(self.timed_request(stats, payload, due, conn)))
+            await asyncio.gather(*sends)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(game(i, conn) for i, conn in enumerate(pool)))
+        stats.duration = time.perf_counter() - start
+        await close_connections(pool)
+        return stats
+
+    async def run_saturation(self, slo_ms=5.0, quantile='p99', error_budget=0.001,
+                             start_rps=100.0, max_rps=100000.0, ramp=1.5, step_duration=5.0,
+                             refine=3, connections=0, pipeline=1, max_outstanding=1000):
+        """Raise the offered rate until a step violates the SLO, then bisect the knee.
+
+        A step passes if its latency `quantile` is below `slo_ms`, at most
+        `error_budget` of its requests failed and it achieved the offered
+        rate to within THROUGHPUT_TOLERANCE. Rates grow by `ramp` per step
+        up to `max_rps`; `refine` bisection steps between the last passing
+        and first failing rate then narrow the knee down.
+        """
+        curve = []
+
+        async def step(rate):
+            summary = (await self.run_open_loop(rate, step_duration, max_outstanding,
+                                                connections, pipeline)).summary()
+            latency = summary['latency_ms'].get(quantile)
+            violations = []
+            if latency is None or latency >= slo_ms:
+                violations.append('latency')
+            if summary['failed'] > error_budget * summary['requests']:
+                violations.append('errors')
+            if summary['achieved_rps'] < THROUGHPUT_TOLERANCE * rate:
+                violations.append('throughput')
+            summary.update(offered_rps=rate, passed=not violations, violations=violations)
+            curve.append(summary)
+            print(f"  {rate:>10.1f} req/s offered {summary['achieved_rps']:>10.1f} achieved "
+                  f"{quantile}={latency if latency is not None else float('nan'):.3f}ms "
+                  f"failed={summary['failed']} {'ok' if not violations else 'FAIL ' + ','.join(violations)}")
+            return summary
+
+        passing, failing = None, None
+        rate = start_rps
+        while rate <= max_rps:
+            summary = await step(rate)
+            if not summary['passed']:
+                failing = rate
+                break
+            passing = rate
+            rate *= ramp
+        if passing is not None and failing is not None:
+            low, high = passing, failing
+            for _ in range(refine):
+                mid = (low + high) / 2.0
+                if (await step(mid))['passed']:
+                    low = mid
+                else:
+                    high = mid
+
+        passed = [summary for summary in curve if summary['passed']]
+        knee = max(passed, key=lambda summary: summary['achieved_rps']) if passed else None
+        return {
+            'slo': {'quantile': quantile, 'latency_ms': slo_ms, 'error_budget': error_budget},
+            'knee_rps': knee['achieved_rps'] if knee else 0.0,
+            'knee': knee,
+            'saturated': failing is not None,
+            'curve': sorted(curve, key=lambda summary: summary['offered_rps']),
+        }
+
     def test_single_request(self):
         """Test a single request"""
         print("Testing single request...")
         state = self.create_test_state()
-        
-        start_time = time.time()
+
+        start_time = time.perf_counter()
         result = self.send_request(state)
-        end_time = time.time()
-        
-        latency = end_time - start_time
-        
+        latency = time.perf_counter() - start_time
+
         if 'error' in result:
             print(f"Error: {result['error']}")
             return False
         else:
-            print(f"Success! Action: {result['action']}, Latency: {latency:.3f}s")
+            print(f"Success! Action: {result['action']}, Latency: {latency * 1000:.3f}ms")
             return True
-    
-    def test_concurrent_requests(self, num_requests=10, max_workers=5):
-        """Test concurrent requests"""
+
+    def test_concurrent_requests(self, num_requests=10, max_workers=5, persistent=False, pipeline=1):
+        """Test concurrent requests (closed loop: each worker waits for its reply)"""
         print(f"Testing {num_requests} concurrent requests with {max_workers} workers...")
-        
-        states = [self.create_test_state() for _ in range(num_requests)]
-        results = []
-        latencies = []
-        
-        start_time = time.time()
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(self.send_request, state) for state in states]
-            
-            for future in as_completed(futures):
-                result = future.result()
-                results.append(result)
-                
-                if 'error' not in result:
-                    latencies.append(time.time() - start_time)
-        
-        end_time = time.time()
-        total_time = end_time - start_time
-        
-        # Analyze results
-        successful = sum(1 for r in results if 'error' not in r)
-        failed = len(results) - successful
-        
-        print(f"Results:")
-        print(f"  Successful: {successful}/{num_requests}")
-        print(f"  Failed: {failed}/{num_requests}")
-        print(f"  Total time: {total_time:.3f}s")
-        print(f"  Requests/second: {num_requests/total_time:.2f}")
-        
-        if latencies:
-            print(f"  Average latency: {np.mean(latencies):.3f}s")
-            print(f"  Min latency: {np.min(latencies):.3f}s")
-            print(f"  Max latency: {np.max(latencies):.3f}s")
-        
-        return successful, failed
-    
-    def test_sustained_load(self, duration=30, requests_per_second=5):
-        """Test sustained load over time"""
-        print(f"Testing sustained load: {requests_per_second} req/s for {duration}s...")
-        
-        start_time = time.time()
-        results = []
-        
-        while time.time() - start_time < duration:
-            batch_start = time.time()
-            
-            # Send batch of requests
-            for _ in range(requests_per_second):
-                state = self.create_test_state()
-                result = self.send_request(state)
-                results.append(result)
-            
-            # Wait for next second
-            batch_time = time.time() - batch_start
-            if batch_time < 1.0:
-                time.sleep(1.0 - batch_time)
-        
-        # Analyze results
-        successful = sum(1 for r in results if 'error' not in r)
-        failed = len(results) - successful
-        
-        print(f"Sustained load results:")
-        print(f"  Total requests: {len(results)}")
-        print(f"  Successful: {successful}")
-        print(f"  Failed: {failed}")
-        print(f"  Success rate: {successful/len(results)*100:.1f}%")
-        
-        return successful, failed
-    
+        summary = asyncio.run(self.run_closed_loop(num_requests, max_workers, persistent, pipeline)).summary()
+        print_summary("Concurrent results", summary)
+        return summary
+
+    def test_sustained_load(self, duration=30, requests_per_second=5, max_outstanding=1000,
+                            connections=0, pipeline=1):
+        """Test sustained open-loop load at a fixed arrival rate"""
+        print(f"Testing sustained load: {requests_per_second} req/s for {duration}s (open loop)...")
+        summary = asyncio.run(self.run_open_loop(requests_per_second, duration, max_outstanding,
+                                                 connections, pipeline)).summary()
+        print_summary("Sustained load results", summary)
+        return summary
+
+    def test_games(self, game_counts, duration=10, fps=60.0, on_time=0.99):
+        """Simulate increasing numbers of game clients; report how many one server keeps on time"""
+        summaries = []
+        supported = 0
+        for games in game_counts:
+            print(f"Simulating {games} games at {fps:g} Hz for {duration}s...")
+            summary = asyncio.run(self.run_games(games, duration, fps)).summary()
+            summary['games'] = games
+            print_summary(f"{games} games", summary)
+            summaries.append(summary)
+            if summary['on_time_fraction'] >= on_time:
+                supported = max(supported, games)
+        print(f"Supports {supported} concurrent games with >= {on_time * 100:g}% of actions within a frame")
+        return {'games': summaries, 'supported_games': supported, 'on_time_target': on_time}
+
+    def test_saturation(self, slo_ms=5.0, quantile='p99', error_budget=0.001, start_rps=100.0,
+                        max_rps=100000.0, ramp=1.5, step_duration=5.0, refine=3,
+                        connections=0, pipeline=1, max_outstanding=1000):
+        """Find the highest open-loop throughput that meets the latency SLO and error budget"""
+        print(f"Searching for saturation: {quantile} < {slo_ms}ms, errors <= {error_budget * 100:g}%...")
+        result = asyncio.run(self.run_saturation(slo_ms, quantile, error_budget, start_rps, max_rps, ramp,
+                                                 step_duration, refine, connections, pipeline,
+                                                 max_outstanding))
+        if result['knee'] is None:
+            print(f"No load level met the SLO (lowest offered: {start_rps} req/s)")
+        else:
+            suffix = '' if result['saturated'] else f" (not saturated up to {max_rps} req/s)"
+            print(f"Knee: {result['knee_rps']:.1f} req/s at {quantile}="
+                  f"{result['knee']['latency_ms'][quantile]:.3f}ms{suffix}")
+        return result
+
     def test_server_health(self):
         """Test server health with ping"""
         print("Testing server health...")
-        
+
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((self.host, self.port))
-            
-            # Send ping
-            request = json.dumps({'ping': True}) + '\n'
-            sock.send(request.encode('utf-8'))
-            
-            # Receive response
-            response = sock.recv(4096).decode('utf-8')
-            sock.close()
-            
-            result = json.loads(response.strip())
-            
+            with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+                sock.sendall((json.dumps({'ping': True}) + '\n').encode('utf-8'))
+                with sock.makefile('rb') as reader:
+                    result = json.loads(reader.readline())
+
             if result.get('pong'):
                 print("Server is healthy!")
                 return True
             else:
                 print("Server health check failed")
                 return False
-                
+
         except Exception as e:
             print(f"Server health check error: {e}")
             return False
@@ -170,35 +495,94 @@ def main():
                        help='Server host')
     parser.add_argument('--port', type=int, default=5001,
                        help='Server port')
-    parser.add_argument('--test', type=str, choices=['single', 'concurrent', 'sustained', 'health', 'all'],
+    parser.add_argument('--test', type=str, choices=['single', 'concurrent', 'sustained', 'games', 'saturate', 'health', 'all'],
                        default='all', help='Test type to run')
     parser.add_argument('--requests', type=int, default=10,
                        help='Number of requests for concurrent test')
     parser.add_argument('--workers', type=int, default=5,
-                       help='Number of worker threads')
-    parser.add_argument('--duration', type=int, default=30,
+                       help='Concurrent clients for the concurrent test')
+    parser.add_argument('--duration', type=float, default=30,
                        help='Duration for sustained test (seconds)')
-    parser.add_argument('--rps', type=int, default=5,
-                       help='Requests per second for sustained test')
-    
+    parser.add_argument('--rps', type=float, default=5,
+                       help='Offered requests per second for sustained test')
+    parser.add_argument('--max-outstanding', type=int, default=1000,
+                       help='Unanswered requests after which due requests are dropped as client_backlog')
+    parser.add_argument('--persistent', action='store_true',
+                       help='Reuse long-lived connections instead of one connection per request')
+    parser.add_argument('--connections', type=int, default=16,
+                       help='Persistent connections shared by the sustained test')
+    parser.add_argument('--pipeline', type=int, default=1,
+                       help='Requests in flight per persistent connection')
+    parser.add_argument('--binary', action='store_true',
+                       help='Use binary STATE/ACTION frames instead of JSON lines')
+    parser.add_argument('--batch-size', type=int, default=1,
+                       help='States per request (> 1 sends batched "states" requests)')
+    parser.add_argument('--games', type=int, nargs='+', default=[100, 500, 1000],
+                       help='Simulated game counts for the games test')
+    parser.add_argument('--fps', type=float, default=60.0,
+                       help='States per second sent by each simulated game')
+    parser.add_argument('--on-time', type=float, default=0.99,
+                       help='Fraction of actions that must arrive within a frame for a game count to pass')
+    parser.add_argument('--slo-ms', type=float, default=5.0,
+                       help='Latency SLO for the saturate test')
+    parser.add_argument('--slo-quantile', type=str, choices=[name for name, _ in QUANTILES], default='p99',
+                       help='Latency quantile the SLO applies to')
+    parser.add_argument('--error-budget', type=float, default=0.001,
+                       help='Largest fraction of failed requests a saturate step may have')
+    parser.add_argument('--start-rps', type=float, default=100.0,
+                       help='First offered rate of the saturate test')
+    parser.add_argument('--max-rps', type=float, default=100000.0,
+                       help='Highest offered rate the saturate test tries')
+    parser.add_argument('--ramp', type=float, default=1.5,
+                       help='Factor between consecutive saturate steps')
+    parser.add_argument('--step-duration', type=float, default=5.0,
+                       help='Seconds per saturate step')
+    parser.add_argument('--refine', type=int, default=3,
+                       help='Bisection steps between the last passing and first failing rate')
+    parser.add_argument('--timeout', type=float, default=5.0,
+                       help='Seconds before an unanswered request counts as failed')
+    parser.add_argument('--json-out', type=str, default=None,
+                       help='Also write the concurrent/sustained/games/saturate results as JSON')
+
     args = parser.parse_args()
-    
-    tester = LoadTester(args.host, args.port)
-    
+
+    tester = LoadTester(args.host, args.port, args.timeout, args.binary, args.batch_size)
+    results = {}
+
     if args.test == 'single' or args.test == 'all':
         tester.test_single_request()
         print()
-    
+
     if args.test == 'concurrent' or args.test == 'all':
-        tester.test_concurrent_requests(args.requests, args.workers)
+        results['concurrent'] = tester.test_concurrent_requests(args.requests, args.workers,
+                                                                args.persistent, args.pipeline)
         print()
-    
+
     if args.test == 'sustained' or args.test == 'all':
-        tester.test_sustained_load(args.duration, args.rps)
+        results['sustained'] = tester.test_sustained_load(args.duration, args.rps, args.max_outstanding,
+                                                          args.connections if args.persistent else 0,
+                                                          args.pipeline)
+        print()
+
+    if args.test == 'games':
+        results['games'] = tester.test_games(args.games, args.duration, args.fps, args.on_time)
         print()
-    
+
+    if args.test == 'saturate':
+        results['saturate'] = tester.test_saturation(args.slo_ms, args.slo_quantile, args.error_budget,
+                                                     args.start_rps, args.max_rps, args.ramp,
+                                                     args.step_duration, args.refine,
+                                                     args.connections if args.persistent else 0,
+                                                     args.pipeline, args.max_outstanding)
+        print()
+
     if args.test == 'health' or args.test == 'all':
         tester.test_server_health()
 
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json_out}")
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Inference server performance regression suite.
+
+Starts a local inference server, runs fixed load_test.py scenarios against
+it, stores the results as JSON keyed by git revision and compares them with
+a stored baseline. Exits with status 1 if any metric regressed by more than
+its threshold, so it can gate merges:
+
+    python scripts/evaluation/perf_regression.py --save-baseline   # on main
+    python scripts/evaluation/perf_regression.py                   # on a branch
+
+Baselines are only comparable on the same host and settings; the suite
+refuses to compare results recorded with a different scenario set or CPU
+count.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.append(os.path.join(ROOT, 'src'))
+sys.path.append(os.path.dirname(__file__))
+from load_test import LoadTester
+from startup_benchmark import first_response
+
+SERVER = os.path.join(ROOT, 'src', 'ai', 'inference_server.py')
+RESULTS_DIR = os.path.join(ROOT, 'results', 'perf')
+SUITE_VERSION = 1
+
+# name -> load shape; all use persistent connections so connect cost is not measured
+SCENARIOS = {
+    'single': {'mode': 'closed', 'requests': 2000, 'workers': 1},
+    'concurrent': {'mode': 'closed', 'requests': 8000, 'workers': 16},
+    'sustained': {'mode': 'open', 'rps': 500, 'duration': 10.0, 'connections': 16},
+    'batched': {'mode': 'closed', 'requests': 3000, 'workers': 4, 'batch_size': 64},
+}
+# Metric -> (direction, default allowed relative change before it is a regression)
+METRICS = {
+    'p50_ms': ('lower', 0.20),
+    'p99_ms': ('lower', 0.50),  # Tails are noisy on shared hosts
+    'throughput_rps': ('higher', 0.15),
+}
+
+def git_revision():
+    """(revision, dirty) of the working tree, or ('unknown', False) outside git"""
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short=12', 'HEAD'], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                check=True, capture_output=True, text=True).stdout
+        return rev, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+def usable_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def make_model(path):
+    """Fixed-seed DQN weights so every run serves the same model"""
+    import torch
+    from ai.model import DQN
+    torch.manual_seed(0)
+    torch.save(DQN().state_dict(), path)
+    return path
+
+def run_scenario(tester, scenario):
+    """One run of a scenario; returns the load_test summary"""
+    tester.batch_size = scenario.get('batch_size', 1)
+    if scenario['mode'] == 'closed':
+        stats = asyncio.run(tester.run_closed_loop(scenario['requests'], scenario['workers'], persistent=True))
+    else:
+        stats = asyncio.run(tester.run_open_loop(scenario['rps'], scenario['duration'],
+                                                 connections=scenario['connections']))
+    return stats.summary()
+
+def scenario_metrics(summaries, batch_size=1):
+    """Median of each metric over repeated runs; throughput counts states, not requests"""
+    failed = sum(s['failed'] for s in summaries)
+    if failed or any(not s['latency_ms'] for s in summaries):
+        return {'failed': failed}
+    return {
+        'p50_ms': float(np.median([s['latency_ms']['p50'] for s in summaries])),
+        'p99_ms': float(np.median([s['latency_ms']['p99'] for s in summaries])),
+        'throughput_rps': float(np.median([s['achieved_rps'] for s in summaries])) * batch_size,
+        'failed': 0,
+    }
+
+def run_suite(model, backend, port, repeats, scenarios):
+    server = subprocess.Popen([sys.executable, SERVER, '--model', model, '--backend', backend,
+                               '--host', '127.0.0.1', '--port', str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    results = {}
+    try:
+        first_response(port, timeout=60.0)
+        tester = LoadTester('127.0.0.1', port, binary=True)
+        for name in scenarios:
+            scenario = SCENARIOS[name]
+            run_scenario(tester, scenario)  # Warm-up, discarded
+            summaries = [run_scenario(tester, scenario) for _ in range(repeats)]
+            results[name] = scenario_metrics(summaries, scenario.get('batch_size', 1))
+            print(f"{name:<12} " + ' '.join(f"{k}={v:.3f}" for k, v in results[name].items()
+                                             if k != 'failed') +
+                  (f" FAILED {results[name]['failed']} requests" if results[name]['failed'] else ''))
+    finally:
+        server.send_signal(signal.SIGINT)
+        server.wait(10)
+    return results
+
+def compare(current, baseline, thresholds):
+    """Per-metric comparison rows and whether any of them regressed"""
+    rows = []
+    regressed = False
+    for name, metrics in current['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        if metrics.get('failed'):
+            rows.append({'scenario': name, 'metric': 'failed', 'baseline': base.get('failed', 0),
+                         'current': metrics['failed'], 'change': None, 'regressed': True})
+            regressed = True
+            continue
+        for metric, (direction, _) in METRICS.items():
+            if metric not in base or metric not in metrics:
+                continue
+            change = (metrics[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+            worse = change if direction == 'lower' else -change
+            is_regression = worse > thresholds[metric]
+            regressed |= is_regression
+            rows.append({'scenario': name, 'metric': metric, 'baseline': base[metric],
+                         'current': metrics[metric], 'change': change, 'regressed': is_regression})
+    return rows, regressed
+
+def comparable(current, baseline):
+    """Reason the baseline cannot be compared against, or None"""
+    if baseline.get('suite_version') != current['suite_version']:
+        return f"suite version {baseline.get('suite_version')} != {current['suite_version']}"
+    if baseline.get('settings') != current['settings']:
+        return f"settings differ: {baseline.get('settings')} != {current['settings']}"
+    if baseline['host'].get('cpus') != current['host']['cpus']:
+        return f"recorded on {baseline['host'].get('cpus')} CPUs, this host has {current['host']['cpus']}"
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Inference server performance regression suite')
+    parser.add_argument('--model', type=str, default=None,
+                       help='Model to serve (default: fixed-seed DQN weights)')
+    parser.add_argument('--backend', type=str, choices=['torch', 'int8', 'numpy'], default='torch',
+                       help='Server inference backend')
+    parser.add_argument('--scenarios', type=str, nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                       help='Scenarios to run')
+    parser.add_argument('--repeats', type=int, default=3,
+                       help='Runs per scenario; the median of each metric is kept')
+    parser.add_argument('--port', type=int, default=5093,
+                       help='TCP port for the benchmark server')
+    parser.add_argument('--results-dir', type=str, default=RESULTS_DIR,
+                       help='Directory for <revision>.json results')
+    parser.add_argument('--baseline', type=str, default=None,
+                       help='Baseline results to compare against (default: <results-dir>/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true',
+                       help='Store this run as the baseline instead of comparing')
+    for metric, (direction, threshold) in METRICS.items():
+        parser.add_argument(f"--{metric.replace('_', '-')}-threshold", type=float, default=threshold,
+                           help=f"Allowed relative {'increase' if direction == 'lower' else 'decrease'} "
+                                f"of {metric} (default {threshold:g})")
+    args = parser.parse_args()
+
+    thresholds = {metric: getattr(args, f'{metric}_threshold') for metric in METRICS}
+    baseline_path = args.baseline or os.path.join(args.results_dir, 'baseline.json')
+    revision, dirty = git_revision()
+
+    with tempfile.TemporaryDirectory(prefix='pong_perf_') as tmpdir:
+        model = args.model or make_model(os.path.join(tmpdir, 'model.pth'))
+        scenarios = run_suite(model, args.backend, args.port, args.repeats, args.scenarios)
+
+    current = {
+        'suite_version': SUITE_VERSION,
+        'revision': revision,
+        'dirty': dirty,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': {'node': platform.node(), 'machine': platform.machine(), 'cpus': usable_cpus(),
+                 'python': platform.python_version()},
+        'settings': {'backend': args.backend, 'model': args.model or 'seed-0',
+                     'repeats': args.repeats, 'scenarios': {name: SCENARIOS[name] for name in args.scenarios}},
+        'scenarios': scenarios,
+    }
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    out_path = os.path.join(args.results_dir, f"{revision}{'-dirty' if dirty else ''}.json")
+    with open(out_path, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"Results saved to {out_path}")
+
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    reason = comparable(current, baseline)
+    if reason:
+        print(f"Baseline {baseline_path} is not comparable: {reason}")
+        return 2
+
+    rows, regressed = compare(current, baseline, thresholds)
+    print(f"\nCompared with baseline {baseline['revision']} ({baseline_path}):")
+    print(f"{'scenario':<12} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for row in rows:
+        change = f"{row['change'] * 100:+.1f}%" if row['change'] is not None else ''
+        print(f"{row['scenario']:<12} {row['metric']:<16} {row['baseline']:>10.3f} {row['current']:>10.3f} "
+              f"{change:>8}{'  REGRESSION' if row['regressed'] else ''}")
+    print("Performance regression detected" if regressed else "No performance regression")
+    return 1 if regressed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
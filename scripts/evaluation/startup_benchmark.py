@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Measure inference server time-to-first-response (process start until the
+first state request is answered) for each backend and weight format, and the
+--help time of the command-line tools.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.append(os.path.join(ROOT, 'src'))
+from ai.numpy_backend import export_npz
+
+SERVER = os.path.join(ROOT, 'src', 'ai', 'inference_server.py')
+CLIS = [
+    SERVER,
+    os.path.join(ROOT, 'scripts', 'training', 'train_dqn.py'),
+    os.path.join(ROOT, 'scripts', 'training', 'train_bc.py'),
+    os.path.join(ROOT, 'scripts', 'evaluation', 'evaluate_agent.py'),
+    os.path.join(ROOT, 'scripts', 'evaluation', 'evaluate_bc.py'),
+]
+REQUEST = (json.dumps({'state': [0.0] * 14}) + '\n').encode('utf-8')
+
+def first_response(port, timeout):
+    """Poll until the server answers one state request; returns the reply"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=timeout) as sock:
+                sock.sendall(REQUEST)
+                with sock.makefile('rb') as reader:
+                    reply = json.loads(reader.readline())
+                if 'action' in reply:
+                    return reply
+        except (OSError, ValueError):
+            pass
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"Server on port {port} did not answer within {timeout}s")
+        time.sleep(0.005)
+
+def time_to_first_response(model, backend, port, timeout=60.0):
+    """Seconds from spawning the server to its first answered request"""
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, SERVER, '--model', model, '--backend', backend,
+                               '--host', '127.0.0.1', '--port', str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        first_response(port, timeout)
+        return time.perf_counter() - start
+    finally:
+        server.send_signal(signal.SIGINT)
+        server.wait(10)
+
+def time_help(script):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, script, '--help'], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def summarize(name, seconds):
+    ms = np.asarray(seconds) * 1000.0
+    return {'name': name, 'runs': len(ms), 'median_ms': float(np.median(ms)),
+            'min_ms': float(ms.min()), 'max_ms': float(ms.max())}
+
+def run_benchmark(model, runs, port):
+    tmpdir = tempfile.mkdtemp(prefix='pong_startup_')
+    configs = [('torch .pth', model, 'torch')]
+    with open(os.devnull, 'w') as quiet:
+        stdout, sys.stdout = sys.stdout, quiet
+        try:
+            configs.append(('numpy .npz', export_npz(model, os.path.join(tmpdir, 'model.npz')), 'numpy'))
+            configs.append(('numpy .raw', export_npz(model, os.path.join(tmpdir, 'model.raw')), 'numpy'))
+        finally:
+            sys.stdout = stdout
+    configs.append(('torch .raw', configs[-1][1], 'torch'))
+
+    results = {'server': [], 'help': []}
+    try:
+        for name, path, backend in configs:
+            seconds = [time_to_first_response(path, backend, port) for _ in range(runs)]
+            results['server'].append(summarize(name, seconds))
+        for script in CLIS:
+            seconds = [time_help(script) for _ in range(runs)]
+            results['help'].append(summarize(os.path.basename(script), seconds))
+    finally:
+        for name in os.listdir(tmpdir):
+            os.unlink(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark inference server and CLI startup time')
+    parser.add_argument('--model', type=str, default='models/dqn_model.pth',
+                       help='Torch model to serve; .npz and .raw copies are exported from it')
+    parser.add_argument('--runs', type=int, default=5,
+                       help='Cold starts per configuration')
+    parser.add_argument('--port', type=int, default=5092,
+                       help='TCP port for the benchmark server')
+    parser.add_argument('--json-out', type=str, default=None,
+                       help='Also write the results as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.model, args.runs, args.port)
+
+    print(f"{'time to first response':<24} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for r in results['server']:
+        print(f"{r['name']:<24} {r['median_ms']:>10.1f} {r['min_ms']:>10.1f} {r['max_ms']:>10.1f}")
+    print(f"\n{'--help':<24} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for r in results['help']:
+        print(f"{r['name']:<24} {r['median_ms']:>10.1f} {r['min_ms']:>10.1f} {r['max_ms']:>10.1f}")
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json_out}")
+
+if __name__ == '__main__':
+    main()
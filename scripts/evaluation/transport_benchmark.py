@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Compare request round-trip latency of the inference server over TCP loopback,
+a Unix domain socket and the shared-memory ring.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+from ai import protocol as wire
+from ai.shm_ring import ShmRingClient
+
+SERVER = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'ai', 'inference_server.py')
+
+def wait_for(connect, timeout=30.0):
+    """Retry connect() until the server is up"""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return connect()
+        except (OSError, ConnectionError, ValueError):
+            if time.time() > deadline:
+                raise
+            time.sleep(0.1)
+
+def socket_round_trips(sock, states):
+    """Sequential binary-framed requests; returns per-request latencies in seconds"""
+    reader = wire.SocketReader(sock)
+    if not wire.negotiate_binary(sock, reader):
+        raise RuntimeError("Server did not accept the binary protocol")
+    frames = [wire.encode_frame(wire.STATE, state.tobytes()) for state in states]
+    latencies = np.empty(len(states))
+    for i, frame in enumerate(frames):
+        start = time.perf_counter()
+        sock.sendall(frame)
+        reader.read_frame()
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+def ring_round_trips(client, states):
+    latencies = np.empty(len(states))
+    for i, state in enumerate(states):
+        start = time.perf_counter()
+        client.predict(state)
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+def summarize(name, latencies, warmup):
+    us = latencies[warmup:] * 1e6
+    return {
+        'transport': name,
+        'requests': len(us),
+        'mean_us': float(us.mean()),
+        'p50_us': float(np.percentile(us, 50)),
+        'p99_us': float(np.percentile(us, 99)),
+        'max_us': float(us.max()),
+        'requests_per_second': float(1e6 / us.mean()),
+    }
+
+def run_benchmark(model, backend, requests, warmup, port):
+    states = np.random.RandomState(0).randn(requests + warmup, 14).astype(np.float32) * 300
+    tmpdir = tempfile.mkdtemp(prefix='pong_transport_')
+    unix_path = os.path.join(tmpdir, 'inference.sock')
+    ring = f'pong_bench_{os.getpid()}'
+    # No batching delay, so socket requests measure the transport rather than max-wait
+    common = [sys.executable, SERVER, '--model', model, '--backend', backend, '--max-wait-ms', '0']
+    # One server on TCP plus the ring, one on the Unix socket; each client is the only one
+    servers = [
+        subprocess.Popen(common + ['--host', '127.0.0.1', '--port', str(port), '--shm', ring],
+                         stdout=subprocess.DEVNULL),
+        subprocess.Popen(common + ['--unix-socket', unix_path], stdout=subprocess.DEVNULL),
+    ]
+    results = []
+    try:
+        with wait_for(lambda: socket.create_connection(('127.0.0.1', port))) as sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            results.append(summarize('tcp', socket_round_trips(sock, states), warmup))
+
+        def connect_unix():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(unix_path)
+            except OSError:
+                sock.close()
+                raise
+            return sock
+        with wait_for(connect_unix) as sock:
+            results.append(summarize('unix', socket_round_trips(sock, states), warmup))
+
+        client = wait_for(lambda: ShmRingClient(ring))
+        try:
+            results.append(summarize('shm', ring_round_trips(client, states), warmup))
+        finally:
+            client.close()
+    finally:
+        for server in servers:
+            server.send_signal(signal.SIGINT)  # Lets the server unlink its ring
+        for server in servers:
+            server.wait(10)
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        os.rmdir(tmpdir)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark inference server transports')
+    parser.add_argument('--model', type=str, default='models/dqn_model.pth',
+                       help='Model to serve (.pth, or .npz with --backend numpy)')
+    parser.add_argument('--backend', type=str, choices=['torch', 'numpy'], default='torch',
+                       help='Server inference backend')
+    parser.add_argument('--requests', type=int, default=20000,
+                       help='Sequential requests per transport')
+    parser.add_argument('--warmup', type=int, default=1000,
+                       help='Requests excluded from the statistics')
+    parser.add_argument('--port', type=int, default=5091,
+                       help='TCP port for the benchmark server')
+    parser.add_argument('--json-out', type=str, default=None,
+                       help='Also write the results as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.model, args.backend, args.requests, args.warmup, args.port)
+
+    print(f"{'transport':>10} {'mean us':>10} {'p50 us':>10} {'p99 us':>10} {'max us':>10} {'req/s':>10}")
+    for r in results:
+        print(f"{r['transport']:>10} {r['mean_us']:>10.1f} {r['p50_us']:>10.1f} {r['p99_us']:>10.1f} "
+              f"{r['max_us']:>10.1f} {r['requests_per_second']:>10.0f}")
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json_out}")
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,6 @@ Combines Behavioral Cloning pretraining with Deep Q-Learning fine-tuning.
 
 import argparse
 import yaml
-import torch
 import numpy as np
 import random
 import os
@@ -15,13 +14,11 @@ import sys
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
-from ai.pong_env import PongEnv
-from ai.agent import DQNAgent
-from train_loop import train_agent, Logger
-from ai.model import DQN
+# torch, the environment and the agent are imported where used so --help stays fast
 
 class HybridTrainer:
     def __init__(self, config):
+        import torch
         self.config = config
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"Using device: {self.device}")
@@ -31,8 +28,9 @@ class HybridTrainer:
         if not os.path.exists(bc_model_path):
             raise FileNotFoundError(f"BC model not found: {bc_model_path}")
         
+        from ai.model import DQN, load_policy_state_dict
         print(f"Loading BC model from {bc_model_path}")
-        bc_state_dict = torch.load(bc_model_path, map_location=self.device)
+        bc_state_dict = load_policy_state_dict(bc_model_path, map_location=self.device)
         
         # Create DQN model and load BC weights
         dqn_model = DQN().to(self.device)
@@ -43,6 +41,8 @@ class HybridTrainer:
     
     def initialize_agent_with_bc(self, state_size, action_size, bc_model_path):
         """Initialize DQN agent with BC pretrained weights"""
+        import torch
+        from ai.agent import DQNAgent
         # Load BC model
         bc_model = self.load_bc_model(bc_model_path)
         
@@ -144,9 +144,17 @@ def main():
                        help='Path to BC pretrained model')
     parser.add_argument('--output-model', type=str, default='../../models/hybrid_model.pth',
                        help='Path to save hybrid model')
+    parser.add_argument('--no-plot', action='store_true',
+                       help='Skip the training plot (headless runs)')
+    parser.add_argument('--env', type=str, choices=['socket', 'sim'], default='socket',
+                       help='Environment: the game server (socket) or the in-process simulator (sim)')
     
     args = parser.parse_args()
     
+    import torch
+    from ai.pong_env import PongEnv
+    from train_loop import Logger
+    
     # Load config
     with open(args.config) as f:
         config = yaml.safe_load(f)
@@ -164,7 +172,7 @@ def main():
     
     try:
         # Initialize environment
-        env = PongEnv()
+        env = PongEnv(mode=args.env)
         state_size = 14
         action_size = 3
         
@@ -178,7 +186,8 @@ def main():
         trainer.train_hybrid(agent, env, config, logger)
         
         # Plot results
-        logger.plot()
+        if not args.no_plot:
+            logger.plot()
         
         print("Hybrid training completed successfully!")
         
@@ -6,42 +6,27 @@ Trains a neural network to imitate human gameplay.
 
 import argparse
 import numpy as np
-import torch
-import torch.nn as nn
-import torch.optim as optim
-from torch.utils.data import DataLoader, TensorDataset
-import matplotlib.pyplot as plt
 import os
 import sys
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
-from ai.model import DQN
-
-class BCNetwork(nn.Module):
-    """Behavioral Cloning Network - same architecture as DQN"""
-    def __init__(self, input_size=14, output_size=3):
-        super(BCNetwork, self).__init__()
-        self.net = nn.Sequential(
-            nn.Linear(input_size, 128),
-            nn.ReLU(),
-            nn.Linear(128, 128),
-            nn.ReLU(),
-            nn.Linear(128, output_size)
-        )
-    
-    def forward(self, x):
-        return self.net(x)
+# torch and matplotlib are imported where used so --help stays fast
 
 class BCTrainer:
     def __init__(self, config):
+        import torch
+        import torch.nn as nn
+        import torch.optim as optim
+        from ai.model import DQN
         self.config = config
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"Using device: {self.device}")
         
-        # Initialize model
-        self.model = BCNetwork().to(self.device)
+        # Initialize model (behavioral cloning uses the DQN architecture, so the
+        # weights load straight into the DQN agent and the inference server)
+        self.model = DQN().to(self.device)
         self.optimizer = optim.Adam(self.model.parameters(), lr=config['learning_rate'])
         self.criterion = nn.CrossEntropyLoss()
         
@@ -67,6 +52,8 @@ class BCTrainer:
     
     def prepare_data(self, states, actions, val_split=0.2):
         """Prepare data for training"""
+        import torch
+        from torch.utils.data import DataLoader, TensorDataset
         # Convert to tensors
         states_tensor = torch.FloatTensor(states)
         actions_tensor = torch.LongTensor(actions)
@@ -120,6 +107,7 @@ class BCTrainer:
     
     def validate(self, val_loader):
         """Validate the model"""
+        import torch
         self.model.eval()
         total_loss = 0
         correct = 0
@@ -186,20 +174,26 @@ class BCTrainer:
     
     def save_model(self, path):
         """Save the trained model"""
+        import torch
         os.makedirs(os.path.dirname(path), exist_ok=True)
         torch.save(self.model.state_dict(), path)
         print(f"Model saved to {path}")
     
     def load_model(self, path):
         """Load a trained model"""
+        import torch
         if os.path.exists(path):
-            self.model.load_state_dict(torch.load(path, map_location=self.device))
+            self.model.load_state_dict(torch.load(path, map_location=self.device, weights_only=True))
             print(f"Model loaded from {path}")
         else:
             print(f"Model file not found: {path}")
     
     def plot_training(self):
         """Plot training history"""
+        from utils.plotting import load_pyplot
+        plt = load_pyplot()
+        if plt is None:
+            return
         plt.figure(figsize=(12, 4))
         
         plt.subplot(1, 2, 1)
@@ -234,6 +228,8 @@ def main():
                        help='Learning rate')
     parser.add_argument('--val-split', type=float, default=0.2,
                        help='Validation split ratio')
+    parser.add_argument('--no-plot', action='store_true',
+                       help='Skip the training plot (headless runs)')
     
     args = parser.parse_args()
     
@@ -259,7 +255,8 @@ def main():
         best_loss = trainer.train(train_loader, val_loader, args.epochs)
         
         # Plot results
-        trainer.plot_training()
+        if not args.no_plot:
+            trainer.plot_training()
         
         print(f"Training completed successfully!")
         print(f"Best validation loss: {best_loss:.4f}")
@@ -1,6 +1,5 @@
 import argparse
 import yaml
-import torch
 import numpy as np
 import random
 import sys
@@ -9,15 +8,20 @@ import os
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
-from ai.pong_env import PongEnv
-from ai.agent import DQNAgent
-from train_loop import train_agent, Logger
-
 def main():
     parser = argparse.ArgumentParser(description='Train DQN for Pong')
     parser.add_argument('--config', type=str, default='../../config/ai/train_config.yaml', help='Config file path')
+    parser.add_argument('--no-plot', action='store_true', help='Skip the training plot (headless runs)')
+    parser.add_argument('--env', type=str, choices=['socket', 'sim'], default='socket',
+                        help='Environment: the game server (socket) or the in-process simulator (sim)')
     args = parser.parse_args()
 
+    # Imported after argument parsing so --help does not load torch
+    import torch
+    from ai.pong_env import PongEnv
+    from ai.agent import DQNAgent
+    from train_loop import train_agent, Logger
+
     with open(args.config) as f:
         config = yaml.safe_load(f)
 
@@ -26,12 +30,12 @@ def main():
     np.random.seed(42)
     random.seed(42)
 
-    env = PongEnv()
+    env = PongEnv(mode=args.env)
     state_size = 14
     action_size = 3
     agent = DQNAgent(state_size, action_size, config)
     logger = Logger()
-    train_agent(agent, env, config, logger)
+    train_agent(agent, env, config, logger, plot=not args.no_plot)
     env.close()
 
 if __name__ == '__main__':
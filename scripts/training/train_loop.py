@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import os
 
 class Logger:
@@ -16,6 +15,10 @@ class Logger:
             self.losses.append(loss)
 
     def plot(self):
+        from utils.plotting import load_pyplot  # Callers put src on sys.path
+        plt = load_pyplot()
+        if plt is None:
+            return
         plt.figure(figsize=(12, 8))
         plt.subplot(2, 2, 1)
         plt.plot(self.episodes, self.rewards)
@@ -37,7 +40,7 @@ class Logger:
         plt.savefig('training_plot.png')
         plt.show()
 
-def train_agent(agent, env, config, logger):
+def train_agent(agent, env, config, logger, plot=True):
     # Ensure checkpoints directory exists
     os.makedirs('checkpoints', exist_ok=True)
     for episode in range(config['max_episodes']):
@@ -61,4 +64,5 @@ def train_agent(agent, env, config, logger):
         if episode % 100 == 0:
             agent.save_checkpoint(f"checkpoints/episode_{episode}.pth")
     agent.save_checkpoint(config['model_save_path'])
-    logger.plot()
\ No newline at end of file
+    if plot:
+        logger.plot()
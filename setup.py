@@ -48,7 +48,9 @@ setup(
         "console_scripts": [
             "pong-evolved-train=scripts.training.train_dqn:main",
             "pong-evolved-eval=scripts.evaluation.evaluate_agent:main",
-            "pong-evolved-server=src.ai.inference_server:main",
+            "pong-evolved-server=ai.inference_server:main",
+            "pong-evolved-export=ai.numpy_backend:main",
+            "pong-evolved-autotune=ai.autotune:main",
         ],
     },
 )
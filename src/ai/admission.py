@@ -0,0 +1,89 @@
+import time
+
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` requests/s sustained, bursts up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def take(self, count=1):
+        """Consume `count` tokens; returns 0.0, or the seconds until they are available.
+
+        A count above the burst size is let through on a full bucket and
+        leaves it in debt, so the same rate is charged over time.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        needed = min(count, self.burst)
+        if self.tokens >= needed:
+            self.tokens -= count
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+class AdmissionControl:
+    """Decide whether a state request is served or shed.
+
+    Requests are shed with an explicit error reply, never silently dropped:
+    ``rate_limited`` when one connection exceeds its token bucket and
+    ``overloaded`` when the number of in-flight requests across all
+    connections reaches ``max_inflight``. Both carry a ``retry_after_ms`` hint.
+    A batch of states counts as one request per state; a batch larger than
+    ``max_inflight`` can never fit and gets ``batch_too_large`` instead.
+    """
+
+    def __init__(self, max_inflight=4096, rate_limit=None, rate_burst=None):
+        self.max_inflight = max_inflight
+        self.rate_limit = rate_limit  # Requests/s per connection, None for unlimited
+        self.rate_burst = rate_burst
+        self.inflight = 0
+        # Stats
+        self.admitted = 0
+        self.peak_inflight = 0
+        self.shed_overloaded = 0
+        self.shed_rate_limited = 0
+
+    def admit(self, session=None, drain_ms=1.0, count=1):
+        """Admit `count` requests (pair with release(count)) or return the error reply dict.
+
+        ``drain_ms`` is the caller's estimate of how long the current backlog
+        takes to clear, used as the retry hint when overloaded.
+        """
+        if self.max_inflight is not None and count > self.max_inflight:
+            self.shed_overloaded += count
+            return {'error': 'batch_too_large', 'max_inflight': self.max_inflight}
+
+        if self.rate_limit is not None and session is not None:
+            bucket = session.get('rate_limiter')
+            if bucket is None:
+                bucket = session['rate_limiter'] = TokenBucket(self.rate_limit, self.rate_burst)
+            wait = bucket.take(count)
+            if wait > 0:
+                self.shed_rate_limited += count
+                return {'error': 'rate_limited', 'retry_after_ms': round(wait * 1000.0, 1)}
+
+        if self.max_inflight is not None and self.inflight + count > self.max_inflight:
+            self.shed_overloaded += count
+            return {'error': 'overloaded', 'retry_after_ms': round(max(drain_ms, 1.0), 1)}
+
+        self.inflight += count
+        self.admitted += count
+        self.peak_inflight = max(self.peak_inflight, self.inflight)
+        return None
+
+    def release(self, count=1):
+        self.inflight -= count
+
+    def stats(self):
+        return {
+            'inflight': self.inflight,
+            'peak_inflight': self.peak_inflight,
+            'max_inflight': self.max_inflight,
+            'admitted': self.admitted,
+            'shed_overloaded': self.shed_overloaded,
+            'shed_rate_limited': self.shed_rate_limited,
+            'rate_limit': self.rate_limit,
+        }
@@ -78,7 +78,7 @@ class DQNAgent:
             if not os.path.exists(path):
                 print(f"Checkpoint file {path} not found")
                 return
-            checkpoint = torch.load(path)
+            checkpoint = torch.load(path, weights_only=True)
             self.policy_net.load_state_dict(checkpoint['policy_net'])
             self.target_net.load_state_dict(checkpoint['target_net'])
             self.optimizer.load_state_dict(checkpoint['optimizer'])
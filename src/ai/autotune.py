@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+if __package__ in (None, ''):
+    # Run as a script: load the rest of the package as `ai`, never as top-level modules
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import ai  # noqa: F401
+    __package__ = 'ai'
+
+# Sweep backends, torch intra-op thread counts and batch sizes on this machine
+# and write the best serving settings to a profile the inference server loads
+# with --profile. Tiny MLP forwards are dominated by per-call overhead, so the
+# best thread count depends heavily on batch size and host.
+
+PROFILE_VERSION = 1
+DEFAULT_PROFILE = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'ai', 'inference_profile.json')
+# Profile keys that map onto inference_server.py arguments
+PROFILE_SETTINGS = ('backend', 'threads', 'max_batch_size')
+
+def usable_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def thread_candidates(max_threads=None):
+    """1, 2, 4, ... up to the usable CPUs (always including that count)"""
+    limit = max_threads or usable_cpus()
+    candidates = [1]
+    while candidates[-1] * 2 <= limit:
+        candidates.append(candidates[-1] * 2)
+    if candidates[-1] != limit:
+        candidates.append(limit)
+    return candidates
+
+def time_call(fn, min_time=0.2):
+    """Mean seconds per call, after a short warm-up"""
+    for _ in range(5):
+        fn()
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / calls
+
+def choose(results, budget_ms):
+    """Pick the setting with the highest throughput within the latency budget.
+
+    For each backend/thread setting the batch cap is the largest measured
+    batch whose forward fits in `budget_ms`; ties prefer lower batch-1 latency.
+    """
+    best = None
+    for result in results:
+        latency = {row['batch_size']: row['latency_ms'] for row in result['batches']}
+        fitting = [b for b, ms in latency.items() if ms <= budget_ms] or [min(latency)]
+        cap = max(fitting)
+        score = (cap / latency[cap], -latency[min(latency)])
+        if best is None or score > best[0]:
+            best = (score, result, cap)
+    _, result, cap = best
+    return {'backend': result['backend'], 'threads': result['threads'], 'max_batch_size': cap}
+
+def sweep(model_path, backends=('torch', 'numpy'), threads=None, batch_sizes=None,
+          calibration_data=None, min_time=0.2):
+    """Forward latency for every backend x thread count x batch size, via InferenceServer"""
+    from .inference_server import InferenceServer
+    threads = threads or thread_candidates()
+    batch_sizes = batch_sizes or [2 ** e for e in range(10)]
+    rng = np.random.RandomState(0)
+    inputs = {b: (rng.randn(b, 14) * 100).astype(np.float32) for b in batch_sizes}
+
+    results = []
+    for backend in backends:
+        server = InferenceServer(model_path, backend=backend, calibration_data=calibration_data)
+        model = server.build_model(model_path)
+        # NumPy forwards are single-threaded here; only torch has a thread knob
+        for n_threads in threads if backend != 'numpy' else [1]:
+            if backend != 'numpy':
+                import torch
+                torch.set_num_threads(n_threads)
+            rows = []
+            for b in batch_sizes:
+                seconds = time_call(lambda: server.q_values(inputs[b], model), min_time)
+                rows.append({'batch_size': b, 'latency_ms': seconds * 1000.0, 'throughput': b / seconds})
+            results.append({'backend': backend, 'threads': n_threads, 'batches': rows})
+            print(f"{backend:>6} threads={n_threads:<3} " +
+                  ' '.join(f"b{row['batch_size']}={row['latency_ms']:.3f}ms" for row in rows))
+    return results
+
+def build_profile(model_path, results, budget_ms):
+    profile = {
+        'version': PROFILE_VERSION,
+        **choose(results, budget_ms),
+        'budget_ms': budget_ms,
+        'host': {
+            'node': platform.node(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpus': usable_cpus(),
+        },
+        'model': model_path,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'measurements': results,
+    }
+    try:
+        import torch
+        profile['host']['torch'] = torch.__version__
+    except ImportError:
+        pass
+    return profile
+
+def load_profile(path):
+    """Server settings from a profile file, as inference_server.py argument defaults"""
+    with open(path, 'r') as f:
+        profile = json.load(f)
+    if profile.get('version') != PROFILE_VERSION:
+        raise ValueError(f"Unsupported profile version {profile.get('version')} in {path}")
+    cpus = profile.get('host', {}).get('cpus')
+    if cpus is not None and cpus != usable_cpus():
+        print(f"Warning: profile {path} was tuned on {cpus} CPUs, this host has {usable_cpus()}")
+    return {key: profile[key] for key in PROFILE_SETTINGS if key in profile}
+
+def main():
+    parser = argparse.ArgumentParser(description='Tune inference server threads, batch cap and backend for this host')
+    parser.add_argument('--model', type=str, default='models/dqn_model.pth',
+                        help='Model to benchmark')
+    parser.add_argument('--backends', type=str, nargs='+', choices=['torch', 'int8', 'numpy'],
+                        default=['torch', 'numpy'], help='Backends to compare')
+    parser.add_argument('--threads', type=int, nargs='+', default=None,
+                        help='Torch thread counts to try (default: powers of two up to the usable CPUs)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=None,
+                        help='Batch sizes to time (default: 1 to 512)')
+    parser.add_argument('--budget-ms', type=float, default=1.0,
+                        help='Forward-time budget that bounds the chosen batch cap')
+    parser.add_argument('--calibration-data', type=str, default=None,
+                        help='Calibration states for the int8 backend')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Seconds spent timing each configuration')
+    parser.add_argument('--out', type=str, default=DEFAULT_PROFILE,
+                        help='Profile file to write')
+    args = parser.parse_args()
+
+    results = sweep(args.model, args.backends, args.threads, args.batch_sizes,
+                    args.calibration_data, args.min_time)
+    profile = build_profile(args.model, results, args.budget_ms)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(profile, f, indent=2)
+    print(f"Chosen: backend={profile['backend']} threads={profile['threads']} "
+          f"max_batch_size={profile['max_batch_size']}")
+    print(f"Profile saved to {args.out} (serve with --profile {args.out})")
+
+if __name__ == '__main__':
+    main()
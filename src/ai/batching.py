@@ -0,0 +1,153 @@
+import asyncio
+import time
+import numpy as np
+from .metrics import Histogram, BATCH_BOUNDS
+
+class DeadlineExceeded(Exception):
+    """The request cannot be answered by the model before its deadline"""
+
+class BatchScheduler:
+    """Coalesce single-state inference requests into batched forward passes.
+
+    Requests submitted from any connection are queued; the scheduler takes the
+    first pending request, keeps collecting until either ``max_batch_size``
+    states are gathered or ``max_wait_ms`` has elapsed, runs ``infer_fn`` once
+    on the stacked ``(N, 14)`` array and scatters the actions back.
+
+    A request may carry a deadline. It is rejected with ``DeadlineExceeded``
+    up front when the queue ahead of it plus the expected forward time would
+    overrun the deadline, and dropped from its batch if it expired while queued.
+    """
+
+    def __init__(self, infer_fn, max_batch_size=64, max_wait_ms=1.0):
+        self.infer_fn = infer_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = None
+        self.task = None
+        self.forward_time = 0.0  # EWMA of one forward pass, in seconds
+        self.forward_alpha = 0.1
+        # Stats
+        self.batches = 0
+        self.requests = 0
+        self.rejected = 0  # Refused up front by the latency estimate
+        self.expired = 0  # Deadline passed while queued
+        self.batch_size_counts = {}
+        self.queue_wait = Histogram()  # Seconds from submit to the start of its batch
+        self.forward = Histogram()  # Seconds per forward pass
+        self.batch_size = Histogram(BATCH_BOUNDS)
+
+    def start(self):
+        """Create the queue and batching task on the running event loop"""
+        if self.task is None:
+            self.queue = asyncio.Queue()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def estimate_latency(self):
+        """Expected seconds until a request queued now gets its action"""
+        queued = self.queue.qsize() if self.queue is not None else 0
+        batches_ahead = queued // self.max_batch_size + 1
+        return self.max_wait + batches_ahead * self.forward_time
+
+    async def submit(self, state, deadline=None):
+        """Queue one float32 state and wait for its action.
+
+        ``deadline`` is an absolute ``time.perf_counter()`` time; raises
+        DeadlineExceeded if the model cannot answer before it.
+        """
+        self.start()
+        now = time.perf_counter()
+        if deadline is not None and now + self.estimate_latency() > deadline:
+            self.rejected += 1
+            raise DeadlineExceeded()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((state, future, now, deadline))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.run_batch(batch)
+
+    def run_batch(self, batch):
+        """Run one forward over the batch and resolve every waiting future"""
+        now = time.perf_counter()
+        finish = now + self.forward_time
+        live = []
+        for item in batch:
+            _, future, enqueued, deadline = item
+            self.queue_wait.observe(now - enqueued)
+            if deadline is not None and finish > deadline:
+                # Spend no forward time on an answer that would arrive too late
+                self.expired += 1
+                if not future.done():
+                    future.set_exception(DeadlineExceeded())
+            else:
+                live.append(item)
+        if not live:
+            return
+
+        size = len(live)
+        self.batches += 1
+        self.requests += size
+        self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+        self.batch_size.observe(size)
+
+        try:
+            actions = self.infer_fn(np.stack([state for state, _, _, _ in live]))
+        except Exception as e:
+            for _, future, _, _ in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            elapsed = time.perf_counter() - now
+            self.forward.observe(elapsed)
+            if self.batches == 1:
+                self.forward_time = elapsed
+            else:
+                self.forward_time += self.forward_alpha * (elapsed - self.forward_time)
+
+        for (_, future, _, _), action in zip(live, actions):
+            if not future.done():
+                future.set_result(int(action))
+
+    def stats(self):
+        """Batch-size, queue-wait and forward-time distribution since startup"""
+        stats = {
+            'batches': self.batches,
+            'requests': self.requests,
+            'mean_batch_size': self.requests / self.batches if self.batches else 0.0,
+            'batch_sizes': {str(k): v for k, v in sorted(self.batch_size_counts.items())},
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+            'forward_estimate_ms': self.forward_time * 1000.0,
+            'deadline_rejected': self.rejected,
+            'deadline_expired': self.expired,
+        }
+        if self.queue_wait.count:
+            stats['queue_wait_ms'] = self.queue_wait.summary(1000.0)
+        if self.forward.count:
+            stats['forward_ms'] = self.forward.summary(1000.0)
+        return stats
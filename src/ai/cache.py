@@ -0,0 +1,78 @@
+import sys
+from collections import OrderedDict
+import numpy as np
+
+class ActionCache:
+    """Bounded LRU cache of greedy actions keyed on a quantized state.
+
+    Each feature is divided by its quantum and rounded, so states closer than
+    half a quantum share an entry. A quantum of 0 keys on the exact float32
+    values. The cache belongs to one set of weights and is cleared on reload.
+    """
+
+    def __init__(self, capacity, quantum=1.0):
+        self.capacity = capacity
+        quantum = np.broadcast_to(np.asarray(quantum, dtype=np.float32), (14,))
+        self.exact = not quantum.any()
+        # Features with a zero quantum are kept exact (scale 1, not rounded)
+        self.round = quantum > 0
+        self.scale = (1.0 / np.where(self.round, quantum, 1.0)).astype(np.float32)
+        self.entries = OrderedDict()
+        self.key_bytes = 0
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, state):
+        if self.exact:
+            return np.asarray(state, dtype=np.float32).tobytes()
+        scaled = np.asarray(state, dtype=np.float32) * self.scale
+        return np.where(self.round, np.rint(scaled), scaled).astype(np.float32).tobytes()
+
+    def get(self, key):
+        """Cached action for the key, or None"""
+        action = self.entries.get(key)
+        if action is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return action
+
+    def put(self, key, action):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return
+        self.entries[key] = action
+        self.key_bytes += sys.getsizeof(key)
+        if len(self.entries) > self.capacity:
+            old, _ = self.entries.popitem(last=False)
+            self.key_bytes -= sys.getsizeof(old)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.key_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            # Keys plus the dict itself; the small-int actions are shared objects
+            'memory_bytes': self.key_bytes + sys.getsizeof(self.entries),
+        }
+
+def parse_quantum(text):
+    """One quantum for every feature ('1.0') or 14 comma-separated values"""
+    values = [float(v) for v in text.split(',')]
+    if len(values) not in (1, 14):
+        raise ValueError(f"Expected 1 or 14 quantum values, got {len(values)}")
+    if any(v < 0 for v in values):
+        raise ValueError("Quantum values must be non-negative")
+    return values[0] if len(values) == 1 else values
@@ -1,58 +1,221 @@
+import asyncio
 import socket
 import json
-import torch
+import signal
+import threading
+import time
+import multiprocessing as mp
+import numpy as np
 import argparse
 import os
 import sys
-import os
-sys.path.append(os.path.dirname(__file__))
-from model import DQN
+if __package__ in (None, ''):
+    # Run as a script: load the rest of the package as `ai`, never as top-level modules
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import ai  # noqa: F401
+    __package__ = 'ai'
+from .model_registry import ModelRegistry, ServedModel, parse_model_spec
+from .admission import AdmissionControl
+from .cache import parse_quantum
+from .metrics import Histogram, MetricsHTTPServer, exposition
+from . import protocol as wire
 
 class InferenceServer:
-    def __init__(self, model_path, host='localhost', port=5001):
+    def __init__(self, model_path, host='localhost', port=5001, backlog=512,
+                 max_batch_size=64, max_wait_ms=1.0, backend='torch', watch_interval=None,
+                 models=None, calibration_data=None, deadline_ms=None,
+                 max_pending=256, max_inflight=4096, rate_limit=None, rate_burst=None,
+                 cache_size=0, cache_quantum=1.0, unix_socket=None, shm_name=None, shm_slots=256,
+                 metrics_port=None, threads=None):
         self.model_path = model_path
         self.host = host
         self.port = port
-        self.model = None
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.backlog = backlog
+        self.backend = backend  # 'torch', 'int8' (quantized torch, CPU) or 'numpy' (no torch import)
+        self.calibration_data = calibration_data  # States used to calibrate int8 quantization
+        self.threads = threads  # Torch intra-op threads, None keeps the torch default
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.watch_interval = watch_interval  # Poll model files for changes every N seconds
+        self.deadline_ms = deadline_ms  # Default latency budget per state request (async mode)
+        self.max_line = 65536  # Longest JSON line accepted, as asyncio's stream limit
+        self.max_pending = max_pending  # Unanswered requests buffered per connection before reads pause
+        self.admission = AdmissionControl(max_inflight, rate_limit, rate_burst)
+        self.cache_size = cache_size  # Cached actions per model, 0 disables the cache
+        self.cache_quantum = cache_quantum  # Per-feature rounding step of the cache key
+        self.unix_socket = unix_socket  # Listen on this Unix domain socket path instead of TCP
+        self.shm_name = shm_name  # Also answer a co-located client over a shared-memory ring
+        self.shm_slots = shm_slots
+        self.shm_server = None
+        self.metrics_port = metrics_port  # Plain-text HTTP metrics; workers use port + worker id
+        self.metrics_server = None
+        # Per-request stage timings in seconds; queue/forward/total live on each model
+        self.parse_time = Histogram()
+        self.send_time = Histogram()
+        self.active_connections = 0
+        self.worker_id = None  # Set in forked worker processes
+        self.ready = threading.Event()  # Set once the async server is accepting
+        self.device = None  # Resolved when a torch model is loaded
         
+        # (name, path, weight) per served model; a single --model is served as 'default'
+        self.registry = ModelRegistry()
+        for name, path, weight in models or [('default', model_path, 1.0)]:
+            self.registry.add(ServedModel(name, path, self, weight))
+    
+    @property
+    def model(self):
+        """Weights of the primary (first) model"""
+        return self.registry.primary.model
+    
+    @property
+    def scheduler(self):
+        return self.registry.primary.scheduler
+    
     def load_model(self):
-        """Load the trained model"""
-        if not os.path.exists(self.model_path):
-            raise FileNotFoundError(f"Model file not found: {self.model_path}")
+        """Load the trained model(s)"""
+        for entry in self.registry:
+            entry.load()
+        print("Model loaded successfully")
+    
+    def build_model(self, path):
+        """Load weights from `path` into a fresh model for the configured backend"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model file not found: {path}")
         
-        print(f"Loading model from {self.model_path}")
-        self.model = DQN().to(self.device)
+        print(f"Loading model from {path} ({self.backend} backend)")
+        if self.backend == 'numpy':
+            from .numpy_backend import NumpyDQN
+            try:
+                return NumpyDQN.load(path)
+            except Exception as e:
+                print(f"Error loading model: {e}")
+                raise
         
-        # Try to load as state dict first, then as full checkpoint
+        import torch
+        from .model import DQN, load_policy_state_dict
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        if self.backend == 'int8':
+            # Quantized kernels are CPU-only
+            self.device = torch.device("cpu")
+        if self.device is None:
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        model = DQN().to(self.device)
+        
+        # Accepts a bare state dict or a full checkpoint
         try:
-            checkpoint = torch.load(self.model_path, map_location=self.device)
-            if 'policy_net' in checkpoint:
-                # Full checkpoint
-                self.model.load_state_dict(checkpoint['policy_net'])
-            else:
-                # Just state dict
-                self.model.load_state_dict(checkpoint)
+            model.load_state_dict(load_policy_state_dict(path, map_location=self.device))
         except Exception as e:
             print(f"Error loading model: {e}")
             raise
         
-        self.model.eval()
-        print("Model loaded successfully")
+        model.eval()
+        if self.backend == 'int8':
+            from .quantize import quantize_dqn, load_calibration_states
+            states = load_calibration_states(self.calibration_data) if self.calibration_data else None
+            model = quantize_dqn(model, states)
+        return model
+    
+    async def reload_models(self, name=None):
+        """Hot-reload one named model, or all of them"""
+        entries = [self.registry.get(name)] if name is not None else list(self.registry)
+        for entry in entries:
+            await entry.reload()
+        return entries[0]
+    
+    async def watch_models(self):
+        """Hot-reload a model whenever its file changes"""
+        # Compare with the file the served weights came from, which may already be outdated
+        last = {entry.name: entry.loaded_stat for entry in self.registry}
+        candidate = {}
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            for entry in self.registry:
+                stat = entry.file_stat()
+                if stat is None or stat == last[entry.name]:
+                    candidate.pop(entry.name, None)
+                    continue
+                if stat != candidate.get(entry.name):
+                    # Wait for one unchanged poll so a checkpoint still being written is not loaded
+                    candidate[entry.name] = stat
+                    continue
+                last[entry.name] = stat
+                try:
+                    await entry.reload()
+                except Exception as e:
+                    print(f"Hot reload of '{entry.name}' failed, keeping version {entry.version}: {e}")
+    
+    async def follow_reloads(self, interval=0.1):
+        """Worker processes: load the weights another worker reloaded, so all serve the same version"""
+        while True:
+            await asyncio.sleep(interval)
+            for entry in self.registry:
+                version = entry.stale_version()
+                if version is None:
+                    continue
+                try:
+                    await entry.reload(version)
+                except Exception as e:
+                    print(f"Reload of '{entry.name}' version {version} failed, keeping version {entry.version}: {e}")
+    
+    def models_info(self):
+        return {entry.name: entry.info() for entry in self.registry}
+    
+    def address(self):
+        return f"unix:{self.unix_socket}" if self.unix_socket else f"{self.host}:{self.port}"
+    
+    def start_shm(self):
+        """Serve the shared-memory ring on a background thread (primary model)"""
+        if self.shm_name and self.shm_server is None:
+            from .shm_ring import ShmRingServer
+            self.shm_server = ShmRingServer(self.shm_name, lambda: self.registry.primary,
+                                            self.shm_slots, self.max_batch_size)
+            self.shm_server.start()
+            print(f"Shared-memory ring '{self.shm_name}' ready ({self.shm_slots} slots)")
+    
+    def stop_shm(self):
+        if self.shm_server is not None:
+            self.shm_server.close()
+            self.shm_server = None
+    
+    def start_metrics(self):
+        """Serve /metrics (text) and /stats (JSON) over HTTP on a background thread"""
+        if self.metrics_port is None or self.metrics_server is not None:
+            return
+        port = self.metrics_port + (self.worker_id or 0) if self.metrics_port else 0
+        host = 'localhost' if self.unix_socket else self.host
+        self.metrics_server = MetricsHTTPServer(host, port, self.metrics_text, self.get_stats)
+        self.metrics_server.start()
+        print(f"Metrics on http://{host}:{self.metrics_server.port}/metrics")
+    
+    def stop_metrics(self):
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+    
+    def remove_unix_socket(self):
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
     
     def start_server(self):
         """Start the inference server"""
         if self.model is None:
             self.load_model()
         
-        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Low latency
-        server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # Allow reuse
+        if self.unix_socket:
+            self.remove_unix_socket()
+            server_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Low latency
+            server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # Allow reuse
         
         try:
-            server_sock.bind((self.host, self.port))
+            server_sock.bind(self.unix_socket or (self.host, self.port))
             server_sock.listen(1)
-            print(f"Inference server listening on {self.host}:{self.port}")
+            self.start_shm()
+            self.start_metrics()
+            print(f"Inference server listening on {self.address()}")
             
             while True:
                 print("Waiting for client connection...")
@@ -73,75 +236,747 @@ class InferenceServer:
             print(f"Server error: {e}")
         finally:
             server_sock.close()
+            self.remove_unix_socket()
+            self.stop_shm()
+            self.stop_metrics()
+    
+    def start_async_server(self):
+        """Start the asyncio inference server (many concurrent clients)"""
+        if self.model is None:
+            self.load_model()
+        
+        try:
+            asyncio.run(self.serve_async())
+        except KeyboardInterrupt:
+            print("\nServer shutting down...")
+        except Exception as e:
+            print(f"Server error: {e}")
+    
+    async def serve_async(self, sock=None):
+        """Accept and multiplex client connections on the running event loop"""
+        for entry in self.registry:
+            entry.scheduler.start()
+        tasks = []
+        if self.watch_interval and not self.worker_id:
+            # One worker watches the files; the others follow its reloads
+            tasks.append(asyncio.get_running_loop().create_task(self.watch_models()))
+        if self.worker_id is not None:
+            tasks.append(asyncio.get_running_loop().create_task(self.follow_reloads()))
+        if sock is not None:
+            server = await asyncio.start_server(self.handle_connection, sock=sock, backlog=self.backlog,
+                                                limit=self.max_line)
+        elif self.unix_socket:
+            self.remove_unix_socket()
+            server = await asyncio.start_unix_server(self.handle_connection, self.unix_socket,
+                                                     backlog=self.backlog, limit=self.max_line)
+        else:
+            server = await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                                backlog=self.backlog, reuse_address=True,
+                                                limit=self.max_line)
+        if not self.unix_socket:
+            # Resolve the real port when bound to port 0
+            self.port = server.sockets[0].getsockname()[1]
+        if self.worker_id is None:
+            print(f"Async inference server listening on {self.address()}")
+        self.start_shm()
+        self.start_metrics()
+        self.ready.set()
+        
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.remove_unix_socket()
+            self.stop_shm()
+            self.stop_metrics()
+            for task in tasks:
+                task.cancel()
+            for entry in self.registry:
+                await entry.scheduler.stop()
+    
+    def create_reuseport_socket(self):
+        """Listening socket that several worker processes can bind to the same port"""
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            raise RuntimeError("SO_REUSEPORT is not supported on this platform; use --workers 1")
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.host, self.port))
+        return sock
+    
+    def start_workers(self, num_workers, threads_per_worker=1):
+        """Fork worker processes that share one port and one copy of the weights"""
+        if self.backend != 'numpy':
+            import torch
+            # CUDA cannot be used across fork, and small batches are faster on CPU anyway
+            self.device = torch.device("cpu")
+        if self.model is None:
+            self.load_model()
+        if self.backend != 'numpy':
+            # Move the weights into shared memory once; forked workers map the same pages
+            for entry in self.registry:
+                entry.model.share_memory()
+        # NumPy weight arrays are never written after load, so forked workers keep
+        # sharing the parent's copy-on-write pages
+        ctx = mp.get_context('fork')
+        for entry in self.registry:
+            entry.published = ctx.Value('q', entry.version)
+        
+        # Hold the port in the supervisor (without listening) so port 0 resolves once
+        # and every worker binds the same address
+        port_holder = self.create_reuseport_socket()
+        self.port = port_holder.getsockname()[1]
+        print(f"Starting {num_workers} workers on {self.host}:{self.port}")
+        
+        workers = {}
+        restarts = []
+        
+        def spawn(worker_id):
+            process = ctx.Process(target=self.run_worker, args=(worker_id, threads_per_worker), daemon=True)
+            process.start()
+            workers[worker_id] = process
+        
+        for worker_id in range(num_workers):
+            spawn(worker_id)
+        
+        try:
+            while True:
+                time.sleep(0.5)
+                for worker_id, process in list(workers.items()):
+                    if process.is_alive():
+                        continue
+                    print(f"Worker {worker_id} (pid {process.pid}) exited with code {process.exitcode}, restarting")
+                    # Back off if workers keep crashing right after start
+                    now = time.monotonic()
+                    restarts = [t for t in restarts if now - t < 10.0] + [now]
+                    if len(restarts) > 5 * num_workers:
+                        time.sleep(1.0)
+                    spawn(worker_id)
+        except KeyboardInterrupt:
+            print("\nServer shutting down...")
+        finally:
+            for process in workers.values():
+                if process.is_alive():
+                    process.terminate()
+            for process in workers.values():
+                process.join(timeout=5)
+            port_holder.close()
+    
+    def run_worker(self, worker_id, threads_per_worker):
+        """Entry point of a forked serving process"""
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # The supervisor handles Ctrl-C
+        self.worker_id = worker_id
+        if self.backend != 'numpy':
+            import torch
+            torch.set_num_threads(threads_per_worker)
+        for entry in self.registry:
+            version = entry.stale_version()
+            if version is not None:
+                # Forked with the supervisor's startup weights; serve what the other workers reloaded
+                entry.activate(*entry.prepare(), version)
+        sock = self.create_reuseport_socket()
+        try:
+            asyncio.run(self.serve_async(sock=sock))
+        except Exception as e:
+            print(f"Worker {worker_id} error: {e}")
+            raise
+    
+    async def handle_connection(self, reader, writer):
+        """Serve newline-delimited JSON or binary-framed requests from one client connection"""
+        sock = writer.get_extra_info('socket')
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Low latency
+        self.active_connections += 1
+        
+        # Requests are processed concurrently (so pipelined states can share a
+        # batch) while replies are written back in request order. The queue is
+        # bounded: a client that stops reading replies stops being read from,
+        # and TCP flow control pushes back on it.
+        pending = asyncio.Queue(maxsize=self.max_pending)
+        sender = asyncio.get_running_loop().create_task(self.send_replies(pending, writer))
+        session = {}  # Per-connection routing state (A/B arm)
+        
+        try:
+            # Binary clients open with the protocol magic; JSON never starts with it
+            first = await reader.readexactly(1)
+            if first == wire.MAGIC[:1]:
+                if first + await reader.readexactly(len(wire.MAGIC) - 1) != wire.MAGIC:
+                    raise ConnectionError("Bad protocol handshake")
+                writer.write(wire.MAGIC)
+                await self.read_binary_requests(reader, pending, session)
+            else:
+                await self.read_json_requests(reader, pending, session, first)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            print(f"Error handling client request: {e}")
+        finally:
+            await pending.put(None)
+            try:
+                await sender
+            except Exception:
+                pass
+            self.active_connections -= 1
+            writer.close()
+    
+    async def read_json_requests(self, reader, pending, session, prefix=b''):
+        while True:
+            try:
+                line = prefix + await reader.readline()
+            except ValueError:
+                # Line exceeded the stream limit; the framing is lost
+                await pending.put(self.reply_now(self.json_line(json.dumps({'error': 'Message too large'}))))
+                break
+            prefix = b''
+            if not line:
+                break
+            
+            line = line.strip()
+            if line:
+                await pending.put(asyncio.ensure_future(self.process_json_line(line, session)))
+    
+    async def read_binary_requests(self, reader, pending, session):
+        while True:
+            header = await reader.readexactly(wire.FRAME_HEADER.size)
+            length, msg_type = wire.FRAME_HEADER.unpack(header)
+            if length > self.max_line:
+                await pending.put(self.reply_now(wire.encode_json({'error': 'Message too large'})))
+                break
+            payload = await reader.readexactly(length)
+            await pending.put(asyncio.ensure_future(self.process_frame(msg_type, payload, session)))
+    
+    def json_line(self, response):
+        return (response + '\n').encode('utf-8') if response else b''
+    
+    def reply_now(self, data):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(data)
+        return future
+    
+    async def send_replies(self, pending, writer):
+        """Write encoded responses for one connection in the order requests arrived"""
+        while True:
+            future = await pending.get()
+            if future is None:
+                break
+            data = await future
+            if data and not writer.is_closing():
+                start = time.perf_counter()
+                writer.write(data)
+                if pending.empty():
+                    try:
+                        await writer.drain()
+                    except ConnectionError:
+                        # Keep consuming so the reader never blocks on a full queue
+                        writer.close()
+                self.send_time.observe(time.perf_counter() - start)
+    
+    async def process_json_line(self, line, session=None):
+        return self.json_line(await self.process_message_async(line.decode('utf-8', errors='replace'), session))
+    
+    async def process_frame(self, msg_type, payload, session=None):
+        """Process one binary frame and return the encoded reply frame"""
+        if msg_type == wire.STATE:
+            if len(payload) < wire.FEATURES.size:
+                return wire.encode_json({'error': 'Invalid state size'})
+            start = time.perf_counter()
+            state = wire.decode_features(payload)
+            self.parse_time.observe(time.perf_counter() - start)
+            entry = self.registry.route(session=session)
+            error = self.admission.admit(session, self.drain_ms(entry))
+            if error:
+                return wire.encode_json(error)
+            try:
+                action = await entry.predict(state, self.deadline_ms)
+            except Exception as e:
+                return wire.encode_json({'error': str(e)})
+            finally:
+                self.admission.release()
+            return wire.encode_action(action)
+        
+        elif msg_type == wire.STATES:
+            return await self.process_states_frame_async(payload, session)
+        
+        elif msg_type == wire.JSON:
+            response = await self.process_message_async(payload.decode('utf-8', errors='replace'), session)
+            return wire.encode_frame(wire.JSON, response.encode('utf-8'))
+        
+        return wire.encode_json({'error': 'Unknown message type'})
+    
+    async def process_message_async(self, message, session=None):
+        """Process a message, routing inference through the model's batch scheduler"""
+        try:
+            start = time.perf_counter()
+            msg = json.loads(message)
+            
+            if 'state' in msg:
+                state, error = self.parse_state(msg['state'])
+                if error:
+                    return error
+                self.parse_time.observe(time.perf_counter() - start)
+                deadline_ms, error = self.parse_deadline(msg)
+                if error:
+                    return error
+                entry = self.registry.route(msg.get('model'), session)
+                error = self.admission.admit(session, self.drain_ms(entry))
+                if error:
+                    return json.dumps(error)
+                try:
+                    action = await entry.predict(state, deadline_ms)
+                finally:
+                    self.admission.release()
+                return json.dumps({'action': action})
+            
+            elif 'states' in msg:
+                return await self.process_states_async(msg, session)
+            
+            elif 'reload' in msg:
+                # Admin: reload model files without blocking in-flight requests
+                entry = await self.reload_models(msg.get('model'))
+                return json.dumps({'reloaded': True, **entry.info(), 'models': self.models_info()})
+            
+            return self.handle_request(msg)
+        
+        except KeyError as e:
+            return json.dumps({'error': e.args[0] if e.args else 'Unknown model'})
+        except json.JSONDecodeError:
+            return json.dumps({'error': 'Invalid JSON'})
+        except Exception as e:
+            return json.dumps({'error': str(e)})
     
     def handle_client(self, client_sock):
         """Handle client requests"""
-        buffer = ""
+        reader = wire.SocketReader(client_sock)
+        session = {}
+        
+        try:
+            binary = reader.peek(1) == wire.MAGIC[:1]
+            if binary:
+                if bytes(reader.read_exact(len(wire.MAGIC))) != wire.MAGIC:
+                    raise ConnectionError("Bad protocol handshake")
+                client_sock.sendall(wire.MAGIC)
+        except ConnectionError:
+            return
         
         while True:
             try:
-                data = client_sock.recv(4096).decode('utf-8')
-                if not data:
-                    break
-                
-                buffer += data
-                
-                # Process complete messages
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    if line.strip():
-                        response = self.process_message(line.strip())
-                        if response:
-                            client_sock.send((response + '\n').encode('utf-8'))
-                            
+                if binary:
+                    msg_type, payload = reader.read_frame(self.max_line)
+                    reply = self.process_frame_sync(msg_type, payload, session)
+                else:
+                    line = bytes(reader.read_line(self.max_line)).strip()
+                    if not line:
+                        continue
+                    reply = self.json_line(self.process_message(line.decode('utf-8', errors='replace'), session))
+                if reply:
+                    start = time.perf_counter()
+                    client_sock.sendall(reply)
+                    self.send_time.observe(time.perf_counter() - start)
+            
+            except ConnectionError:
+                break
+            except ValueError as e:
+                # Oversized line or frame; the framing is lost
+                error = {'error': str(e)}
+                client_sock.sendall(wire.encode_json(error) if binary else (json.dumps(error) + '\n').encode('utf-8'))
+                break
             except Exception as e:
                 print(f"Error handling client request: {e}")
                 break
     
-    def process_message(self, message):
+    def process_frame_sync(self, msg_type, payload, session=None):
+        """Blocking-mode counterpart of process_frame"""
+        if msg_type == wire.STATE:
+            if len(payload) < wire.FEATURES.size:
+                return wire.encode_json({'error': 'Invalid state size'})
+            start = time.perf_counter()
+            state = wire.decode_features(payload)
+            self.parse_time.observe(time.perf_counter() - start)
+            error = self.admission.admit(session)
+            if error:
+                return wire.encode_json(error)
+            try:
+                action = self.registry.route(session=session).predict_sync(state)
+            finally:
+                self.admission.release()
+            return wire.encode_action(action)
+        
+        elif msg_type == wire.STATES:
+            return self.process_states_frame(payload, session)
+        
+        elif msg_type == wire.JSON:
+            response = self.process_message(bytes(payload).decode('utf-8', errors='replace'), session)
+            return wire.encode_frame(wire.JSON, response.encode('utf-8'))
+        
+        return wire.encode_json({'error': 'Unknown message type'})
+    
+    def process_message(self, message, session=None):
         """Process a single message from client"""
         try:
+            start = time.perf_counter()
             msg = json.loads(message)
             
             if 'state' in msg:
                 # Inference request
-                state = msg['state']
-                if len(state) != 14:
-                    return json.dumps({'error': 'Invalid state size'})
-                
-                state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-                
-                with torch.no_grad():
-                    action_probs = self.model(state_tensor)
-                    action = action_probs.argmax().item()
+                state, error = self.parse_state(msg['state'])
+                if error:
+                    return error
+                self.parse_time.observe(time.perf_counter() - start)
                 
+                entry = self.registry.route(msg.get('model'), session)
+                error = self.admission.admit(session)
+                if error:
+                    return json.dumps(error)
+                try:
+                    action = entry.predict_sync(state)
+                finally:
+                    self.admission.release()
                 return json.dumps({'action': action})
             
-            elif 'ping' in msg:
-                # Health check
-                return json.dumps({'pong': True})
+            elif 'states' in msg:
+                return self.process_states(msg, session)
             
-            else:
-                return json.dumps({'error': 'Unknown message type'})
+            return self.handle_request(msg)
                 
+        except KeyError as e:
+            return json.dumps({'error': e.args[0] if e.args else 'Unknown model'})
         except json.JSONDecodeError:
             return json.dumps({'error': 'Invalid JSON'})
         except Exception as e:
             return json.dumps({'error': str(e)})
+    
+    def handle_request(self, msg):
+        """Handle non-inference messages"""
+        if 'ping' in msg:
+            # Health check
+            return json.dumps({'pong': True, **self.registry.primary.info(), 'models': self.models_info()})
+        
+        elif 'reload' in msg:
+            # Blocking mode has a single client, so reload in place
+            name = msg.get('model')
+            entries = [self.registry.get(name)] if name is not None else list(self.registry)
+            for entry in entries:
+                entry.load()
+            return json.dumps({'reloaded': True, **entries[0].info(), 'models': self.models_info()})
+        
+        elif 'stats' in msg:
+            return json.dumps({'stats': self.get_stats()})
+        
+        else:
+            return json.dumps({'error': 'Unknown message type'})
+    
+    def parse_state(self, state):
+        """Validate a state list; returns (float32 array, None) or (None, error reply)"""
+        try:
+            state = np.asarray(state, dtype=np.float32)
+        except (TypeError, ValueError):
+            return None, json.dumps({'error': 'Invalid state'})
+        if state.shape != (14,):
+            return None, json.dumps({'error': 'Invalid state size'})
+        return state, None
+    
+    def parse_deadline(self, msg):
+        """Request's deadline_ms (default --deadline-ms); returns (deadline_ms, None) or (None, error reply)"""
+        deadline_ms = msg.get('deadline_ms', self.deadline_ms)
+        # bool is an int subclass; true must not read as a 1 ms deadline
+        valid = isinstance(deadline_ms, (int, float)) and not isinstance(deadline_ms, bool) and deadline_ms > 0
+        if deadline_ms is not None and not valid:
+            return None, json.dumps({'error': 'Invalid deadline_ms'})
+        return deadline_ms, None
+    
+    def parse_states(self, states):
+        """Validate a list of states in one conversion; returns ((N, 14) array, None) or (None, error reply)"""
+        try:
+            states = np.asarray(states, dtype=np.float32)
+        except (TypeError, ValueError):
+            # Ragged rows or non-numbers
+            return None, json.dumps({'error': 'Invalid states'})
+        if states.ndim != 2 or states.shape[1] != 14 or not len(states):
+            return None, json.dumps({'error': 'Invalid state size'})
+        return states, None
+    
+    def process_states(self, msg, session=None):
+        """{'states': [[...], ...]} -> {'actions': [...]} (plus 'q_values' if requested) from one forward"""
+        start = time.perf_counter()
+        states, error = self.parse_states(msg['states'])
+        if error:
+            return error
+        self.parse_time.observe(time.perf_counter() - start)
+        entry = self.registry.route(msg.get('model'), session)
+        error = self.admission.admit(session, count=len(states))
+        if error:
+            return json.dumps(error)
+        try:
+            q_values = entry.q_values_sync(states)
+        finally:
+            self.admission.release(len(states))
+        response = {'actions': q_values.argmax(axis=1).tolist()}
+        if msg.get('q_values'):
+            response['q_values'] = q_values.tolist()
+        return json.dumps(response)
+    
+    async def process_states_async(self, msg, session=None):
+        """Async-mode process_states: each state is admitted and answered like a 'state' request"""
+        start = time.perf_counter()
+        states, error = self.parse_states(msg['states'])
+        if error:
+            return error
+        self.parse_time.observe(time.perf_counter() - start)
+        deadline_ms, error = self.parse_deadline(msg)
+        if error:
+            return error
+        entry = self.registry.route(msg.get('model'), session)
+        error = self.admission.admit(session, self.drain_ms(entry), len(states))
+        if error:
+            return json.dumps(error)
+        try:
+            actions, q_values = await self.predict_states(entry, states, deadline_ms, msg.get('q_values'))
+        finally:
+            self.admission.release(len(states))
+        response = {'actions': actions}
+        if q_values is not None:
+            response['q_values'] = q_values.tolist()
+        return json.dumps(response)
+    
+    async def predict_states(self, entry, states, deadline_ms=None, with_q_values=False):
+        """Actions (and Q-values if asked) for an (N, 14) array without blocking the event loop.
+
+        Actions come from the model's batch scheduler, one submission per
+        state, so the action cache and deadlines apply as for 'state'
+        requests. Q-values need the raw forward pass, which runs in the
+        default executor instead.
+        """
+        if with_q_values:
+            q_values = await asyncio.get_running_loop().run_in_executor(None, entry.q_values_sync, states)
+            return q_values.argmax(axis=1).tolist(), q_values
+        results = await asyncio.gather(*(entry.predict(state, deadline_ms) for state in states),
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results, None
+    
+    def process_states_frame(self, payload, session=None):
+        """STATES frame -> ACTIONS frame"""
+        start = time.perf_counter()
+        states = wire.decode_states(payload)
+        if states is None or not len(states):
+            return wire.encode_json({'error': 'Invalid state size'})
+        self.parse_time.observe(time.perf_counter() - start)
+        error = self.admission.admit(session, count=len(states))
+        if error:
+            return wire.encode_json(error)
+        try:
+            return wire.encode_actions(self.registry.route(session=session).predict_batch_sync(states))
+        except Exception as e:
+            return wire.encode_json({'error': str(e)})
+        finally:
+            self.admission.release(len(states))
+    
+    async def process_states_frame_async(self, payload, session=None):
+        """Async-mode process_states_frame, answered through predict_states"""
+        start = time.perf_counter()
+        states = wire.decode_states(payload)
+        if states is None or not len(states):
+            return wire.encode_json({'error': 'Invalid state size'})
+        self.parse_time.observe(time.perf_counter() - start)
+        entry = self.registry.route(session=session)
+        error = self.admission.admit(session, self.drain_ms(entry), len(states))
+        if error:
+            return wire.encode_json(error)
+        try:
+            actions, _ = await self.predict_states(entry, states, self.deadline_ms)
+            return wire.encode_actions(actions)
+        except Exception as e:
+            return wire.encode_json({'error': str(e)})
+        finally:
+            self.admission.release(len(states))
+    
+    def q_values(self, states, model=None):
+        """Q-values for a (N, 14) float32 array as a NumPy array"""
+        model = model if model is not None else self.model
+        if self.backend == 'numpy':
+            return model(states)
+        import torch
+        with torch.no_grad():
+            return model(torch.from_numpy(states).to(self.device)).cpu().numpy()
+    
+    def drain_ms(self, entry=None):
+        """Rough time for the requests already in flight to be answered by `entry` (default: the primary model)"""
+        scheduler = entry.scheduler if entry is not None else self.scheduler
+        batches = self.admission.inflight / self.max_batch_size + 1
+        return self.max_wait_ms + batches * scheduler.forward_time * 1000.0
+    
+    def get_stats(self):
+        return {
+            'pid': os.getpid(),
+            'worker': self.worker_id,
+            'connections': self.active_connections,
+            'admission': self.admission.stats(),
+            'parse_ms': self.parse_time.summary(1000.0),
+            'send_ms': self.send_time.summary(1000.0),
+            'models': {entry.name: entry.stats() for entry in self.registry},
+        }
+
+    def metrics_text(self):
+        """All counters and stage histograms in the Prometheus text format"""
+        entries = list(self.registry)
+        
+        def per_model(value):
+            return [({'model': e.name}, value(e)) for e in entries]
+        
+        admission = self.admission
+        metrics = [
+            ('pong_connections', 'gauge', 'Open client connections', [({}, self.active_connections)]),
+            ('pong_inflight_requests', 'gauge', 'State requests admitted and not yet answered',
+             [({}, admission.inflight)]),
+            ('pong_shed_total', 'counter', 'State requests refused by admission control',
+             [({'reason': 'overloaded'}, admission.shed_overloaded),
+              ({'reason': 'rate_limited'}, admission.shed_rate_limited)]),
+            ('pong_parse_seconds', 'histogram', 'Time to decode and validate a state request',
+             [({}, self.parse_time)]),
+            ('pong_send_seconds', 'histogram', 'Time to write a reply to the socket', [({}, self.send_time)]),
+            ('pong_model_version', 'gauge', 'Weights version, incremented on reload', per_model(lambda e: e.version)),
+            ('pong_requests_total', 'counter', 'State requests answered', per_model(lambda e: e.requests)),
+            ('pong_errors_total', 'counter', 'State requests that failed', per_model(lambda e: e.errors)),
+            ('pong_deadline_misses_total', 'counter', 'State requests answered by the heuristic fallback',
+             per_model(lambda e: e.deadline_misses)),
+            ('pong_request_seconds', 'histogram', 'Time from a parsed state to its action',
+             per_model(lambda e: e.latency_snapshot())),
+            ('pong_queue_seconds', 'histogram', 'Time a state waited for its batch',
+             per_model(lambda e: e.scheduler.queue_wait)),
+            ('pong_forward_seconds', 'histogram', 'Time per batched forward pass',
+             per_model(lambda e: e.scheduler.forward)),
+            ('pong_batch_size', 'histogram', 'States per forward pass', per_model(lambda e: e.scheduler.batch_size)),
+            ('pong_queue_depth', 'gauge', 'States waiting for a batch',
+             per_model(lambda e: e.scheduler.queue.qsize() if e.scheduler.queue is not None else 0)),
+        ]
+        cached = [e for e in entries if e.cache is not None]
+        if cached:
+            for name, attr, help_text in [('pong_cache_hits_total', 'hits', 'Action cache hits'),
+                                          ('pong_cache_misses_total', 'misses', 'Action cache misses'),
+                                          ('pong_cache_evictions_total', 'evictions', 'Action cache evictions')]:
+                metrics.append((name, 'counter', help_text,
+                                [({'model': e.name}, getattr(e.cache, attr)) for e in cached]))
+        if self.worker_id is not None:
+            for _, _, _, samples in metrics:
+                for labels, _ in samples:
+                    labels['worker'] = self.worker_id
+        return exposition(metrics)
 
 def main():
     parser = argparse.ArgumentParser(description='AI Inference Server for Pong')
     parser.add_argument('--model', type=str, default='../../models/dqn_model.pth',
                        help='Path to trained model')
+    parser.add_argument('--models', type=str, nargs='+', default=None, metavar='NAME=PATH[:WEIGHT]',
+                       help='Serve several named models (overrides --model); unnamed requests are '
+                            'split between them by weight, per connection')
     parser.add_argument('--host', type=str, default='localhost',
                        help='Server host')
     parser.add_argument('--port', type=int, default=5001,
                        help='Server port')
+    parser.add_argument('--unix-socket', type=str, default=None, metavar='PATH',
+                       help='Listen on a Unix domain socket instead of --host/--port (same protocol)')
+    parser.add_argument('--shm', type=str, default=None, metavar='NAME',
+                       help='Also serve one co-located client over a shared-memory ring of this name '
+                            '(x86-64 only: the ring relies on its store ordering)')
+    parser.add_argument('--shm-slots', type=int, default=256,
+                       help='Slots in the shared-memory ring (maximum outstanding requests)')
+    parser.add_argument('--mode', type=str, choices=['async', 'blocking'], default='async',
+                       help='Serve many clients concurrently (async) or one at a time (blocking)')
+    parser.add_argument('--backlog', type=int, default=512,
+                       help='Listen backlog for pending connections')
+    parser.add_argument('--max-batch-size', type=int, default=64,
+                       help='Maximum number of states coalesced into one forward pass (async mode)')
+    parser.add_argument('--max-wait-ms', type=float, default=1.0,
+                       help='Maximum time a state waits for its batch to fill (async mode)')
+    parser.add_argument('--deadline-ms', type=float, default=None,
+                       help='Latency budget per state request (async mode); requests that cannot be '
+                            'answered in time get a ball-tracking heuristic action. JSON requests may '
+                            'override it with "deadline_ms"')
+    parser.add_argument('--max-pending', type=int, default=256,
+                       help='Unanswered requests buffered per connection before reading from it pauses')
+    parser.add_argument('--max-inflight', type=int, default=4096,
+                       help='State requests in flight across all connections before new ones are shed '
+                            'with an "overloaded" error; a batch counts one per state')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                       help='Maximum state requests per second per connection (default: unlimited)')
+    parser.add_argument('--rate-burst', type=float, default=None,
+                       help='Burst size for --rate-limit (default: one second of requests)')
+    parser.add_argument('--cache-size', type=int, default=0,
+                       help='Cache up to N actions per model keyed on the quantized state (0 disables)')
+    parser.add_argument('--cache-quantum', type=str, default='1.0',
+                       help='Rounding step of the cache key: one value or 14 comma-separated '
+                            'per-feature values (0 keeps a feature exact)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus-style text metrics at http://HOST:PORT/metrics and JSON '
+                            'stats at /stats (with --workers, worker i uses PORT + i)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of serving processes sharing the port via SO_REUSEPORT (async mode)')
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                       help='Torch intra-op threads per worker process (with --workers > 1; '
+                            'default: --threads, e.g. from --profile, else 1)')
+    parser.add_argument('--watch', action='store_true',
+                       help='Hot-reload a model when its file changes (with --workers, worker 0 watches '
+                            'and the others load the same version)')
+    parser.add_argument('--watch-interval', type=float, default=2.0,
+                       help='Seconds between checks of the model files (with --watch)')
+    parser.add_argument('--backend', type=str, choices=['torch', 'int8', 'numpy'], default='torch',
+                       help='Inference backend; int8 quantizes the model for CPU, numpy serves an '
+                            'exported .npz without importing torch')
+    parser.add_argument('--calibration-data', type=str, default=None,
+                       help='bc_data.npz-style dataset used to calibrate the int8 backend')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='Torch intra-op threads (default: torch default)')
+    parser.add_argument('--profile', type=str, default=None,
+                       help='Tuned profile from autotune.py; its backend, threads and max batch size '
+                            'replace the defaults, explicit flags still win')
     
+    args, _ = parser.parse_known_args()
+    if args.profile:
+        from .autotune import load_profile
+        try:
+            parser.set_defaults(**load_profile(args.profile))
+        except (OSError, ValueError) as e:
+            parser.error(f"Cannot load profile: {e}")
     args = parser.parse_args()
     
-    server = InferenceServer(args.model, args.host, args.port)
-    server.start_server()
+    try:
+        cache_quantum = parse_quantum(args.cache_quantum)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.workers > 1 and (args.unix_socket or args.shm):
+        parser.error("--unix-socket and --shm serve a single process; use --workers 1")
+    
+    models = None
+    if args.models:
+        try:
+            models = [parse_model_spec(spec) for spec in args.models]
+        except ValueError as e:
+            parser.error(str(e))
+    
+    server = InferenceServer(args.model, args.host, args.port, backlog=args.backlog,
+                             max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                             backend=args.backend,
+                             watch_interval=args.watch_interval if args.watch else None,
+                             models=models, calibration_data=args.calibration_data,
+                             deadline_ms=args.deadline_ms, max_pending=args.max_pending,
+                             max_inflight=args.max_inflight, rate_limit=args.rate_limit,
+                             rate_burst=args.rate_burst, cache_size=args.cache_size,
+                             cache_quantum=cache_quantum, unix_socket=args.unix_socket,
+                             shm_name=args.shm, shm_slots=args.shm_slots, metrics_port=args.metrics_port,
+                             threads=args.threads)
+    if args.mode == 'async' and args.workers > 1:
+        threads_per_worker = args.threads_per_worker or args.threads or 1
+        if args.threads and args.threads_per_worker and args.threads_per_worker != args.threads:
+            print(f"Warning: --threads-per-worker {args.threads_per_worker} overrides --threads "
+                  f"{args.threads}{' from the profile' if args.profile else ''} in the worker processes")
+        server.start_workers(args.workers, threads_per_worker)
+    elif args.mode == 'async':
+        server.start_async_server()
+    else:
+        server.start_server()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,129 @@
+import bisect
+import json
+import threading
+
+# Log-spaced latency buckets from 1 us to 10 s, ten per decade (~26% wide)
+LATENCY_BOUNDS = [round(10 ** (e / 10.0), 9) for e in range(-60, 11)]
+# Finer buckets for load testing: 1 us to 100 s, a hundred per decade (~2.3% wide)
+FINE_LATENCY_BOUNDS = [round(10 ** (e / 100.0), 9) for e in range(-600, 201)]
+# Batch sizes 1, 2, 4, ... 4096
+BATCH_BOUNDS = [2 ** e for e in range(13)]
+
+class Histogram:
+    """Fixed-bucket histogram: O(log buckets) to record, constant memory.
+
+    Quantiles are interpolated inside the bucket that contains them, so they
+    are accurate to the bucket width.
+    """
+
+    def __init__(self, bounds=LATENCY_BOUNDS):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def copy(self):
+        other = Histogram(self.bounds)
+        other.counts = list(self.counts)
+        other.count, other.sum, other.max = self.count, self.sum, self.max
+        return other
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                value = lower + (upper - lower) * (rank - seen) / n
+                return min(value, self.max)
+            seen += n
+        return self.max
+
+    def summary(self, scale=1.0):
+        """count, mean, p50/p90/p99 and max, multiplied by `scale` (1000.0 for ms)"""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': self.sum / self.count * scale,
+            'p50': self.quantile(0.50) * scale,
+            'p90': self.quantile(0.90) * scale,
+            'p99': self.quantile(0.99) * scale,
+            'max': self.max * scale,
+        }
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels.items()) + '}'
+
+def exposition(metrics):
+    """Prometheus-style text for (name, kind, help, [(labels, value), ...]) tuples.
+
+    Histogram values are Histogram objects; others are numbers.
+    """
+    lines = []
+    for name, kind, help_text, samples in metrics:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in samples:
+            if kind != 'histogram':
+                lines.append(f'{name}{format_labels(labels)} {float(value):g}')
+                continue
+            cumulative = 0
+            for bound, n in zip(value.bounds + [float('inf')], value.counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                lines.append(f'{name}_bucket{format_labels({**labels, "le": le})} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {value.sum:g}')
+            lines.append(f'{name}_count{format_labels(labels)} {value.count}')
+    return '\n'.join(lines) + '\n'
+
+class MetricsHTTPServer:
+    """Plain-text /metrics and JSON /stats over HTTP on a background thread"""
+
+    def __init__(self, host, port, render_text, render_stats):
+        # Imported here: http.server is a noticeable share of server startup without --metrics-port
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body, content_type = render_text().encode('utf-8'), 'text/plain; version=0.0.4'
+                elif path == '/stats':
+                    body, content_type = json.dumps(render_stats()).encode('utf-8'), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would flood stdout
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='metrics-http', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -13,4 +13,21 @@ class DQN(nn.Module):
         )
 
     def forward(self, x):
-        return self.net(x)
\ No newline at end of file
+        return self.net(x)
+
+def load_policy_state_dict(path, map_location='cpu'):
+    """Load DQN weights from a bare state dict, a full DQNAgent checkpoint or raw weights.
+
+    Checkpoints are loaded with weights_only=True, so nothing but tensors and
+    plain containers is unpickled; .raw files are memory-mapped.
+    """
+    if str(path).endswith('.raw'):
+        from .numpy_backend import load_raw
+        # Copy out of the read-only mapping; torch tensors must be writable
+        return {key: torch.from_numpy(array.copy()).to(map_location) for key, array in load_raw(path).items()}
+    checkpoint = torch.load(path, map_location=map_location, weights_only=True)
+    if 'policy_net' in checkpoint:
+        # Full checkpoint
+        return checkpoint['policy_net']
+    # Just state dict
+    return checkpoint
@@ -0,0 +1,281 @@
+import asyncio
+import hashlib
+import os
+import random
+import threading
+import time
+import numpy as np
+from .batching import BatchScheduler, DeadlineExceeded
+from .cache import ActionCache
+from .metrics import Histogram
+
+def heuristic_action(state, dead_zone=10.0):
+    """Ball-tracking fallback action, the same rule as the game's built-in bot.
+
+    Moves the bot paddle centre toward the first ball's y; indexes follow
+    PongEnv's action space (0: down, 1: stay, 2: up).
+    """
+    diff = state[1] - state[9]  # ball y - bot paddle centre y
+    if abs(diff) <= dead_zone:
+        return 1
+    return 0 if diff > 0 else 2
+
+class ServedModel:
+    """One named model: its weights, batch scheduler, version and traffic counters.
+
+    Loading and the forward pass are delegated to the owning InferenceServer so
+    every model uses the server's backend and device.
+    """
+
+    def __init__(self, name, path, server, weight=1.0):
+        self.name = name
+        self.path = path
+        self.server = server
+        self.weight = weight
+        self.model = None
+        self.version = 0
+        self.hash = None
+        self.loaded_stat = None  # file_stat() of the weights being served
+        self.published = None  # Shared with forked workers: the newest version any of them loaded
+        self.reload_lock = None
+        self.scheduler = BatchScheduler(self.infer_batch, server.max_batch_size, server.max_wait_ms)
+        self.cache = ActionCache(server.cache_size, server.cache_quantum) if server.cache_size else None
+        # Traffic counters; the shm ring thread updates them alongside the event loop
+        self.counter_lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.deadline_misses = 0  # Answered by heuristic_action instead of the model
+        self.latency = Histogram()  # Seconds from receipt to action, per request
+
+    def load(self):
+        self.activate(*self.prepare())
+
+    def prepare(self):
+        """Build and warm up the model; safe to run off the serving thread"""
+        stat = self.file_stat()  # Before reading, so a write that races the load is seen as a change
+        with open(self.path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        model = self.server.build_model(self.path)
+        # One full-size forward so the first real batch does not pay for lazy init
+        self.server.q_values(np.zeros((self.scheduler.max_batch_size, 14), dtype=np.float32), model)
+        return model, digest, stat
+
+    def activate(self, model, digest, stat, version=None):
+        # A single reference swap; batches always see either the old or the new model
+        self.model = model
+        self.hash = digest
+        self.loaded_stat = stat
+        if version is None:
+            version = self.version + 1
+            if self.published is not None:
+                # Workers number reloads together, so every worker reports the same version
+                with self.published.get_lock():
+                    self.published.value += 1
+                    version = self.published.value
+        self.version = version
+        if self.cache is not None:
+            self.cache.clear()  # Actions of the old weights
+
+    def stale_version(self):
+        """The newer version another worker published, or None if these weights are current"""
+        if self.published is not None and self.published.value > self.version:
+            return self.published.value
+        return None
+
+    async def reload(self, version=None):
+        """Load and warm the new weights in a thread, then swap them in between batches.
+
+        `version` catches up with weights another worker already published;
+        without it the reload publishes the next version.
+        """
+        if self.reload_lock is None:
+            self.reload_lock = asyncio.Lock()
+        async with self.reload_lock:
+            loop = asyncio.get_running_loop()
+            model, digest, stat = await loop.run_in_executor(None, self.prepare)
+            # Batches run on this event loop thread, so the swap cannot land mid-batch
+            self.activate(model, digest, stat, version)
+        print(f"Model '{self.name}' reloaded (version {self.version}, {digest})")
+        return self.info()
+
+    def file_stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def infer_batch(self, states):
+        """Run one forward pass over a (N, 14) float32 array and return greedy actions"""
+        return self.server.q_values(states, self.model).argmax(axis=1)
+
+    async def predict(self, state, deadline_ms=None):
+        """Action for one state, batched with other requests for this model.
+
+        With a deadline, a request the model cannot answer in time gets the
+        heuristic action instead of a late one.
+        """
+        start = time.perf_counter()
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(state)
+            action = self.cache.get(key)
+            if action is not None:
+                self.record(start)
+                return action
+        deadline = start + deadline_ms / 1000.0 if deadline_ms is not None else None
+        version = self.version
+        try:
+            action = await self.scheduler.submit(state, deadline)
+        except DeadlineExceeded:
+            self.deadline_misses += 1
+            action = heuristic_action(state)
+            key = None  # Never cache the fallback
+        except Exception:
+            self.count_error()
+            raise
+        if key is not None and version == self.version:
+            self.cache.put(key, action)
+        self.record(start)
+        return action
+
+    def predict_sync(self, state):
+        """Unbatched prediction for the blocking server"""
+        start = time.perf_counter()
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(state)
+            action = self.cache.get(key)
+            if action is not None:
+                self.record(start)
+                return action
+        try:
+            action = int(self.infer_batch(state[None, :])[0])
+        except Exception:
+            self.count_error()
+            raise
+        if key is not None:
+            self.cache.put(key, action)
+        self.record(start)
+        return action
+
+    def predict_batch_sync(self, states):
+        """Actions for an (N, 14) array in one forward pass, outside the scheduler"""
+        return self.q_values_sync(states).argmax(axis=1)
+
+    def q_values_sync(self, states):
+        """Q-values for an (N, 14) array in one forward pass, counted as N requests"""
+        start = time.perf_counter()
+        try:
+            q_values = self.server.q_values(np.asarray(states, dtype=np.float32), self.model)
+        except Exception:
+            self.count_error()
+            raise
+        self.record(start, len(q_values))
+        return q_values
+
+    def record(self, start, requests=1):
+        elapsed = time.perf_counter() - start
+        with self.counter_lock:
+            self.requests += requests
+            self.latency.observe(elapsed)
+
+    def count_error(self):
+        with self.counter_lock:
+            self.errors += 1
+
+    def latency_snapshot(self):
+        """Copy of the latency histogram that the shm ring thread cannot change mid-read"""
+        with self.counter_lock:
+            return self.latency.copy()
+
+    def info(self):
+        return {'model_version': self.version, 'model_hash': self.hash}
+
+    def stats(self):
+        uptime = time.monotonic() - self.started
+        with self.counter_lock:
+            requests, errors = self.requests, self.errors
+            latency = self.latency.copy()
+        stats = {
+            **self.info(),
+            'path': self.path,
+            'weight': self.weight,
+            'requests': requests,
+            'errors': errors,
+            'deadline_misses': self.deadline_misses,
+            'throughput_rps': requests / uptime if uptime > 0 else 0.0,
+            'batching': self.scheduler.stats(),
+        }
+        if self.cache is not None:
+            stats['cache'] = self.cache.stats()
+        if latency.count:
+            stats['latency_ms'] = latency.summary(1000.0)
+        return stats
+
+class ModelRegistry:
+    """Named models with weighted A/B routing for requests that do not pick one.
+
+    Unnamed traffic is split by weight per session (one connection), so a game
+    keeps playing against the same model for its whole connection.
+    """
+
+    def __init__(self, seed=None):
+        self.models = {}  # Insertion ordered; the first model is the primary
+        self.rng = random.Random(seed)
+
+    def add(self, entry):
+        if entry.name in self.models:
+            raise ValueError(f"Duplicate model name: {entry.name}")
+        self.models[entry.name] = entry
+
+    def __iter__(self):
+        return iter(self.models.values())
+
+    def __len__(self):
+        return len(self.models)
+
+    @property
+    def primary(self):
+        return next(iter(self.models.values()))
+
+    def get(self, name):
+        try:
+            return self.models[name]
+        except KeyError:
+            raise KeyError(f"Unknown model: {name}") from None
+
+    def choose(self):
+        """Weighted random pick among models with a positive weight"""
+        entries = [entry for entry in self.models.values() if entry.weight > 0]
+        if not entries:
+            return self.primary
+        return self.rng.choices(entries, weights=[entry.weight for entry in entries])[0]
+
+    def route(self, name=None, session=None):
+        """Model for a request: explicit name, the session's A/B arm, or a fresh weighted pick"""
+        if name is not None:
+            return self.get(name)
+        if session is None:
+            return self.choose()
+        if 'model' not in session:
+            session['model'] = self.choose().name
+        return self.models[session['model']]
+
+def parse_model_spec(spec):
+    """Parse NAME=PATH[:WEIGHT] into (name, path, weight)"""
+    name, sep, rest = spec.partition('=')
+    if not sep or not name or not rest:
+        raise ValueError(f"Invalid model spec '{spec}', expected NAME=PATH[:WEIGHT]")
+    path, weight = rest, 1.0
+    head, sep, tail = rest.rpartition(':')
+    if sep:
+        try:
+            weight = float(tail)
+            path = head
+        except ValueError:
+            pass  # A ':' that belongs to the path
+    if weight < 0:
+        raise ValueError(f"Negative weight in model spec '{spec}'")
+    return name, path, weight
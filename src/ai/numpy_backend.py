@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import re
+import sys
+import numpy as np
+if __package__ in (None, ''):
+    # Run as a script: load the rest of the package as `ai`, never as top-level modules
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import ai  # noqa: F401
+    __package__ = 'ai'
+
+# Pure-NumPy forward pass for the DQN MLP so the inference server can run
+# without importing torch. Weights are exported once from any checkpoint
+# format InferenceServer.load_model understands into a compact .npz holding
+# the policy network's state dict arrays (float32).
+#
+# The .raw format holds the same arrays uncompressed and 64-byte aligned
+# behind a small JSON header, so they are memory-mapped instead of read,
+# decompressed or unpickled:
+#   0   magic b'PEW1', uint32 header length
+#   8   JSON header {"arrays": [{"name", "dtype", "shape", "offset"}, ...]}
+#   ... array data at the recorded absolute offsets
+
+LAYER_KEY = re.compile(r'^net\.(\d+)\.weight$')
+RAW_MAGIC = b'PEW1'
+RAW_SUFFIX = '.raw'
+RAW_ALIGN = 64
+
+class NumpyDQN:
+    """Linear/ReLU stack evaluated with float32 NumPy matmuls"""
+
+    def __init__(self, weights):
+        indices = sorted(int(m.group(1)) for m in map(LAYER_KEY.match, weights) if m)
+        if not indices:
+            raise ValueError("No 'net.<i>.weight' arrays found in weights")
+        # Pre-transpose to (in, out) so each layer is a single contiguous x @ W + b
+        self.layers = [
+            (np.ascontiguousarray(np.asarray(weights[f'net.{i}.weight'], dtype=np.float32).T),
+             np.asarray(weights[f'net.{i}.bias'], dtype=np.float32))
+            for i in indices
+        ]
+        self.input_size = self.layers[0][0].shape[0]
+        self.output_size = self.layers[-1][0].shape[1]
+
+    @classmethod
+    def load(cls, path):
+        """Load from an exported .raw or .npz, or convert a torch checkpoint (imports torch)"""
+        if path.endswith(RAW_SUFFIX):
+            return cls(load_raw(path))
+        if path.endswith('.npz'):
+            with np.load(path) as data:
+                return cls({key: data[key] for key in data.files})
+        return cls(state_dict_to_arrays(path))
+
+    def __call__(self, states):
+        """Q-values for a (N, input_size) float32 array"""
+        x = np.asarray(states, dtype=np.float32)
+        last = len(self.layers) - 1
+        for i, (weight, bias) in enumerate(self.layers):
+            x = x @ weight
+            x += bias
+            if i < last:
+                np.maximum(x, 0.0, out=x)
+        return x
+
+def save_raw(arrays, path):
+    """Write named arrays in the memory-mappable .raw layout"""
+    entries = []
+    # Offsets depend on the header length, which depends on the offsets; reserve room for them
+    for name, array in arrays.items():
+        entries.append({'name': name, 'dtype': np.asarray(array).dtype.str,
+                        'shape': list(np.shape(array)), 'offset': 0})
+    header_size = len(json.dumps({'arrays': entries})) + 20 * len(entries)
+    offset = _align(8 + header_size)
+    for entry, array in zip(entries, arrays.values()):
+        entry['offset'] = offset
+        offset = _align(offset + np.asarray(array).nbytes)
+    header = json.dumps({'arrays': entries}).encode('utf-8').ljust(header_size)
+
+    with open(path, 'wb') as f:
+        f.write(RAW_MAGIC + len(header).to_bytes(4, 'little') + header)
+        for entry, array in zip(entries, arrays.values()):
+            f.write(bytes(entry['offset'] - f.tell()))
+            f.write(np.asarray(array).tobytes())
+
+def load_raw(path):
+    """Read-only memory-mapped arrays from a .raw weights file"""
+    with open(path, 'rb') as f:
+        prefix = f.read(8)
+        if len(prefix) < 8 or prefix[:4] != RAW_MAGIC:
+            raise ValueError(f"{path} is not a raw weights file")
+        header = json.loads(f.read(int.from_bytes(prefix[4:], 'little')))
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    return {
+        entry['name']: np.ndarray(tuple(entry['shape']), dtype=np.dtype(entry['dtype']),
+                                  buffer=data, offset=entry['offset'])
+        for entry in header['arrays']
+    }
+
+def _align(offset):
+    return (offset + RAW_ALIGN - 1) // RAW_ALIGN * RAW_ALIGN
+
+def state_dict_to_arrays(model_path):
+    """Read policy weights from a torch checkpoint as float32 NumPy arrays"""
+    import torch  # Only needed for conversion, not for serving
+    from .model import load_policy_state_dict
+    state_dict = load_policy_state_dict(model_path, map_location='cpu')
+    return {key: value.detach().to(torch.float32).numpy() for key, value in state_dict.items()}
+
+def export_npz(model_path, output_path):
+    """Export policy_net weights from a checkpoint into a .npz (or .raw) for the numpy backend"""
+    arrays = state_dict_to_arrays(model_path)
+    # Validate before writing so a bad checkpoint never produces a deployable file
+    NumpyDQN(arrays)
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    if output_path.endswith(RAW_SUFFIX):
+        save_raw(arrays, output_path)
+    else:
+        np.savez(output_path, **arrays)
+    print(f"Exported {len(arrays)} arrays from {model_path} to {output_path}")
+    return output_path
+
+def main():
+    parser = argparse.ArgumentParser(description='Export DQN weights for the NumPy inference backend')
+    parser.add_argument('--model', type=str, required=True,
+                        help='Path to a trained model or checkpoint (.pth)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Output .npz path, or .raw for the memory-mapped format (default: .npz next to the model)')
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.model)[0] + '.npz'
+    export_npz(args.model, output)
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,11 @@ import socket
 import json
 import time
 import numpy as np
+from . import protocol as wire
+from .pong_sim import PongSim
 
 class PongEnv(gym.Env):
-    def __init__(self, mode='socket', host='localhost', port=6000):
+    def __init__(self, mode='socket', host='localhost', port=6000, protocol='json', lockstep=True):
         super().__init__()
         self.action_space = gym.spaces.Discrete(3)  # 0: down (-1), 1: none (0), 2: up (1)
         self.observation_space = gym.spaces.Dict({
@@ -41,18 +43,37 @@ class PongEnv(gym.Env):
                 'time_left': gym.spaces.Box(low=0, high=20, shape=()),
             })),
         })
-        self.mode = mode
+        self.mode = mode  # 'socket' (the game on host:port) or 'sim' (in-process PongSim, no network)
         self.host = host
         self.port = port
+        self.protocol = protocol  # 'json' or 'binary' (falls back to JSON if the game refuses)
+        self.lockstep = lockstep  # Ask the game for one tick per step instead of real time
+        self.server_lockstep = False  # Whether the connected game actually steps in lockstep
         self.sock = None
+        self.reader = None
+        self.binary = False
+        self.sim = None
         self.last_scores = {'player': 0, 'bot': 0}
 
     def reset(self):
+        if self.mode == 'sim':
+            # Each episode is a fresh game, like restarting the server
+            self.sim = PongSim()
+            state = self.sim.state()
+            self.last_scores = state['scores']
+            return state
         if self.sock:
             self.sock.close()
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.connect((self.host, self.port))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.reader = wire.SocketReader(self.sock)
+            self.binary = self.protocol == 'binary' and wire.negotiate_binary(self.sock, self.reader)
+            if self.protocol == 'json':
+                self.sock.sendall(wire.encode_hello(self.lockstep))
+            self.server_lockstep = False
+            self._lockstep_requested = False
             # Get initial state
             state = self._recv_state()
             self.last_scores = state['scores']
@@ -66,11 +87,19 @@ class PongEnv(gym.Env):
     def step(self, action):
         try:
             action_val = action - 1  # 0->-1, 1->0, 2->1
-            action_msg = {
-                'type': 'action',
-                'data': {'action': action_val, 'timestamp': time.time()}
-            }
-            self.sock.send((json.dumps(action_msg) + '\n').encode('utf-8'))
+            if self.sim is not None:
+                state = self.sim.step(action_val)
+                reward = (state['scores']['player'] - self.last_scores['player']) - (state['scores']['bot'] - self.last_scores['bot'])
+                self.last_scores = state['scores']
+                return state, reward, False, {}
+            if self.binary:
+                self.sock.sendall(wire.encode_action(action_val))
+            else:
+                action_msg = {
+                    'type': 'action',
+                    'data': {'action': action_val, 'timestamp': time.time()}
+                }
+                self.sock.sendall((json.dumps(action_msg) + '\n').encode('utf-8'))
             # Receive new state
             state = self._recv_state()
             # Reward based on score change
@@ -92,18 +121,35 @@ class PongEnv(gym.Env):
 
     def _recv_state(self):
         try:
-            buffer = ""
-            while not buffer.endswith('\n'):
-                data = self.sock.recv(4096).decode('utf-8')
-                if not data:
-                    raise ConnectionError("Connection lost")
-                buffer += data
-            msg = json.loads(buffer.strip())
+            if self.binary:
+                state = None
+                # A lockstep request is answered right after the first state; wait for it
+                while state is None or self._lockstep_requested:
+                    msg_type, payload = self.reader.read_frame()
+                    if msg_type == wire.STATE:
+                        state = wire.decode_state(payload)
+                    elif msg_type == wire.JSON:
+                        self._handle_control(json.loads(bytes(payload)))
+                return state
+            msg = json.loads(bytes(self.reader.read_line()))
+            # Games started with --lockstep say so in every state line
+            self.server_lockstep = bool(msg.get('lockstep', False))
             return msg['data']
         except Exception as e:
             print(f"Error receiving state: {e}")
             raise
 
+    def _handle_control(self, msg):
+        """Ask for lockstep stepping after the game's hello frame; only the game's reply turns it on"""
+        if msg.get('type') == 'hello' and 'lockstep' in msg:
+            self.server_lockstep = bool(msg['lockstep'])
+            if self.lockstep and not self.server_lockstep:
+                self.sock.sendall(wire.encode_json({'lockstep': True}))
+                self._lockstep_requested = True
+        elif msg.get('type') == 'lockstep':
+            self.server_lockstep = bool(msg['lockstep'])
+            self._lockstep_requested = False
+
     def _get_default_state(self):
         """Return a default state when connection fails"""
         return {
@@ -0,0 +1,298 @@
+import json
+import math
+import os
+import numpy as np
+
+# In-process re-implementation of the game logic in src/game (Game::update,
+# Ball, Paddle, PowerUp, PowerUpManager) for training without the SFML game.
+# One step() is one Game::update(fixedDt) in --server mode with the given bot
+# action. Arithmetic is float32 in the same operation order as the C++ code,
+# shape bounds follow SFML's CircleShape/RectangleShape geometry, and rand()
+# follows glibc's generator, as the game's Random does, so states match the game bit for bit (see
+# tests/unit/test_pong_sim.py, which replays traces recorded from the C++
+# sources).
+
+f32 = np.float32
+
+FIXED_DT = f32(1.0) / f32(60.0)
+WIDTH, HEIGHT = f32(800), f32(600)
+BALL_RADIUS = f32(10)
+BALL_SPEED = f32(300)
+PADDLE_WIDTH, PADDLE_HEIGHT = f32(20), f32(100)
+PADDLE_SPEED = f32(600)
+PLAYER_START = (f32(10), f32(250))
+BOT_START = (f32(770), f32(250))
+POWER_UP_RADIUS = f32(15)
+POWER_UP_SPEED = f32(100)
+SLOW_MOTION = f32(0.5)
+RAND_SEED = 42  # Ball() reseeds rand() with the game's seed (--seed, default this) on every construction
+
+# PowerUpType enum order; spawn timers are visited in this order (std::map)
+POWER_UP_TYPES = ('ExtendPaddle', 'SplitBall', 'SlowMotion')
+EXTEND_PADDLE, SPLIT_BALL, SLOW_MOTION_TYPE = range(3)
+DEFAULT_POWERUPS = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'game', 'powerups.json')
+
+_ZERO = f32(0)
+_ONE = f32(1)
+_TWO = f32(2)
+
+class GlibcRand:
+    """glibc srand()/rand() (the default TYPE_3 additive feedback generator)"""
+
+    _seeded = {}
+
+    def __init__(self, seed=1):
+        self.srand(seed)
+
+    def srand(self, seed):
+        cached = self._seeded.get(seed)
+        if cached is None:
+            r = [seed or 1]
+            for _ in range(30):
+                r.append(16807 * r[-1] % 2147483647)
+            r += r[:3]
+            self.r = r
+            for _ in range(310):
+                self.rand()
+            cached = self._seeded[seed] = list(self.r)
+        self.r = list(cached)
+
+    def rand(self):
+        r = self.r
+        value = (r[-31] + r[-3]) & 0xffffffff
+        r.append(value)
+        del r[0]
+        return value >> 1
+
+def _cosf(x):
+    return f32(math.cos(float(x)))
+
+def _sinf(x):
+    return f32(math.sin(float(x)))
+
+def circle_bounds(radius, point_count=30):
+    """Local bounds (left, top, width, height) of an SFML CircleShape outline"""
+    degree = f32(3.141592654) / f32(180)
+    full, quarter = f32(360) * degree, f32(90) * degree
+    xs, ys = [radius], [radius]  # The geometric centre is vertex 0
+    for i in range(point_count):
+        angle = f32(i) / f32(point_count) * full - quarter
+        xs.append(radius + radius * _cosf(angle))
+        ys.append(radius + radius * _sinf(angle))
+    left, top = min(xs), min(ys)
+    return left, top, max(xs) - left, max(ys) - top
+
+def global_bounds(x, y, local):
+    """(min x, max x, min y, max y) of a shape at top-left (x, y) as Rect::findIntersection sees them"""
+    lx, ly, lw, lh = local
+    left, right = x + lx, x + (lx + lw)
+    top, bottom = y + ly, y + (ly + lh)
+    return left, left + (right - left), top, top + (bottom - top)
+
+def intersects(a, b):
+    return max(a[0], b[0]) < min(a[1], b[1]) and max(a[2], b[2]) < min(a[3], b[3])
+
+BALL_BOUNDS = circle_bounds(BALL_RADIUS)
+POWER_UP_BOUNDS = circle_bounds(POWER_UP_RADIUS)
+
+def load_power_up_config(path=DEFAULT_POWERUPS):
+    """{type: (duration, spawn interval)} from config/game/powerups.json"""
+    with open(path, 'r') as f:
+        config = json.load(f)
+    return {i: (f32(config[name]['duration']), f32(config[name]['spawnInterval']))
+            for i, name in enumerate(POWER_UP_TYPES)}
+
+class Ball:
+    __slots__ = ('x', 'y', 'vx', 'vy', 'mult')
+
+    def __init__(self, rng, seed=RAND_SEED):
+        # Top-left of the circle, centred at (400, 300)
+        self.x = f32(400) - BALL_RADIUS
+        self.y = f32(300) - BALL_RADIUS
+        self.mult = _ONE
+        rng.srand(seed)
+        angle = f32(rng.rand() % 360) * f32(3.14159) / f32(180.0)
+        self.vx = _cosf(angle) * BALL_SPEED
+        self.vy = _sinf(angle) * BALL_SPEED
+
+    def update(self, dt):
+        self.x = self.x + self.vx * dt * self.mult
+        self.y = self.y + self.vy * dt * self.mult
+        if self.y <= _ZERO:
+            self.vy = -self.vy
+            self.y = _ZERO
+        elif self.y + f32(20) >= HEIGHT:
+            self.vy = -self.vy
+            self.y = f32(580)
+
+    def bounds(self):
+        return global_bounds(self.x, self.y, BALL_BOUNDS)
+
+class Paddle:
+    __slots__ = ('x', 'y', 'width', 'height', 'start', 'extended', 'extend_time_left')
+
+    def __init__(self, start):
+        self.start = start
+        self.x, self.y = start
+        self.width, self.height = PADDLE_WIDTH, PADDLE_HEIGHT
+        self.extended = False
+        self.extend_time_left = _ZERO
+
+    def move_up(self, dt):
+        self.y = self.y - PADDLE_SPEED * dt
+        if self.y < _ZERO:
+            self.y = _ZERO
+
+    def move_down(self, dt):
+        self.y = self.y + PADDLE_SPEED * dt
+        if self.y + self.height > HEIGHT:
+            self.y = HEIGHT - self.height
+
+    def extend(self, duration):
+        if not self.extended:
+            self.extended = True
+            self.extend_time_left = duration
+            self.width = PADDLE_WIDTH * _TWO
+
+    def reset(self):
+        self.x, self.y = self.start
+
+    def bounds(self):
+        return global_bounds(self.x, self.y, (_ZERO, _ZERO, self.width, self.height))
+
+    def state(self):
+        return {'x': float(self.x + self.width / _TWO), 'y': float(self.y + self.height / _TWO),
+                'width': float(self.width), 'height': float(self.height)}
+
+class PongSim:
+    """One game advanced in fixed ticks; states are the dicts PongEnv returns"""
+
+    def __init__(self, power_ups=None, dt=FIXED_DT, seed=RAND_SEED):
+        self.config = power_ups or load_power_up_config()
+        self.dt = f32(dt)
+        self.seed = seed  # pong_evolved --seed
+        self.reset()
+
+    def reset(self):
+        """Fresh game, as a newly started pong_evolved --server"""
+        self.rng = GlibcRand()
+        self.player = Paddle(PLAYER_START)
+        self.bot = Paddle(BOT_START)
+        self.balls = [Ball(self.rng, self.seed)]
+        self.player_score = 0
+        self.bot_score = 0
+        self.power_ups = []  # [type, x, y] top-left
+        self.effects = []  # [type, time left]
+        self.spawn_timers = [interval for _, interval in (self.config[i] for i in range(3))]
+        return self.state()
+
+    def step(self, bot_action):
+        """One Game::update(fixedDt) with the bot moving by -1 (down), 0 or 1 (up)"""
+        dt = self.dt
+        if bot_action == -1:
+            self.bot.move_down(dt)
+        elif bot_action == 1:
+            self.bot.move_up(dt)
+
+        balls = self.balls
+        for ball in balls:
+            ball.update(dt)
+
+        player_bounds = self.player.bounds()
+        bot_bounds = self.bot.bounds()
+        for ball in balls:
+            if intersects(ball.bounds(), player_bounds):
+                ball.vx = -ball.vx
+            if intersects(ball.bounds(), bot_bounds):
+                ball.vx = -ball.vx
+
+        player = self.player
+        if player.extended:
+            player.extend_time_left = player.extend_time_left - dt
+            if player.extend_time_left <= _ZERO:
+                player.extended = False
+                player.width = PADDLE_WIDTH
+
+        self._update_power_ups(dt)
+
+        for ball in balls:
+            x = ball.x + BALL_RADIUS
+            if x < _ZERO:
+                self.bot_score += 1
+                self._reset_round()
+                break
+            elif x > WIDTH:
+                self.player_score += 1
+                self._reset_round()
+                break
+        return self.state()
+
+    def _reset_round(self):
+        # Game::reset: one fresh ball and paddle positions; sizes, power-ups and effects carry over
+        self.balls = [Ball(self.rng, self.seed)]
+        self.player.reset()
+        self.bot.reset()
+
+    def _update_power_ups(self, dt):
+        timers = self.spawn_timers
+        for kind in range(3):
+            timers[kind] = timers[kind] - dt
+            if timers[kind] <= _ZERO:
+                self.power_ups.append([kind, f32(self.rng.rand() % 800), _ZERO])
+                timers[kind] = self.config[kind][1]
+
+        fall = POWER_UP_SPEED * dt
+        kept = []
+        for power_up in self.power_ups:
+            power_up[2] = power_up[2] + fall
+            if power_up[2] + POWER_UP_BOUNDS[1] <= HEIGHT:
+                kept.append(power_up)
+        self.power_ups = kept
+
+        kept = []
+        for power_up in self.power_ups:
+            bounds = global_bounds(power_up[1], power_up[2], POWER_UP_BOUNDS)
+            # The ball list may grow while iterating (SplitBall); later power-ups see the new ball
+            for ball in self.balls:
+                if intersects(bounds, ball.bounds()):
+                    self._apply_effect(power_up[0])
+                    break
+            else:
+                kept.append(power_up)
+        self.power_ups = kept
+
+        kept = []
+        for effect in self.effects:
+            effect[1] = effect[1] - dt
+            if effect[1] <= _ZERO:
+                if effect[0] == SLOW_MOTION_TYPE:
+                    for ball in self.balls:
+                        ball.mult = _ONE
+            else:
+                kept.append(effect)
+        self.effects = kept
+
+    def _apply_effect(self, kind):
+        duration = self.config[kind][0]
+        if kind == EXTEND_PADDLE:
+            self.player.extend(duration)
+            self.effects.append([kind, duration])
+        elif kind == SPLIT_BALL:
+            self.balls.append(Ball(self.rng, self.seed))
+        else:
+            for ball in self.balls:
+                ball.mult = SLOW_MOTION
+            self.effects.append([kind, duration])
+
+    def state(self):
+        """The state dict the binary protocol carries (ball and power-up positions are centres)"""
+        return {
+            'balls': [{'x': float(b.x + BALL_RADIUS), 'y': float(b.y + BALL_RADIUS),
+                       'vx': float(b.vx), 'vy': float(b.vy)} for b in self.balls],
+            'player_paddle': self.player.state(),
+            'bot_paddle': self.bot.state(),
+            'scores': {'player': self.player_score, 'bot': self.bot_score},
+            'power_ups': [{'type': kind, 'x': float(x + POWER_UP_RADIUS), 'y': float(y + POWER_UP_RADIUS)}
+                          for kind, x, y in self.power_ups],
+            'active_effects': [{'type': kind, 'time_left': float(t)} for kind, t in self.effects],
+        }
@@ -0,0 +1,231 @@
+import json
+import struct
+import numpy as np
+
+# Binary framing shared by the game (Game.cpp), PongEnv, the data collector and
+# the inference server. A client opts in by sending MAGIC right after connect;
+# a peer that understands it answers with MAGIC, otherwise newline-delimited
+# JSON is used as before.
+#
+# Every binary message is a frame: <uint32 payload length><uint8 type><payload>,
+# all little-endian.
+#   STATE  - 14 float32 features (PongEnv._flatten_obs layout), then
+#            uint16 n + n * (x, y, vx, vy) float32 balls,
+#            uint16 n + n * (uint8 type, x, y float32) power-ups,
+#            uint16 n + n * (uint8 type, time_left float32) active effects.
+#            Requests to the inference server may stop after the features.
+#   ACTION - one int8 (game: -1/0/1 paddle move, inference server: 0-2 index)
+#   JSON   - UTF-8 JSON document, for everything that is not a state/action
+#   STATES - inference server only: n * 14 float32 features, answered by
+#   ACTIONS  - n int8 action indexes, in order; each state counts as one request
+#              for admission (and, in async mode, is batched like a STATE)
+#   GAME_STATE  - multi-game server (pong_evolved --games N) only: uint16 game
+#                 id, then a STATE payload
+#   GAME_ACTION - uint16 game id + int8 action (-1/0/1) for that game
+#
+# After the handshake the game sends a JSON frame
+# {"type": "hello", "lockstep": bool, "dt": seconds} before its first state.
+# A client may answer with a JSON frame {"lockstep": true} before its first
+# action to switch the connection to lockstep: the game then advances exactly
+# one fixed dt tick per action instead of following wall-clock time. The game
+# confirms every such request with {"type": "lockstep", "lockstep": bool}, and
+# clients only count on lockstep once the hello or that reply says so. Games
+# started with --lockstep use it for every client and report it in each JSON
+# state line's top-level "lockstep" key. A multi-game server's hello also has
+# "games": N and is followed by a GAME_STATE for every game; it then answers
+# each GAME_ACTION with that game's GAME_STATE (in lockstep, after one tick).
+#
+# A JSON client sends the game a hello line instead of MAGIC (encode_hello),
+# optionally asking for lockstep up front. Without it the game cannot tell a
+# JSON client from a slow binary one and waits 100 ms for the magic first.
+MAGIC = b'PEB1'
+FRAME_HEADER = struct.Struct('<IB')
+STATE, ACTION, JSON, STATES, ACTIONS, GAME_STATE, GAME_ACTION = 1, 2, 3, 4, 5, 6, 7
+
+STATE_SIZE = 14
+FEATURES = struct.Struct('<14f')
+COUNT = struct.Struct('<H')
+BALL = struct.Struct('<4f')
+POWER_UP = struct.Struct('<B2f')
+EFFECT = struct.Struct('<Bf')
+ACTION_VALUE = struct.Struct('<b')
+GAME_ID = struct.Struct('<H')
+GAME_ACTION_VALUE = struct.Struct('<Hb')
+
+DEFAULT_BALL = {'x': 400, 'y': 300, 'vx': 0, 'vy': 0}
+
+def encode_frame(msg_type, payload=b''):
+    return FRAME_HEADER.pack(len(payload), msg_type) + payload
+
+def encode_action(action):
+    return encode_frame(ACTION, ACTION_VALUE.pack(action))
+
+def encode_game_action(game, action):
+    return encode_frame(GAME_ACTION, GAME_ACTION_VALUE.pack(game, action))
+
+def encode_states(states):
+    """STATES frame for an (N, 14) array"""
+    return encode_frame(STATES, np.ascontiguousarray(states, dtype='<f4').tobytes())
+
+def decode_states(payload):
+    """(N, 14) float32 array from a STATES payload, or None if the size is not a multiple of a state"""
+    if len(payload) % FEATURES.size:
+        return None
+    return np.frombuffer(payload, dtype='<f4').reshape(-1, STATE_SIZE).astype(np.float32)
+
+def encode_actions(actions):
+    return encode_frame(ACTIONS, np.asarray(actions, dtype=np.int8).tobytes())
+
+def encode_json(msg):
+    return encode_frame(JSON, json.dumps(msg).encode('utf-8'))
+
+def encode_hello(lockstep=False):
+    """Hello line a JSON client sends the game right after connecting"""
+    msg = {'type': 'hello'}
+    if lockstep:
+        msg['lockstep'] = True
+    return (json.dumps(msg) + '\n').encode('utf-8')
+
+def flatten_state(state):
+    """Flatten a game state dict into the 14-feature float32 vector"""
+    ball = state['balls'][0] if state['balls'] else DEFAULT_BALL
+    player = state['player_paddle']
+    bot = state['bot_paddle']
+    scores = state['scores']
+    return np.array([
+        ball['x'], ball['y'], ball['vx'], ball['vy'],
+        player['x'], player['y'], player['width'], player['height'],
+        bot['x'], bot['y'], bot['width'], bot['height'],
+        scores['player'], scores['bot']
+    ], dtype=np.float32)
+
+def encode_state(state):
+    """Encode a game state dict as a STATE frame"""
+    parts = [FEATURES.pack(*flatten_state(state).tolist()), COUNT.pack(len(state['balls']))]
+    parts += [BALL.pack(b['x'], b['y'], b['vx'], b['vy']) for b in state['balls']]
+    parts.append(COUNT.pack(len(state['power_ups'])))
+    parts += [POWER_UP.pack(p['type'], p['x'], p['y']) for p in state['power_ups']]
+    parts.append(COUNT.pack(len(state['active_effects'])))
+    parts += [EFFECT.pack(e['type'], e['time_left']) for e in state['active_effects']]
+    return encode_frame(STATE, b''.join(parts))
+
+def decode_features(payload):
+    """The 14-feature vector at the start of a STATE payload"""
+    return np.frombuffer(payload, dtype='<f4', count=STATE_SIZE).astype(np.float32)
+
+def decode_state(payload):
+    """Decode a full STATE payload into the same dict the JSON protocol carries"""
+    f = FEATURES.unpack_from(payload, 0)
+    offset = FEATURES.size
+
+    (n,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    balls = []
+    for _ in range(n):
+        x, y, vx, vy = BALL.unpack_from(payload, offset)
+        offset += BALL.size
+        balls.append({'x': x, 'y': y, 'vx': vx, 'vy': vy})
+
+    (n,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    power_ups = []
+    for _ in range(n):
+        kind, x, y = POWER_UP.unpack_from(payload, offset)
+        offset += POWER_UP.size
+        power_ups.append({'type': kind, 'x': x, 'y': y})
+
+    (n,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    effects = []
+    for _ in range(n):
+        kind, time_left = EFFECT.unpack_from(payload, offset)
+        offset += EFFECT.size
+        effects.append({'type': kind, 'time_left': time_left})
+
+    return {
+        'balls': balls,
+        'player_paddle': {'x': f[4], 'y': f[5], 'width': f[6], 'height': f[7]},
+        'bot_paddle': {'x': f[8], 'y': f[9], 'width': f[10], 'height': f[11]},
+        'scores': {'player': int(f[12]), 'bot': int(f[13])},
+        'power_ups': power_ups,
+        'active_effects': effects,
+    }
+
+class SocketReader:
+    """Buffered reader over a blocking socket using recv_into a reusable buffer.
+
+    Lines and frames returned as memoryviews are only valid until the next read.
+    """
+
+    def __init__(self, sock, size=65536):
+        self.sock = sock
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.start = 0
+        self.end = 0
+
+    def _fill(self, need):
+        """Block until at least `need` unread bytes are buffered"""
+        while self.end - self.start < need:
+            if self.start + need > len(self.buf):
+                pending = self.end - self.start
+                if need > len(self.buf):
+                    # Swap in a bigger buffer rather than resizing one that may be exported
+                    buf = bytearray(max(need, 2 * len(self.buf)))
+                    buf[:pending] = self.buf[self.start:self.end]
+                    self.buf = buf
+                    self.view = memoryview(buf)
+                else:
+                    self.buf[:pending] = self.buf[self.start:self.end]
+                self.start, self.end = 0, pending
+            n = self.sock.recv_into(self.view[self.end:])
+            if n == 0:
+                raise ConnectionError("Connection lost")
+            self.end += n
+
+    def peek(self, n):
+        self._fill(n)
+        return bytes(self.buf[self.start:self.start + n])
+
+    def read_exact(self, n):
+        self._fill(n)
+        data = self.view[self.start:self.start + n]
+        self.start += n
+        return data
+
+    def read_line(self, limit=None):
+        """Next newline-terminated line, without the newline.
+
+        Raises ValueError once more than `limit` bytes arrive without a newline.
+        """
+        scanned = 0  # Unread bytes already searched for the newline
+        while True:
+            idx = self.buf.find(b'\n', self.start + scanned, self.end)
+            if idx != -1:
+                line = self.view[self.start:idx]
+                self.start = idx + 1
+                return line
+            scanned = self.end - self.start
+            if limit is not None and scanned > limit:
+                raise ValueError("Message too large")
+            self._fill(scanned + 1)
+
+    def read_frame(self, limit=None):
+        """Next binary frame as (type, payload memoryview).
+
+        Raises ValueError, before buffering the payload, if it is longer than `limit` bytes.
+        """
+        length, msg_type = FRAME_HEADER.unpack(self.read_exact(FRAME_HEADER.size))
+        if limit is not None and length > limit:
+            raise ValueError("Message too large")
+        return msg_type, self.read_exact(length)
+
+def negotiate_binary(sock, reader):
+    """Request binary framing; returns True if the peer acknowledged it.
+
+    A peer that only speaks JSON leaves its first line unread in `reader`.
+    """
+    sock.sendall(MAGIC)
+    if reader.peek(1) == MAGIC[:1]:
+        return bytes(reader.read_exact(len(MAGIC))) == MAGIC
+    return False
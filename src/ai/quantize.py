@@ -0,0 +1,165 @@
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+import warnings
+import numpy as np
+import torch
+import torch.nn as nn
+if __package__ in (None, ''):
+    # Run as a script: load the rest of the package as `ai`, never as top-level modules
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import ai  # noqa: F401
+    __package__ = 'ai'
+from .model import DQN, load_policy_state_dict
+
+# Post-training int8 quantization of the DQN policy for CPU serving.
+#
+# Linear layers are replaced by dynamically quantized int8 versions (weights
+# quantized once, activations per batch). The raw 14-feature state mixes very
+# different ranges (positions in the hundreds, scores near zero), which wastes
+# most of the int8 range of the first layer's input; calibration states are used
+# to equalize it: each feature is divided by its calibrated range and the first
+# layer's weight columns are multiplied by the same factor, which leaves the
+# float function unchanged.
+
+class ScaledInput(nn.Module):
+    """Multiplies inputs by a fixed per-feature factor before the wrapped model"""
+
+    def __init__(self, model, input_scale):
+        super().__init__()
+        self.model = model
+        self.register_buffer('input_scale', torch.as_tensor(input_scale, dtype=torch.float32))
+
+    def forward(self, x):
+        return self.model(x * self.input_scale)
+
+def calibrate_input_range(states, percentile=99.9):
+    """Per-feature magnitude of the calibration states (1.0 for constant-zero features)"""
+    states = np.asarray(states, dtype=np.float32)
+    feature_range = np.percentile(np.abs(states), percentile, axis=0).astype(np.float32)
+    feature_range[feature_range < 1e-6] = 1.0
+    return feature_range
+
+def load_calibration_states(path, limit=None):
+    """States from a bc_data.npz-style dataset"""
+    with np.load(path) as data:
+        states = data['states'].astype(np.float32)
+    return states[:limit] if limit else states
+
+def quantize_dqn(model, calibration_states=None):
+    """Return an int8 dynamically quantized CPU copy of a float DQN"""
+    model = copy.deepcopy(model).cpu().eval()
+    input_scale = None
+    if calibration_states is not None and len(calibration_states):
+        feature_range = calibrate_input_range(calibration_states)
+        first = model.net[0]
+        with torch.no_grad():
+            first.weight.mul_(torch.from_numpy(feature_range))
+        input_scale = 1.0 / feature_range
+
+    with warnings.catch_warnings():
+        # torch.ao dynamic quantization is deprecated in favour of torchao but still supported
+        warnings.simplefilter('ignore')
+        quantized = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    if input_scale is not None:
+        quantized = ScaledInput(quantized, input_scale)
+    return quantized.eval()
+
+def action_agreement(float_model, int8_model, states, batch_size=4096):
+    """Fraction of states where both models choose the same greedy action"""
+    same = 0
+    with torch.no_grad():
+        for i in range(0, len(states), batch_size):
+            x = torch.from_numpy(states[i:i + batch_size])
+            same += int((float_model(x).argmax(dim=1) == int8_model(x).argmax(dim=1)).sum())
+    return same / len(states)
+
+def benchmark(model, states, batch_size, min_time=0.5):
+    """Mean latency per forward (ms) and throughput (states/s) at one batch size"""
+    reps = max(1, len(states) // batch_size)
+    batches = [torch.from_numpy(states[(i % reps) * batch_size:(i % reps + 1) * batch_size])
+               for i in range(reps)]
+    with torch.no_grad():
+        for x in batches[:10]:
+            model(x)
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            model(batches[calls % reps])
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+    latency = elapsed / calls
+    return {'latency_ms': latency * 1000.0, 'throughput': batch_size / latency}
+
+def quantization_report(model_path, data_path, batch_sizes=(1, 8, 32, 128, 512), threads=None):
+    """Action agreement and float vs int8 speed across batch sizes"""
+    if threads:
+        torch.set_num_threads(threads)
+    float_model = DQN()
+    float_model.load_state_dict(load_policy_state_dict(model_path, map_location='cpu'))
+    float_model.eval()
+
+    states = load_calibration_states(data_path)
+    # Calibrate on one half, measure agreement on the other
+    rng = np.random.RandomState(0)
+    order = rng.permutation(len(states))
+    split = max(1, len(states) // 2)
+    calibration, held_out = states[order[:split]], states[order[split:]]
+    if not len(held_out):
+        held_out = calibration
+    int8_model = quantize_dqn(float_model, calibration)
+
+    report = {
+        'model': model_path,
+        'data': data_path,
+        'threads': torch.get_num_threads(),
+        'agreement': action_agreement(float_model, int8_model, held_out),
+        'batches': [],
+    }
+    bench_states = np.resize(held_out, (max(batch_sizes) * 8, held_out.shape[1])).astype(np.float32)
+    for batch_size in batch_sizes:
+        fp32 = benchmark(float_model, bench_states, batch_size)
+        int8 = benchmark(int8_model, bench_states, batch_size)
+        report['batches'].append({
+            'batch_size': batch_size,
+            'float32': fp32,
+            'int8': int8,
+            'speedup': fp32['latency_ms'] / int8['latency_ms'],
+        })
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Report int8 quantization accuracy and speed for a DQN model')
+    parser.add_argument('--model', type=str, required=True,
+                        help='Path to trained model or checkpoint')
+    parser.add_argument('--data', type=str, default='data/bc_data.npz',
+                        help='Dataset with a states array used for calibration and agreement')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 128, 512],
+                        help='Batch sizes to benchmark')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='Torch intra-op threads (default: torch default)')
+    parser.add_argument('--json-out', type=str, default=None,
+                        help='Also write the report as JSON')
+    args = parser.parse_args()
+
+    report = quantization_report(args.model, args.data, args.batch_sizes, args.threads)
+
+    print(f"Action agreement (int8 vs float32): {report['agreement'] * 100:.2f}%")
+    print(f"Threads: {report['threads']}")
+    print(f"{'batch':>6} {'fp32 ms':>10} {'int8 ms':>10} {'fp32 st/s':>12} {'int8 st/s':>12} {'speedup':>8}")
+    for row in report['batches']:
+        print(f"{row['batch_size']:>6} {row['float32']['latency_ms']:>10.4f} {row['int8']['latency_ms']:>10.4f} "
+              f"{row['float32']['throughput']:>12.0f} {row['int8']['throughput']:>12.0f} {row['speedup']:>7.2f}x")
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.json_out}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,452 @@
+import json
+import selectors
+import socket
+import time
+import numpy as np
+from gymnasium.vector import AutoresetMode, VectorEnv
+from . import protocol as wire
+from .vector_env import set_pong_spaces
+
+# Vector env over a pool of running games (pong_evolved --server [--port N]).
+# Every game gets its own non-blocking connection and step_async() sends all
+# actions before step_wait() waits on the sockets together. Connections ask
+# for lockstep, so every step is exactly one game tick; with lockstep=False
+# the games run in real time and N of them cost one frame of wall time per step
+# rather than N. Servers listed
+# beyond num_envs are spares: a game whose connection fails is reconnected,
+# or moved to a spare, and its episode is reported as truncated rather than
+# ended with a made-up state. MultiGamePongVectorEnv instead plays the games
+# of one multi-game server (pong_evolved --games N) over a single connection.
+
+def parse_address(server, default_host='localhost'):
+    """'host:port', ':port', 'port' or (host, port) as a (host, port) tuple"""
+    if isinstance(server, (tuple, list)):
+        return server[0], int(server[1])
+    host, _, port = str(server).rpartition(':')
+    return host or default_host, int(port)
+
+class GameConnection:
+    """One game server connection: blocking connect and handshake, then non-blocking state/action exchange"""
+
+    def __init__(self, address, protocol='binary', timeout=2.0, lockstep=True):
+        self.address = address
+        self.lockstep = False  # Whether the server steps this game once per action
+        self.sock = socket.create_connection(address, timeout=timeout)
+        try:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            reader = wire.SocketReader(self.sock)
+            self.binary = protocol == 'binary' and wire.negotiate_binary(self.sock, reader)
+            if protocol == 'json':
+                self.sock.sendall(wire.encode_hello(lockstep))
+            # The server sends its current state as soon as the client is connected
+            self.inbox = bytearray()
+            self.state = self._read_first_state(reader, lockstep)
+            self.inbox += reader.buf[reader.start:reader.end]
+        except BaseException:
+            self.sock.close()
+            raise
+        self.sock.setblocking(False)
+        self.outbox = b''
+
+    def _read_first_state(self, reader, lockstep):
+        """The game's first state; sets self.lockstep from the game's own word and raises ValueError if it refuses lockstep"""
+        if self.binary:
+            state, requested = None, False
+            # As PongEnv._handle_control: answer the hello, then wait for the game's reply
+            while state is None or requested:
+                msg_type, payload = reader.read_frame()
+                if msg_type == wire.STATE:
+                    state = wire.decode_features(payload)
+                elif msg_type == wire.JSON:
+                    msg = json.loads(bytes(payload))
+                    if msg.get('type') == 'hello' and 'lockstep' in msg:
+                        self.lockstep = bool(msg['lockstep'])
+                        if lockstep and not self.lockstep:
+                            self.sock.sendall(wire.encode_json({'lockstep': True}))
+                            requested = True
+                    elif msg.get('type') == 'lockstep':
+                        self.lockstep = bool(msg['lockstep'])
+                        requested = False
+        else:
+            msg = json.loads(bytes(reader.read_line()))
+            self.lockstep = bool(msg.get('lockstep', False))  # As the hello asked, or the game's --lockstep
+            state = wire.flatten_state(msg['data'])
+        if lockstep and not self.lockstep:
+            raise ValueError(f"Game server {self.address[0]}:{self.address[1]} does not step in lockstep")
+        return state
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def send_action(self, action_val):
+        if self.binary:
+            self.outbox += wire.encode_action(action_val)
+        else:
+            msg = {'type': 'action', 'data': {'action': action_val, 'timestamp': time.time()}}
+            self.outbox += (json.dumps(msg) + '\n').encode('utf-8')
+        self.flush()
+
+    def flush(self):
+        """Send as much of the outbox as the socket takes; True once it is empty"""
+        if self.outbox:
+            try:
+                sent = self.sock.send(self.outbox)
+            except BlockingIOError:
+                sent = 0
+            self.outbox = self.outbox[sent:]
+        return not self.outbox
+
+    def receive(self):
+        """Read what has arrived; the next state's features, or None if it is incomplete"""
+        try:
+            data = self.sock.recv(65536)
+        except BlockingIOError:
+            data = None
+        if data == b'':
+            raise ConnectionError(f"Game server {self.address[0]}:{self.address[1]} closed the connection")
+        if data:
+            self.inbox += data
+        return self.pop_state()
+
+    def pop_state(self):
+        """The next complete state already buffered, or None"""
+        inbox = self.inbox
+        if self.binary:
+            while len(inbox) >= wire.FRAME_HEADER.size:
+                length, msg_type = wire.FRAME_HEADER.unpack_from(inbox)
+                end = wire.FRAME_HEADER.size + length
+                if len(inbox) < end:
+                    return None
+                payload = bytes(inbox[wire.FRAME_HEADER.size:end])
+                del inbox[:end]
+                if msg_type == wire.STATE:
+                    return wire.decode_features(payload)
+            return None
+        idx = inbox.find(b'\n')
+        if idx == -1:
+            return None
+        line = bytes(inbox[:idx])
+        del inbox[:idx + 1]
+        return wire.flatten_state(json.loads(line)['data'])
+
+    def close(self):
+        self.sock.close()
+
+class RemotePongVectorEnv(VectorEnv):
+    """PongEnv over `num_envs` game servers at once, behind the gymnasium VectorEnv API.
+
+    `servers` lists 'host:port' addresses; the first `num_envs` (default: all)
+    are played, the rest are spares. Observations are (num_envs, 14) float32
+    `_flatten_obs` rows and rewards are PongEnv's score-change reward. The
+    servers' games never end, so episodes only end by truncation: after
+    `max_episode_steps` steps, or when a game had to be reconnected or moved
+    to another server. Truncated games carry on from the returned observation
+    (same-step autoreset); the last observation of the old episode is in
+    infos['final_obs'] and reconnected games are flagged in infos['reconnected'].
+    With `lockstep` (the default) connections ask their game to advance
+    exactly one tick per step, and a server that refuses is passed over like an
+    unreachable one; lockstep=False keeps the games in real time.
+    """
+
+    metadata = {'autoreset_mode': AutoresetMode.SAME_STEP}
+
+    def __init__(self, servers, num_envs=None, protocol='binary', connect_timeout=2.0, step_timeout=5.0,
+                 reconnect_attempts=2, retry_delay=0.1, max_episode_steps=None, lockstep=True):
+        addresses = [parse_address(server) for server in servers]
+        self.num_envs = num_envs or len(addresses)
+        if not 0 < self.num_envs <= len(addresses):
+            raise ValueError(f"Need at least num_envs={self.num_envs} servers, got {len(addresses)}")
+        set_pong_spaces(self)
+        self.protocol = protocol
+        self.lockstep = lockstep
+        self.connect_timeout = connect_timeout
+        self.step_timeout = step_timeout
+        self.reconnect_attempts = reconnect_attempts
+        self.retry_delay = retry_delay
+        self.max_episode_steps = max_episode_steps
+
+        self.addresses = addresses[:self.num_envs]  # Server currently assigned to each game
+        self.spares = addresses[self.num_envs:]
+        self.connections = [None] * self.num_envs
+        self.selector = selectors.DefaultSelector()
+        self.observations = np.zeros((self.num_envs, wire.STATE_SIZE), dtype=np.float32)
+        self.steps = np.zeros(self.num_envs, dtype=np.int64)
+        self.reconnects = 0
+        self._waiting = None
+
+    def reset(self, *, seed=None, options=None):
+        """Connect every game that is not connected and start new episodes from the current states.
+
+        The servers' games keep running across episodes, as with PongEnv.
+        """
+        super().reset(seed=seed)
+        if self._waiting is not None:
+            self.step_wait()
+        for i in range(self.num_envs):
+            if self.connections[i] is None:
+                self._connect(i)
+        self.steps[:] = 0
+        return self.observations.copy(), {}
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions):
+        """Send every game its action without waiting for the replies"""
+        if self._waiting is not None:
+            raise RuntimeError("step_async called while a step is already in flight")
+        if any(conn is None for conn in self.connections):
+            raise RuntimeError("reset() must be called before step_async()")
+        self._waiting = set(range(self.num_envs))
+        self._failed = set()
+        for i, action in enumerate(np.asarray(actions)):
+            conn = self.connections[i]
+            try:
+                conn.send_action(int(action) - 1)  # 0->-1, 1->0, 2->1
+                if conn.outbox:
+                    self.selector.modify(conn, selectors.EVENT_READ | selectors.EVENT_WRITE, i)
+            except OSError:
+                self._failed.add(i)
+
+    def step_wait(self, timeout=None):
+        """Collect the states answering step_async; games that fail or time out are reconnected"""
+        if self._waiting is None:
+            raise RuntimeError("step_wait called without step_async")
+        waiting = self._waiting - self._failed
+        failed = set(self._failed)
+        states = {}
+        for i in list(waiting):
+            state = self.connections[i].pop_state()
+            if state is not None:
+                states[i] = state
+                waiting.discard(i)
+
+        deadline = time.perf_counter() + (self.step_timeout if timeout is None else timeout)
+        while waiting:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            for key, events in self.selector.select(remaining):
+                i = key.data
+                if i not in waiting:
+                    continue
+                conn = self.connections[i]
+                try:
+                    if events & selectors.EVENT_WRITE and conn.flush():
+                        self.selector.modify(conn, selectors.EVENT_READ, i)
+                    if events & selectors.EVENT_READ:
+                        state = conn.receive()
+                        if state is not None:
+                            states[i] = state
+                            waiting.discard(i)
+                except (OSError, ValueError):
+                    failed.add(i)
+                    waiting.discard(i)
+        failed |= waiting  # Timed out
+        self._waiting = None
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        infos = {}
+        previous = self.observations.copy()
+        for i, state in states.items():
+            # Score-change reward, as in PongEnv.step
+            rewards[i] = (state[12] - previous[i, 12]) - (state[13] - previous[i, 13])
+            self.observations[i] = state
+        self.steps += 1
+        if self.max_episode_steps is not None:
+            truncated |= self.steps >= self.max_episode_steps
+        for i in sorted(failed):
+            self._connect(i, failed=True)
+            truncated[i] = True
+            infos = self._add_info(infos, {'reconnected': True}, i)
+        for i in np.flatnonzero(truncated):
+            infos = self._add_info(infos, {'final_obs': previous[i] if i in failed else self.observations[i].copy(),
+                                           'final_info': {}}, i)
+            self.steps[i] = 0
+        return self.observations.copy(), rewards, terminated, truncated, infos
+
+    def _connect(self, i, failed=False):
+        """(Re)connect game i: its own server first, then the spares; raises ConnectionError if none answers"""
+        old = self.connections[i]
+        if old is not None:
+            self.selector.unregister(old)
+            old.close()
+            self.connections[i] = None
+        home = self.addresses[i]
+        candidates = [home] * (self.reconnect_attempts if failed else 1) + list(self.spares)
+        errors = []
+        for attempt, address in enumerate(candidates):
+            if failed and 0 < attempt < self.reconnect_attempts:
+                time.sleep(self.retry_delay)  # Give a restarting server a moment
+            try:
+                conn = GameConnection(address, self.protocol, self.connect_timeout, self.lockstep)
+            except (OSError, ValueError) as e:
+                errors.append(f"{address[0]}:{address[1]}: {e}")
+                continue
+            if address != home:
+                # The failed server becomes a spare and may be picked up again later
+                self.spares.remove(address)
+                self.spares.append(home)
+                self.addresses[i] = address
+            if failed:
+                self.reconnects += 1
+            self.connections[i] = conn
+            self.selector.register(conn, selectors.EVENT_READ, i)
+            self.observations[i] = conn.state
+            return conn
+        raise ConnectionError(f"No game server reachable for env {i}: " + '; '.join(errors))
+
+    def close_extras(self, **kwargs):
+        for conn in self.connections:
+            if conn is not None:
+                self.selector.unregister(conn)
+                conn.close()
+        self.connections = [None] * self.num_envs
+        self.selector.close()
+
+class MultiGamePongVectorEnv(VectorEnv):
+    """The games of one multi-game server (pong_evolved --games N) behind the gymnasium VectorEnv API.
+
+    All games share one binary connection; actions and states carry the game
+    id. `num_envs` (default: every game the server hosts) games are played,
+    with the same observations, rewards and same-step truncation as
+    RemotePongVectorEnv. With `lockstep` (the default) every step advances
+    each game by exactly one tick, and a server that refuses lockstep raises
+    ValueError. A failed connection raises ConnectionError,
+    as there is no other server to move the games to.
+    """
+
+    metadata = {'autoreset_mode': AutoresetMode.SAME_STEP}
+
+    def __init__(self, server='localhost:6000', num_envs=None, lockstep=True, connect_timeout=2.0,
+                 step_timeout=5.0, max_episode_steps=None):
+        self.address = parse_address(server)
+        self.lockstep = lockstep
+        self.connect_timeout = connect_timeout
+        self.step_timeout = step_timeout
+        self.max_episode_steps = max_episode_steps
+        self.sock = None
+        self._lockstep_requested = False
+        # The server's hello says how many games it hosts
+        hello, states = self._connect()
+        self.games = hello['games']
+        self.num_envs = num_envs or self.games
+        if not 0 < self.num_envs <= self.games:
+            self.close_extras()
+            raise ValueError(f"Server hosts {self.games} games, cannot play num_envs={self.num_envs}")
+        set_pong_spaces(self)
+        self.observations = states[:self.num_envs]
+        self.steps = np.zeros(self.num_envs, dtype=np.int64)
+        self._waiting = False
+
+    def _connect(self):
+        """Connect, handshake and read every game's first state; returns (hello, states)"""
+        host, port = self.address
+        self.sock = socket.create_connection(self.address, timeout=self.connect_timeout)
+        try:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.reader = wire.SocketReader(self.sock)
+            if not wire.negotiate_binary(self.sock, self.reader):
+                raise ValueError(f"Game server {host}:{port} does not speak the binary protocol")
+            msg_type, payload = self.reader.read_frame()
+            hello = json.loads(bytes(payload)) if msg_type == wire.JSON else {}
+            if 'games' not in hello:
+                raise ValueError(f"Game server {host}:{port} hosts a single game; start it with --games N")
+            self.server_lockstep = bool(hello['lockstep'])
+            self._lockstep_requested = self.lockstep and not self.server_lockstep
+            if self._lockstep_requested:
+                self.sock.sendall(wire.encode_json({'lockstep': True}))
+            states = np.zeros((hello['games'], wire.STATE_SIZE), dtype=np.float32)
+            self._read_states(states, set(range(hello['games'])))
+            if self.lockstep and not self.server_lockstep:
+                raise ValueError(f"Game server {host}:{port} does not step in lockstep")
+        except BaseException:
+            self.close_extras()
+            raise
+        return hello, states
+
+    def _read_states(self, states, pending):
+        """Fill states[game] from GAME_STATE frames until no game in `pending` is missing (and a lockstep request is answered)"""
+        while pending or self._lockstep_requested:
+            msg_type, payload = self.reader.read_frame()
+            if msg_type == wire.JSON:
+                msg = json.loads(bytes(payload))
+                if msg.get('type') == 'lockstep':
+                    self.server_lockstep = bool(msg['lockstep'])
+                    self._lockstep_requested = False
+                continue
+            if msg_type != wire.GAME_STATE:
+                continue
+            (game,) = wire.GAME_ID.unpack_from(payload)
+            if game < len(states):
+                states[game] = wire.decode_features(payload[wire.GAME_ID.size:])
+                pending.discard(game)
+
+    def reset(self, *, seed=None, options=None):
+        """Connect if needed and start new episodes from the current states; the games keep running"""
+        super().reset(seed=seed)
+        if self._waiting:
+            self.step_wait()
+        if self.sock is None:
+            self.observations = self._connect()[1][:self.num_envs]
+        self.steps[:] = 0
+        return self.observations.copy(), {}
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions):
+        """Send every game its action in one write"""
+        if self._waiting:
+            raise RuntimeError("step_async called while a step is already in flight")
+        if self.sock is None:
+            raise RuntimeError("reset() must be called before step_async()")
+        # 0->-1, 1->0, 2->1
+        frames = [wire.encode_game_action(i, int(action) - 1) for i, action in enumerate(np.asarray(actions))]
+        self._send(b''.join(frames))
+        self._waiting = True
+
+    def step_wait(self):
+        """Collect every game's next state"""
+        if not self._waiting:
+            raise RuntimeError("step_wait called without step_async")
+        self._waiting = False
+        previous = self.observations.copy()
+        try:
+            self.sock.settimeout(self.step_timeout)
+            self._read_states(self.observations, set(range(self.num_envs)))
+        except (OSError, ValueError) as e:
+            self._fail(e)
+        # Score-change reward, as in PongEnv.step
+        rewards = (self.observations[:, 12] - previous[:, 12]) - (self.observations[:, 13] - previous[:, 13])
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        infos = {}
+        self.steps += 1
+        if self.max_episode_steps is not None:
+            truncated |= self.steps >= self.max_episode_steps
+        for i in np.flatnonzero(truncated):
+            infos = self._add_info(infos, {'final_obs': self.observations[i].copy(), 'final_info': {}}, i)
+            self.steps[i] = 0
+        return self.observations.copy(), rewards, terminated, truncated, infos
+
+    def _send(self, data):
+        try:
+            self.sock.sendall(data)
+        except OSError as e:
+            self._fail(e)
+
+    def _fail(self, error):
+        host, port = self.address
+        self.close_extras()
+        raise ConnectionError(f"Game server {host}:{port} failed: {error}") from error
+
+    def close_extras(self, **kwargs):
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = None
+        self._waiting = False
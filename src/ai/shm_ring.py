@@ -0,0 +1,243 @@
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from .model_registry import heuristic_action
+
+# Single-producer/single-consumer shared-memory ring for a game and an
+# inference server on the same host (see AIClient::connect_shm for the C++
+# side). One client writes states into fixed-size slots and publishes them by
+# advancing `submitted`; the server answers a run of slots at once and
+# publishes the actions by advancing `completed`. Slot k % slots holds both the
+# k-th state and its action, so at most `slots` requests are outstanding.
+#
+# Layout (little-endian, counters on their own 64-byte cache lines):
+#   0    magic b'PESR', uint32 version, uint32 slots, uint32 state size,
+#        uint32 server flags (bit 0: serving)
+#   64   uint64 submitted  - written only by the client
+#   128  uint64 completed  - written only by the server
+#   192  float32 states[slots][14]
+#   ...  int8 actions[slots]
+#
+# Each side writes slot data before the counter that publishes it. Counters
+# are aligned 8-byte stores, and the Python side relies on x86-64's total
+# store order for the rest: numpy issues plain stores and loads with no
+# release/acquire fences, so on weakly ordered CPUs (ARMv8) a peer could see
+# a counter before the slot data it publishes. The ring is x86-64 only.
+MAGIC = b'PESR'
+VERSION = 1
+HEADER = struct.Struct('<4sIIII')
+SUBMITTED, COMPLETED = 64, 128
+STATES = 192
+STATE_SIZE = 14
+SERVING = 1
+
+def ring_size(slots):
+    return STATES + slots * STATE_SIZE * 4 + slots
+
+class ShmRing:
+    """Views over one ring segment"""
+
+    def __init__(self, shm, slots):
+        self.shm = shm
+        self.slots = slots
+        buf = shm.buf
+        self.counters = {
+            'submitted': np.ndarray((1,), dtype='<u8', buffer=buf, offset=SUBMITTED),
+            'completed': np.ndarray((1,), dtype='<u8', buffer=buf, offset=COMPLETED),
+        }
+        self.flags = np.ndarray((1,), dtype='<u4', buffer=buf, offset=16)
+        self.states = np.ndarray((slots, STATE_SIZE), dtype='<f4', buffer=buf, offset=STATES)
+        self.actions = np.ndarray((slots,), dtype='i1', buffer=buf, offset=STATES + slots * STATE_SIZE * 4)
+
+    @property
+    def submitted(self):
+        return int(self.counters['submitted'][0])
+
+    @property
+    def completed(self):
+        return int(self.counters['completed'][0])
+
+    @classmethod
+    def create(cls, name, slots=256):
+        """Create (or replace a stale) ring segment owned by the server"""
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=ring_size(slots))
+        shm.buf[:STATES] = bytes(STATES)
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, slots, STATE_SIZE, 0)
+        return cls(shm, slots)
+
+    @classmethod
+    def attach(cls, name):
+        shm = shared_memory.SharedMemory(name=name)
+        magic, version, slots, state_size, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION or state_size != STATE_SIZE:
+            shm.close()
+            raise ValueError(f"Shared memory segment '{name}' is not a version {VERSION} state ring")
+        if os.name == 'posix':
+            # Only the creating server should unlink the segment
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            except Exception:
+                pass
+        return cls(shm, slots)
+
+    def close(self):
+        # Drop the numpy views first; the buffer cannot be released while exported
+        self.counters = self.flags = self.states = self.actions = None
+        self.shm.close()
+
+def usable_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+class Backoff:
+    """Spin, then yield, then sleep: low latency when busy, little CPU when idle.
+
+    Spinning only helps when the peer runs on another core, so it is skipped
+    on a single usable CPU.
+    """
+
+    def __init__(self, spin=0.0005, yield_for=0.005, max_sleep=0.001):
+        self.spin = spin if usable_cpus() > 1 else 0.0
+        self.yield_for = yield_for
+        self.max_sleep = max_sleep
+        self.since = None
+
+    def reset(self):
+        self.since = None
+
+    def wait(self):
+        now = time.perf_counter()
+        if self.since is None:
+            self.since = now
+        idle = now - self.since
+        if idle < self.spin:
+            return
+        if idle < self.spin + self.yield_for:
+            if hasattr(os, 'sched_yield'):
+                os.sched_yield()
+            else:
+                time.sleep(0)
+        else:
+            time.sleep(min(self.max_sleep, idle / 100.0))
+
+class ShmRingServer:
+    """Answer states from one ring client with a served model, until stopped"""
+
+    def __init__(self, name, entry_fn, slots=256, max_batch_size=64):
+        self.ring = ShmRing.create(name, slots)
+        self.name = name
+        self.entry_fn = entry_fn  # Returns the ServedModel answering ring requests
+        self.max_batch_size = max_batch_size
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Serve on a daemon thread"""
+        self.thread = threading.Thread(target=self.serve_forever, name=f'shm-ring-{self.name}', daemon=True)
+        self.thread.start()
+
+    def serve_forever(self):
+        ring = self.ring
+        ring.flags[0] = SERVING
+        self.running = True
+        backoff = Backoff()
+        done = ring.completed
+        try:
+            while self.running:
+                n = min(ring.submitted - done, self.max_batch_size)
+                if n <= 0:
+                    backoff.wait()
+                    continue
+                backoff.reset()
+                idx = (done + np.arange(n)) % ring.slots
+                states = ring.states[idx]
+                try:
+                    ring.actions[idx] = self.entry_fn().predict_batch_sync(states)
+                except Exception as e:
+                    # Keep serving: the client still gets an action for every state
+                    print(f"Error answering ring requests: {e}")
+                    ring.actions[idx] = [heuristic_action(state) for state in states]
+                done += n
+                ring.counters['completed'][0] = done
+        finally:
+            ring.flags[0] = 0
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def close(self):
+        self.stop()
+        shm = self.ring.shm
+        self.ring.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+class ShmRingClient:
+    """Client side of a ring: submit() states and collect their actions in order"""
+
+    def __init__(self, name):
+        self.ring = ShmRing.attach(name)
+        if not self.ring.flags[0] & SERVING:
+            self.ring.close()
+            raise ConnectionError(f"No server is serving ring '{name}'")
+        self.submitted = self.ring.submitted
+        self.received = self.submitted
+        if self.ring.completed != self.submitted:
+            self.ring.close()
+            raise ConnectionError(f"Ring '{name}' has unanswered requests from another client")
+
+    def submit(self, state):
+        """Publish one state; returns False if every slot is outstanding"""
+        if self.submitted - self.received >= self.ring.slots:
+            return False
+        self.ring.states[self.submitted % self.ring.slots] = state
+        self.submitted += 1
+        self.ring.counters['submitted'][0] = self.submitted
+        return True
+
+    def poll(self):
+        """Action of the oldest outstanding request, or None if not answered yet"""
+        if self.received >= self.submitted or self.ring.completed <= self.received:
+            return None
+        action = int(self.ring.actions[self.received % self.ring.slots])
+        self.received += 1
+        return action
+
+    def predict(self, state, timeout=5.0):
+        """Blocking round trip for one state"""
+        if not self.submit(state):
+            raise RuntimeError("Ring is full; collect outstanding actions first")
+        return self.wait_action(timeout)
+
+    def wait_action(self, timeout=5.0):
+        backoff = Backoff()
+        deadline = time.monotonic() + timeout
+        while True:
+            action = self.poll()
+            if action is not None:
+                return action
+            if not self.ring.flags[0] & SERVING:
+                raise ConnectionError("Ring server stopped")
+            if time.monotonic() > deadline:
+                raise TimeoutError("No action from the ring server")
+            backoff.wait()
+
+    def close(self):
+        self.ring.close()
@@ -0,0 +1,326 @@
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+from .protocol import STATE_SIZE
+from .pong_sim import (
+    f32, FIXED_DT, HEIGHT, WIDTH, BALL_RADIUS, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_SPEED, PLAYER_START,
+    BOT_START, POWER_UP_SPEED, SLOW_MOTION, RAND_SEED, EXTEND_PADDLE, SPLIT_BALL, SLOW_MOTION_TYPE,
+    BALL_BOUNDS, POWER_UP_BOUNDS, Ball, GlibcRand, global_bounds, intersects, load_power_up_config,
+)
+
+# N games advanced together with array operations. Every ball, paddle, score,
+# power-up and timer lives in a structure-of-arrays buffer indexed by game
+# (and slot, for balls, power-ups and effects); a step is one fixed tick of
+# every game with the same float32 arithmetic as PongSim, so each row matches
+# a PongSim fed the same actions. Power-up pickups are rare and order
+# dependent (a split ball can collect a later power-up in the same tick), so
+# only the games with a pickup that tick are resolved one by one.
+
+_ZERO, _ONE, _TWO = f32(0), f32(1), f32(2)
+_BALL_START = (f32(400) - BALL_RADIUS, f32(300) - BALL_RADIUS)
+
+def _overlap(a, b):
+    """Rect::findIntersection on broadcast (min x, max x, min y, max y) bounds"""
+    return ((np.maximum(a[0], b[0]) < np.minimum(a[1], b[1])) &
+            (np.maximum(a[2], b[2]) < np.minimum(a[3], b[3])))
+
+def set_pong_spaces(env):
+    """Give a Pong VectorEnv of `env.num_envs` games its spaces: _flatten_obs rows and PongEnv's three actions"""
+    env.single_observation_space = gym.spaces.Box(-np.inf, np.inf, shape=(STATE_SIZE,), dtype=np.float32)
+    env.single_action_space = gym.spaces.Discrete(3)
+    env.observation_space = batch_space(env.single_observation_space, env.num_envs)
+    env.action_space = batch_space(env.single_action_space, env.num_envs)
+
+class PongVectorEnv(VectorEnv):
+    """`num_envs` simulated games behind the gymnasium VectorEnv API.
+
+    Observations are the (num_envs, 14) float32 rows PongEnv._flatten_obs
+    produces, actions are PongEnv's (0: down, 1: stay, 2: up) for each bot
+    and rewards are PongEnv's score-change reward. A game terminates when
+    either side reaches `max_score` and is truncated after
+    `max_episode_steps` ticks (if set); it is reset on the following step,
+    whose action is ignored (gymnasium's next-step autoreset). `seed` is
+    pong_evolved's --seed: one seed for every game or a sequence with one
+    per game, so row i matches PongSim(seed=seed[i]).
+    """
+
+    metadata = {'autoreset_mode': AutoresetMode.NEXT_STEP}
+
+    def __init__(self, num_envs, max_score=21, max_episode_steps=None, power_ups=None, dt=FIXED_DT,
+                 seed=RAND_SEED):
+        self.num_envs = num_envs
+        set_pong_spaces(self)
+        self.max_score = max_score
+        self.max_episode_steps = max_episode_steps
+        self.dt = f32(dt)
+
+        config = power_ups or load_power_up_config()
+        self.durations = np.array([config[kind][0] for kind in range(3)], dtype=np.float32)
+        self.intervals = np.array([config[kind][1] for kind in range(3)], dtype=np.float32)
+        n = num_envs
+        self._draws = np.empty((0, 1024), dtype=np.int64)
+        self._set_seeds(np.broadcast_to(np.asarray(seed, dtype=np.int64), (n,)))
+        self.player_y = np.empty(n, dtype=np.float32)
+        self.player_width = np.empty(n, dtype=np.float32)
+        self.extended = np.empty(n, dtype=bool)
+        self.extend_time = np.empty(n, dtype=np.float32)
+        self.bot_y = np.empty(n, dtype=np.float32)
+        self.player_score = np.empty(n, dtype=np.int32)
+        self.bot_score = np.empty(n, dtype=np.int32)
+        self.spawn_timers = np.empty((n, 3), dtype=np.float32)
+        self.rand_index = np.empty(n, dtype=np.int64)
+        self.steps = np.empty(n, dtype=np.int64)
+        # Balls: slots [0, ball_count) are live, in creation order
+        self.ball_count = np.empty(n, dtype=np.int64)
+        self.ball_x = np.zeros((n, 4), dtype=np.float32)  # Top-left corner, like the SFML shape
+        self.ball_y = np.zeros((n, 4), dtype=np.float32)
+        self.ball_vx = np.zeros((n, 4), dtype=np.float32)
+        self.ball_vy = np.zeros((n, 4), dtype=np.float32)
+        self.ball_mult = np.ones((n, 4), dtype=np.float32)
+        # Power-ups and effects: unordered slots; power-ups keep their spawn order in power_up_seq
+        self.power_up_active = np.zeros((n, 4), dtype=bool)
+        self.power_up_type = np.zeros((n, 4), dtype=np.int8)
+        self.power_up_x = np.zeros((n, 4), dtype=np.float32)
+        self.power_up_y = np.zeros((n, 4), dtype=np.float32)
+        self.power_up_seq = np.zeros((n, 4), dtype=np.int64)
+        self.effect_active = np.zeros((n, 4), dtype=bool)
+        self.effect_type = np.zeros((n, 4), dtype=np.int8)
+        self.effect_time = np.zeros((n, 4), dtype=np.float32)
+        self._spawns = 0
+        self._autoreset = np.zeros(n, dtype=bool)
+        self._reset_games(np.ones(n, dtype=bool))
+
+    def reset(self, *, seed=None, options=None):
+        """Reset every game, or only options['reset_mask']; `seed` (one or per game) reseeds the reset games"""
+        super().reset(seed=seed)
+        mask = np.ones(self.num_envs, dtype=bool)
+        if options and 'reset_mask' in options:
+            mask = np.asarray(options['reset_mask'], dtype=bool)
+        if seed is not None:
+            seeds = self.seeds.copy()
+            seeds[mask] = np.broadcast_to(np.asarray(seed, dtype=np.int64), (self.num_envs,))[mask]
+            self._set_seeds(seeds)
+        self._reset_games(mask)
+        self._autoreset &= ~mask
+        return self._observations(), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        dt = self.dt
+        n = self.num_envs
+
+        # Bot paddles (Paddle::moveDown / moveUp)
+        down = actions == 0
+        up = actions == 2
+        stride = PADDLE_SPEED * dt
+        y = np.where(down, self.bot_y + stride, np.where(up, self.bot_y - stride, self.bot_y))
+        y = np.where(down & (y + PADDLE_HEIGHT > HEIGHT), HEIGHT - PADDLE_HEIGHT, y)
+        self.bot_y = np.where(up & (y < _ZERO), _ZERO, y)
+
+        # Ball::update on every slot; free slots are ignored below
+        self.ball_x = self.ball_x + self.ball_vx * dt * self.ball_mult
+        by = self.ball_y + self.ball_vy * dt * self.ball_mult
+        top = by <= _ZERO
+        bottom = ~top & (by + f32(20) >= HEIGHT)
+        self.ball_vy = np.where(top | bottom, -self.ball_vy, self.ball_vy)
+        self.ball_y = np.where(top, _ZERO, np.where(bottom, f32(580), by))
+
+        # Paddle collisions reverse vx
+        ball = global_bounds(self.ball_x, self.ball_y, BALL_BOUNDS)
+        player = global_bounds(PLAYER_START[0], self.player_y, (_ZERO, _ZERO, self.player_width, PADDLE_HEIGHT))
+        bot = global_bounds(BOT_START[0], self.bot_y, (_ZERO, _ZERO, PADDLE_WIDTH, PADDLE_HEIGHT))
+        hit_player = _overlap(ball, [np.reshape(b, (-1, 1)) for b in player])
+        hit_bot = _overlap(ball, [np.reshape(b, (-1, 1)) for b in bot])
+        self.ball_vx = np.where(hit_player ^ hit_bot, -self.ball_vx, self.ball_vx)
+
+        # Player paddle extension timer
+        self.extend_time = np.where(self.extended, self.extend_time - dt, self.extend_time)
+        shrink = self.extended & (self.extend_time <= _ZERO)
+        self.extended &= ~shrink
+        self.player_width = np.where(shrink, PADDLE_WIDTH, self.player_width)
+
+        self._update_power_ups(dt)
+
+        # Scoring: the first ball (in creation order) past either edge decides
+        live = np.arange(self.ball_x.shape[1]) < self.ball_count[:, None]
+        centre = self.ball_x + BALL_RADIUS
+        left = live & (centre < _ZERO)
+        out = left | (live & (centre > WIDTH))
+        scored = out.any(axis=1)
+        bot_point = scored & left[np.arange(n), out.argmax(axis=1)]
+        player_point = scored & ~bot_point
+        self.bot_score += bot_point
+        self.player_score += player_point
+        if scored.any():
+            self._reset_round(scored)
+
+        rewards = player_point.astype(np.float32) - bot_point.astype(np.float32)
+        self.steps += 1
+        terminated = np.zeros(n, dtype=bool)
+        if self.max_score is not None:
+            terminated = (self.player_score >= self.max_score) | (self.bot_score >= self.max_score)
+        truncated = np.zeros(n, dtype=bool)
+        if self.max_episode_steps is not None:
+            truncated = self.steps >= self.max_episode_steps
+
+        # Games that finished on the previous step start over instead
+        finished = self._autoreset
+        if finished.any():
+            self._reset_games(finished)
+            rewards[finished] = 0.0
+            terminated &= ~finished
+            truncated &= ~finished
+        self._autoreset = terminated | truncated
+        return self._observations(), rewards, terminated, truncated, {}
+
+    def _observations(self):
+        """(num_envs, 14) float32 in PongEnv._flatten_obs order"""
+        obs = np.empty((self.num_envs, STATE_SIZE), dtype=np.float32)
+        obs[:, 0] = self.ball_x[:, 0] + BALL_RADIUS
+        obs[:, 1] = self.ball_y[:, 0] + BALL_RADIUS
+        obs[:, 2] = self.ball_vx[:, 0]
+        obs[:, 3] = self.ball_vy[:, 0]
+        obs[:, 4] = PLAYER_START[0] + self.player_width / _TWO
+        obs[:, 5] = self.player_y + PADDLE_HEIGHT / _TWO
+        obs[:, 6] = self.player_width
+        obs[:, 7] = PADDLE_HEIGHT
+        obs[:, 8] = BOT_START[0] + PADDLE_WIDTH / _TWO
+        obs[:, 9] = self.bot_y + PADDLE_HEIGHT / _TWO
+        obs[:, 10] = PADDLE_WIDTH
+        obs[:, 11] = PADDLE_HEIGHT
+        obs[:, 12] = self.player_score
+        obs[:, 13] = self.bot_score
+        return obs
+
+    def _reset_games(self, mask):
+        """Fresh games (Game constructor) for the masked rows"""
+        self.player_width[mask] = PADDLE_WIDTH
+        self.extended[mask] = False
+        self.extend_time[mask] = _ZERO
+        self.player_score[mask] = 0
+        self.bot_score[mask] = 0
+        self.spawn_timers[mask] = self.intervals
+        self.steps[mask] = 0
+        self.power_up_active[mask] = False
+        self.effect_active[mask] = False
+        self._reset_round(mask)
+
+    def _reset_round(self, mask):
+        """Game::reset: one new ball and paddle positions; sizes, power-ups and effects carry over"""
+        self.ball_count[mask] = 1
+        self._new_ball(mask, 0)
+        self.player_y[mask] = PLAYER_START[1]
+        self.bot_y[mask] = BOT_START[1]
+
+    def _new_ball(self, rows, slot):
+        self.ball_x[rows, slot], self.ball_y[rows, slot] = _BALL_START
+        self.ball_vx[rows, slot], self.ball_vy[rows, slot] = self._ball_velocity[:, self._seed_index[rows]]
+        self.ball_mult[rows, slot] = _ONE
+        self.rand_index[rows] = 1  # srand(seed) then one rand() for the angle
+
+    def _set_seeds(self, seeds):
+        """Every Ball() reseeds rand() with its game's seed, so each game's
+        generator is just a position in its seed's draw sequence"""
+        self.seeds = np.array(seeds, dtype=np.int64)
+        unique, self._seed_index = np.unique(self.seeds, return_inverse=True)
+        self._rngs = [GlibcRand(int(seed)) for seed in unique]
+        size = self._draws.shape[1]
+        self._draws = np.empty((len(unique), 0), dtype=np.int64)
+        self._extend_draws(size)
+        balls = [Ball(GlibcRand(), int(seed)) for seed in unique]
+        self._ball_velocity = np.array([[ball.vx for ball in balls], [ball.vy for ball in balls]], dtype=np.float32)
+
+    def _extend_draws(self, size):
+        extra = [[rng.rand() for _ in range(size - self._draws.shape[1])] for rng in self._rngs]
+        self._draws = np.concatenate([self._draws, np.array(extra, dtype=np.int64)], axis=1)
+
+    def _widen(self, names, fill=0):
+        """Double the slot capacity of the named (num_envs, slots) buffers"""
+        for name in names:
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.full_like(array, fill)], axis=1))
+
+    def _update_power_ups(self, dt):
+        # Spawn timers in PowerUpType order, each spawn drawing one rand()
+        self.spawn_timers -= dt
+        due = self.spawn_timers <= _ZERO
+        if due.any():
+            for kind in range(3):
+                rows = np.flatnonzero(due[:, kind])
+                if rows.size:
+                    self._spawn(rows, kind)
+                    self.spawn_timers[rows, kind] = self.intervals[kind]
+
+        active = self.power_up_active
+        if active.any():
+            self.power_up_y = self.power_up_y + POWER_UP_SPEED * dt
+            active &= ~(self.power_up_y + POWER_UP_BOUNDS[1] > HEIGHT)
+
+            live = np.arange(self.ball_x.shape[1]) < self.ball_count[:, None]
+            power_up = global_bounds(self.power_up_x, self.power_up_y, POWER_UP_BOUNDS)
+            ball = global_bounds(self.ball_x, self.ball_y, BALL_BOUNDS)
+            hits = _overlap([b[:, :, None] for b in power_up], [b[:, None, :] for b in ball])
+            hits &= active[:, :, None] & live[:, None, :]
+            for row in np.flatnonzero(hits.any(axis=(1, 2))):
+                self._collect_power_ups(row)
+
+        # Active effects count down; an expiring slow motion restores every ball's speed
+        effects = self.effect_active
+        if effects.any():
+            self.effect_time = np.where(effects, self.effect_time - dt, self.effect_time)
+            expired = effects & (self.effect_time <= _ZERO)
+            restore = (expired & (self.effect_type == SLOW_MOTION_TYPE)).any(axis=1)
+            self.ball_mult[restore] = _ONE
+            effects &= ~expired
+
+    def _spawn(self, rows, kind):
+        if np.all(self.power_up_active[rows], axis=1).any():
+            self._widen(['power_up_active', 'power_up_type', 'power_up_x', 'power_up_y', 'power_up_seq'])
+        if self.rand_index[rows].max() >= self._draws.shape[1]:
+            self._extend_draws(2 * self._draws.shape[1])
+        slots = np.argmax(~self.power_up_active[rows], axis=1)
+        self.power_up_active[rows, slots] = True
+        self.power_up_type[rows, slots] = kind
+        self.power_up_x[rows, slots] = (self._draws[self._seed_index[rows], self.rand_index[rows]] % 800).astype(np.float32)
+        self.power_up_y[rows, slots] = _ZERO
+        self.power_up_seq[rows, slots] = self._spawns
+        self.rand_index[rows] += 1
+        self._spawns += 1
+
+    def _collect_power_ups(self, row):
+        # PowerUpManager's pickup loop for one game, in spawn order
+        slots = np.flatnonzero(self.power_up_active[row])
+        for slot in slots[np.argsort(self.power_up_seq[row, slots], kind='stable')]:
+            bounds = global_bounds(self.power_up_x[row, slot], self.power_up_y[row, slot], POWER_UP_BOUNDS)
+            for i in range(self.ball_count[row]):
+                if intersects(bounds, global_bounds(self.ball_x[row, i], self.ball_y[row, i], BALL_BOUNDS)):
+                    self._apply_effect(row, int(self.power_up_type[row, slot]))
+                    self.power_up_active[row, slot] = False
+                    break
+
+    def _apply_effect(self, row, kind):
+        duration = self.durations[kind]
+        if kind == EXTEND_PADDLE:
+            if not self.extended[row]:
+                self.extended[row] = True
+                self.extend_time[row] = duration
+                self.player_width[row] = PADDLE_WIDTH * _TWO
+            self._add_effect(row, kind, duration)
+        elif kind == SPLIT_BALL:
+            if self.ball_count[row] == self.ball_x.shape[1]:
+                self._widen(['ball_x', 'ball_y', 'ball_vx', 'ball_vy'])
+                self._widen(['ball_mult'], fill=1)
+            self._new_ball(row, self.ball_count[row])
+            self.ball_count[row] += 1
+        elif kind == SLOW_MOTION_TYPE:
+            self.ball_mult[row, :self.ball_count[row]] = SLOW_MOTION
+            self._add_effect(row, kind, duration)
+
+    def _add_effect(self, row, kind, duration):
+        if self.effect_active[row].all():
+            self._widen(['effect_active', 'effect_type', 'effect_time'])
+        slot = np.argmax(~self.effect_active[row])
+        self.effect_active[row, slot] = True
+        self.effect_type[row, slot] = kind
+        self.effect_time[row, slot] = duration
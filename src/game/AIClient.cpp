@@ -1,19 +1,38 @@
 #include "AIClient.h"
+#include "Protocol.h"
 #include <sys/socket.h>
+#include <sys/un.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
 #include <netinet/in.h>
 #include <arpa/inet.h>
 #include <unistd.h>
 #include <fcntl.h>
+#include <poll.h>
+#include <cstdint>
 #include <cstring>
 #include <iostream>
 
-AIClient::AIClient() : sock(-1), connected(false) {}
+// Shared-memory ring shared with src/ai/shm_ring.py
+static const char ringMagic[4] = {'P', 'E', 'S', 'R'};
+static const uint32_t ringVersion = 1;
+static const uint32_t ringStateSize = 14;
+static const size_t ringFlagsOffset = 16;
+static const uint32_t ringFlagServing = 1;
+static const size_t ringSubmittedOffset = 64;
+static const size_t ringCompletedOffset = 128;
+static const size_t ringStatesOffset = 192;
+
+AIClient::AIClient()
+    : sock(-1), connected(false), binary(false),
+      ring(nullptr), ringSize(0), ringSlots(0), ringSubmitted(0), ringReceived(0) {}
 
 AIClient::~AIClient() {
     if (sock != -1) close(sock);
+    if (ring != nullptr) munmap(ring, ringSize);
 }
 
-bool AIClient::connect(const std::string& host, int port) {
+bool AIClient::connect(const std::string& host, int port, bool useBinary) {
     sock = socket(AF_INET, SOCK_STREAM, 0);
     if (sock == -1) return false;
 
@@ -28,6 +47,41 @@ bool AIClient::connect(const std::string& host, int port) {
         sock = -1;
         return false;
     }
+    return setupConnection(useBinary);
+}
+
+bool AIClient::connect_unix(const std::string& path, bool useBinary) {
+    sockaddr_un addr;
+    memset(&addr, 0, sizeof(addr));
+    if (path.size() >= sizeof(addr.sun_path)) return false;
+    addr.sun_family = AF_UNIX;
+    std::memcpy(addr.sun_path, path.c_str(), path.size());
+
+    sock = socket(AF_UNIX, SOCK_STREAM, 0);
+    if (sock == -1) return false;
+    if (::connect(sock, (sockaddr*)&addr, sizeof(addr)) == -1) {
+        close(sock);
+        sock = -1;
+        return false;
+    }
+    return setupConnection(useBinary);
+}
+
+bool AIClient::setupConnection(bool useBinary) {
+    // Request binary framing; servers that only speak JSON never answer
+    binary = false;
+    if (useBinary && send(sock, protocolMagic, sizeof(protocolMagic), 0) == static_cast<ssize_t>(sizeof(protocolMagic))) {
+        pollfd pfd;
+        pfd.fd = sock;
+        pfd.events = POLLIN;
+        pfd.revents = 0;
+        char reply[sizeof(protocolMagic)];
+        if (poll(&pfd, 1, 500) > 0 &&
+            recv(sock, reply, sizeof(reply), MSG_WAITALL) == static_cast<ssize_t>(sizeof(reply)) &&
+            std::memcmp(reply, protocolMagic, sizeof(reply)) == 0) {
+            binary = true;
+        }
+    }
 
     // Set non-blocking
     int flags = fcntl(sock, F_GETFL, 0);
@@ -44,6 +98,119 @@ bool AIClient::send_state(const std::string& json) {
     return sent != -1;
 }
 
+bool AIClient::send_state_binary(const std::vector<float>& features) {
+    if (!connected || !binary) return false;
+    std::string frame;
+    // float32 payload; all supported targets are little-endian
+    appendFrame(frame, frameState, reinterpret_cast<const char*>(features.data()), features.size() * sizeof(float));
+    ssize_t sent = send(sock, frame.data(), frame.size(), 0);
+    return sent != -1;
+}
+
+int AIClient::recv_action_binary() {
+    // Returns the action index (0-2), or -1 if no complete action frame is available yet
+    if (!connected || !binary) return -1;
+    char buffer[4096];
+    ssize_t len = recv(sock, buffer, sizeof(buffer), 0);
+    if (len > 0) {
+        rxBuffer.append(buffer, static_cast<size_t>(len));
+    } else if (len == 0) {
+        connected = false;
+    }
+    uint8_t type;
+    uint32_t length;
+    FrameStatus status;
+    while ((status = peekFrame(rxBuffer, 0, type, length)) == FrameStatus::Ready) {
+        bool isAction = type == frameAction && length >= 1;
+        int action = isAction ? static_cast<int8_t>(rxBuffer[frameHeaderSize]) : -1;
+        rxBuffer.erase(0, frameHeaderSize + length);
+        if (isAction) {
+            return action;
+        }
+    }
+    if (status == FrameStatus::TooLarge) {
+        // The stream cannot be resynchronised past an oversized frame
+        rxBuffer.clear();
+        connected = false;
+    }
+    return -1;
+}
+
+bool AIClient::is_binary() const {
+    return binary;
+}
+
+bool AIClient::connect_shm(const std::string& name) {
+    std::string shmName = name[0] == '/' ? name : "/" + name;
+    int fd = shm_open(shmName.c_str(), O_RDWR, 0);
+    if (fd == -1) return false;
+    struct stat st;
+    if (fstat(fd, &st) == -1 || static_cast<size_t>(st.st_size) < ringStatesOffset) {
+        close(fd);
+        return false;
+    }
+    void* mem = mmap(nullptr, static_cast<size_t>(st.st_size), PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    close(fd);
+    if (mem == MAP_FAILED) return false;
+
+    unsigned char* base = static_cast<unsigned char*>(mem);
+    uint32_t version, slots, stateSize, flags;
+    std::memcpy(&version, base + 4, 4);
+    std::memcpy(&slots, base + 8, 4);
+    std::memcpy(&stateSize, base + 12, 4);
+    std::memcpy(&flags, base + ringFlagsOffset, 4);
+    size_t needed = ringStatesOffset + static_cast<size_t>(slots) * (ringStateSize * sizeof(float) + 1);
+    if (std::memcmp(base, ringMagic, 4) != 0 || version != ringVersion || stateSize != ringStateSize ||
+        !(flags & ringFlagServing) || static_cast<size_t>(st.st_size) < needed) {
+        munmap(mem, static_cast<size_t>(st.st_size));
+        return false;
+    }
+
+    ring = base;
+    ringSize = static_cast<size_t>(st.st_size);
+    ringSlots = slots;
+    ringSubmitted = __atomic_load_n(reinterpret_cast<uint64_t*>(ring + ringSubmittedOffset), __ATOMIC_ACQUIRE);
+    ringReceived = ringSubmitted;
+    connected = true;
+    return true;
+}
+
+bool AIClient::send_state_shm(const std::vector<float>& features) {
+    if (ring == nullptr || features.size() != ringStateSize) return false;
+    if (ringSubmitted - ringReceived >= ringSlots) return false;  // Every slot is outstanding
+    float* slot = reinterpret_cast<float*>(ring + ringStatesOffset) + (ringSubmitted % ringSlots) * ringStateSize;
+    std::memcpy(slot, features.data(), ringStateSize * sizeof(float));
+    ++ringSubmitted;
+    // Release: the state is visible before the counter that publishes it
+    __atomic_store_n(reinterpret_cast<uint64_t*>(ring + ringSubmittedOffset), ringSubmitted, __ATOMIC_RELEASE);
+    return true;
+}
+
+int AIClient::recv_action_shm() {
+    // Returns the action index (0-2) of the oldest outstanding state, or -1 if not answered yet.
+    // A stopped server detaches the ring, so is_shm() turns false.
+    if (ring == nullptr || ringReceived >= ringSubmitted) return -1;
+    uint64_t completed = __atomic_load_n(reinterpret_cast<uint64_t*>(ring + ringCompletedOffset), __ATOMIC_ACQUIRE);
+    if (completed <= ringReceived) {
+        uint32_t flags = __atomic_load_n(reinterpret_cast<uint32_t*>(ring + ringFlagsOffset), __ATOMIC_ACQUIRE);
+        if (!(flags & ringFlagServing)) {
+            munmap(ring, ringSize);
+            ring = nullptr;
+            connected = false;
+        }
+        return -1;
+    }
+    const int8_t* actions = reinterpret_cast<const int8_t*>(ring + ringStatesOffset +
+                                                            static_cast<size_t>(ringSlots) * ringStateSize * sizeof(float));
+    int action = actions[ringReceived % ringSlots];
+    ++ringReceived;
+    return action;
+}
+
+bool AIClient::is_shm() const {
+    return ring != nullptr;
+}
+
 std::string AIClient::recv_action() {
     if (!connected) return "";
     char buffer[4096];
@@ -1,16 +1,39 @@
 #pragma once
 
+#include <cstddef>
+#include <cstdint>
 #include <string>
+#include <vector>
 
 class AIClient {
 public:
     AIClient();
     ~AIClient();
-    bool connect(const std::string& host, int port);
+    bool connect(const std::string& host, int port, bool binary = false);
+    // Same protocol over a Unix domain socket (inference_server.py --unix-socket)
+    bool connect_unix(const std::string& path, bool binary = false);
+    // Shared-memory ring of a co-located server (inference_server.py --shm NAME)
+    bool connect_shm(const std::string& name);
     bool send_state(const std::string& json);
     std::string recv_action();
+    bool send_state_binary(const std::vector<float>& features);
+    int recv_action_binary();
+    bool is_binary() const;
+    bool send_state_shm(const std::vector<float>& features);
+    int recv_action_shm();
+    bool is_shm() const;
 
 private:
+    bool setupConnection(bool useBinary);
+
     int sock;
     bool connected;
+    bool binary;
+    std::string rxBuffer;
+    // Shared-memory ring (layout in src/ai/shm_ring.py)
+    unsigned char* ring;
+    size_t ringSize;
+    uint32_t ringSlots;
+    uint64_t ringSubmitted;
+    uint64_t ringReceived;
 };
\ No newline at end of file
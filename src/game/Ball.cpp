@@ -1,17 +1,16 @@
 #include "Ball.h"
-#include <cstdlib>
 #include <cmath>
 
-Ball::Ball() {
+Ball::Ball(Random& rng) {
     shape.setRadius(10);
     shape.setFillColor(sf::Color::White);
     initialPosition = sf::Vector2f(400, 300);
     shape.setPosition(initialPosition - sf::Vector2f(10, 10)); // Position at top-left for shape
     speedMultiplier = 1.0f;  // Added: Initialize speed multiplier
-    // Deterministic random seed
-    std::srand(42);
+    // Deterministic random seed: the game's generator restarts from its seed
+    rng.reseed();
     // Random initial direction
-    float angle = (std::rand() % 360) * 3.14159f / 180.0f;
+    float angle = (rng.next() % 360) * 3.14159f / 180.0f;
     float speed = 300.0f;
     velocity = sf::Vector2f(std::cos(angle) * speed, std::sin(angle) * speed);
 }
@@ -48,12 +47,12 @@ sf::Vector2f Ball::getPosition() const {
     return shape.getPosition() + sf::Vector2f(10, 10); // Return center position
 }
 
-void Ball::reset() {
+void Ball::reset(Random& rng) {
     shape.setPosition(initialPosition - sf::Vector2f(10, 10));
     speedMultiplier = 1.0f;  // Reset speed multiplier
     // Reseed for deterministic behavior on reset
-    std::srand(42);
-    float angle = (std::rand() % 360) * 3.14159f / 180.0f;
+    rng.reseed();
+    float angle = (rng.next() % 360) * 3.14159f / 180.0f;
     float speed = 300.0f;
     velocity = sf::Vector2f(std::cos(angle) * speed, std::sin(angle) * speed);
 }
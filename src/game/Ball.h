@@ -1,17 +1,18 @@
 #pragma once
 
 #include <SFML/Graphics.hpp>
+#include "Random.h"
 
 class Ball {
 public:
-    Ball();
+    explicit Ball(Random& rng);
     void update(float dt);
     void bounceX();
     void bounceY();
     void draw(sf::RenderWindow& window);
     sf::FloatRect getBounds() const;
     sf::Vector2f getPosition() const;
-    void reset();
+    void reset(Random& rng);
     void setSpeedMultiplier(float mult);
 
 public:
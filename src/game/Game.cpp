@@ -1,4 +1,5 @@
 #include "Game.h"
+#include "Protocol.h"
 #include <cmath>
 #include <iostream>
 #include <sys/socket.h>
@@ -6,12 +7,13 @@
 #include <arpa/inet.h>
 #include <unistd.h>
 #include <cstring>
+#include <cstdint>
+#include <cstdlib>
+#include <poll.h>
 
-const float fixedDt = 1.0f / 60.0f;
-
-Game::Game(bool sm) : window(nullptr), playerPaddle(true), botPaddle(false), playerScore(0), botScore(0), paused(false), serverMode(sm), botAction(1) {
+Game::Game(bool sm, int p, bool ls, unsigned s) : window(nullptr), playerPaddle(true), botPaddle(false), playerScore(0), botScore(0), paused(false), rng(s), powerUpManager(rng), serverMode(sm), port(p), lockstep(ls), botAction(1) {
     // Constructor: initialize window, paddles, balls, scores, paused state
-    balls.emplace_back();  // Start with one ball
+    balls.emplace_back(rng);  // Start with one ball
     if (!serverMode) {
         window = new sf::RenderWindow(sf::VideoMode({800, 600}), "Pong Evolved");
     }
@@ -178,7 +180,7 @@ void Game::render() {
 void Game::reset() {
     // Reset positions after scoring
     balls.clear();
-    balls.emplace_back();  // Reset to one ball
+    balls.emplace_back(rng);  // Reset to one ball
     playerPaddle.reset();
     botPaddle.reset();
     // Output scores to console (since no HUD assets)
@@ -189,7 +191,7 @@ void Game::setBotAction(int action) {
     botAction = action;
 }
 
-std::string Game::getStateJson() {
+std::string Game::getStateJson(bool connLockstep) {
     std::string stateJson = "{";
     stateJson += "\"balls\":[";
     for (size_t i = 0; i < balls.size(); ++i) {
@@ -209,10 +211,177 @@ std::string Game::getStateJson() {
     stateJson += "}";
 
     // Wrap in message format expected by Python client
-    std::string messageJson = "{\"data\":" + stateJson + "}";
+    std::string messageJson = "{\"data\":" + stateJson + ",\"lockstep\":" + (connLockstep ? "true" : "false") + "}";
     return messageJson;
 }
 
+std::string Game::getStateFrame() {
+    std::string frame;
+    appendFrame(frame, frameState, getStatePayload());
+    return frame;
+}
+
+std::string Game::getStatePayload() {
+    std::string payload;
+    payload.reserve(128);
+
+    // 14-feature vector, same layout as PongEnv._flatten_obs
+    sf::Vector2f ballPos(400, 300), ballVel(0, 0);
+    if (!balls.empty()) {
+        ballPos = balls[0].getPosition();
+        ballVel = balls[0].velocity;
+    }
+    sf::Vector2f ppos = playerPaddle.getPosition();
+    sf::Vector2f bpos = botPaddle.getPosition();
+    const float features[14] = {
+        ballPos.x, ballPos.y, ballVel.x, ballVel.y,
+        ppos.x, ppos.y, playerPaddle.shape.getSize().x, playerPaddle.shape.getSize().y,
+        bpos.x, bpos.y, botPaddle.shape.getSize().x, botPaddle.shape.getSize().y,
+        static_cast<float>(playerScore), static_cast<float>(botScore)
+    };
+    for (float f : features) {
+        appendFloat(payload, f);
+    }
+
+    appendU16(payload, static_cast<uint16_t>(balls.size()));
+    for (const auto& ball : balls) {
+        sf::Vector2f pos = ball.getPosition();
+        appendFloat(payload, pos.x);
+        appendFloat(payload, pos.y);
+        appendFloat(payload, ball.velocity.x);
+        appendFloat(payload, ball.velocity.y);
+    }
+
+    const auto& powerUps = powerUpManager.getPowerUps();
+    appendU16(payload, static_cast<uint16_t>(powerUps.size()));
+    for (const auto& pu : powerUps) {
+        sf::Vector2f pos = pu.getPosition();
+        payload.push_back(static_cast<char>(pu.getType()));
+        appendFloat(payload, pos.x);
+        appendFloat(payload, pos.y);
+    }
+
+    const auto& effects = powerUpManager.getActiveEffects();
+    appendU16(payload, static_cast<uint16_t>(effects.size()));
+    for (const auto& effect : effects) {
+        payload.push_back(static_cast<char>(effect.type));
+        appendFloat(payload, effect.timeLeft);
+    }
+
+    return payload;
+}
+
+bool Game::negotiateBinary(int client_sock, bool& lockstep) {
+    // Binary clients send the magic immediately and JSON clients a hello line
+    // {"type": "hello", "lockstep": bool}, which also sets the connection's stepping
+    // mode; both are answered at once. Older JSON clients wait for the first state
+    // without sending anything, so a blocking peek would hang them: they start after
+    // the 100 ms poll window.
+    pollfd pfd;
+    pfd.fd = client_sock;
+    pfd.events = POLLIN;
+    pfd.revents = 0;
+    if (poll(&pfd, 1, 100) <= 0) {
+        return false;
+    }
+    char magic[sizeof(protocolMagic)];
+    ssize_t len = recv(client_sock, magic, 1, MSG_PEEK);
+    if (len == 1 && magic[0] == '{') {
+        // Read exactly the hello line; the client sends nothing else before the first state
+        std::string hello;
+        char c;
+        while (hello.size() < maxFrameLength && recv(client_sock, &c, 1, 0) == 1 && c != '\n') {
+            hello.push_back(c);
+        }
+        parseLockstepRequest(hello, lockstep);
+        return false;
+    }
+    if (len != 1 || magic[0] != protocolMagic[0]) {
+        return false;
+    }
+    len = recv(client_sock, magic, sizeof(magic), MSG_WAITALL);
+    if (len != static_cast<ssize_t>(sizeof(magic)) || std::memcmp(magic, protocolMagic, sizeof(magic)) != 0) {
+        return false;
+    }
+    return send(client_sock, protocolMagic, sizeof(protocolMagic), 0) == static_cast<ssize_t>(sizeof(protocolMagic));
+}
+
+bool Game::recvJsonAction(int client_sock) {
+    char buffer[4096];
+    int len = recv(client_sock, buffer, sizeof(buffer) - 1, 0);
+    if (len > 0) {
+        buffer[len] = '\0';
+        std::string msg(buffer);
+        size_t pos = msg.find("\"action\":");
+        if (pos != std::string::npos) {
+            size_t start = pos + 10;
+            size_t end = msg.find_first_of(",}", start);
+            try {
+                int action = std::stoi(msg.substr(start, end - start));
+                setBotAction(action);
+            } catch (const std::exception& e) {
+                std::cerr << "Invalid action JSON: " << e.what() << "\n";
+            }
+        }
+        return true;
+    } else if (len == 0) {
+        // Client disconnected
+        return false;
+    }
+    std::cerr << "Recv error\n";
+    return false;
+}
+
+bool Game::parseLockstepRequest(const std::string& msg, bool& lockstep) {
+    // {"lockstep": true|false} switches a connection's stepping mode
+    size_t pos = msg.find("\"lockstep\":");
+    if (pos == std::string::npos) {
+        return false;
+    }
+    lockstep = msg.find("true", pos) == msg.find_first_not_of(" ", pos + 11);
+    std::cout << "Client switched to " << (lockstep ? "lockstep" : "real-time") << " stepping.\n";
+    return true;
+}
+
+bool Game::sendLockstepReply(int client_sock, bool lockstep) {
+    // {"type":"lockstep","lockstep":...} tells a binary client which mode it actually got
+    std::string frame;
+    appendFrame(frame, frameJson, std::string("{\"type\":\"lockstep\",\"lockstep\":") + (lockstep ? "true" : "false") + "}");
+    return send(client_sock, frame.data(), frame.size(), 0) == static_cast<ssize_t>(frame.size());
+}
+
+bool Game::recvBinaryAction(int client_sock, std::string& rxBuffer, bool& lockstep) {
+    char buffer[4096];
+    while (true) {
+        // Consume complete frames until an action arrives
+        uint8_t type;
+        uint32_t length;
+        FrameStatus status;
+        while ((status = peekFrame(rxBuffer, 0, type, length)) == FrameStatus::Ready) {
+            bool isAction = type == frameAction && length >= 1;
+            if (isAction) {
+                setBotAction(static_cast<int8_t>(rxBuffer[frameHeaderSize]));
+            } else if (type == frameJson && parseLockstepRequest(rxBuffer.substr(frameHeaderSize, length), lockstep)
+                       && !sendLockstepReply(client_sock, lockstep)) {
+                return false;
+            }
+            rxBuffer.erase(0, frameHeaderSize + length);
+            if (isAction) {
+                return true;
+            }
+        }
+        if (status == FrameStatus::TooLarge) {
+            std::cerr << "Frame too large\n";
+            return false;
+        }
+        ssize_t len = recv(client_sock, buffer, sizeof(buffer), 0);
+        if (len <= 0) {
+            return false;
+        }
+        rxBuffer.append(buffer, static_cast<size_t>(len));
+    }
+}
+
 void Game::serverLoop() {
     int server_sock = socket(AF_INET, SOCK_STREAM, 0);
     if (server_sock == -1) {
@@ -222,7 +391,7 @@ void Game::serverLoop() {
     sockaddr_in addr;
     memset(&addr, 0, sizeof(addr));
     addr.sin_family = AF_INET;
-    addr.sin_port = htons(6000);
+    addr.sin_port = htons(static_cast<uint16_t>(port));
     addr.sin_addr.s_addr = INADDR_ANY;
     if (bind(server_sock, (sockaddr*)&addr, sizeof(addr)) == -1) {
         std::cerr << "Bind failed\n";
@@ -234,7 +403,7 @@ void Game::serverLoop() {
         close(server_sock);
         return;
     }
-    std::cout << "Server started, waiting for clients on port 6000...\n";
+    std::cout << "Server started, waiting for clients on port " << port << "...\n";
     while (true) {
         sockaddr_in client_addr;
         socklen_t client_len = sizeof(client_addr);
@@ -253,36 +422,36 @@ void Game::serverLoop() {
 
 void Game::handleClient(int client_sock) {
     float accumulator = 0.0f;
+    bool connLockstep = lockstep;
+    bool binary = negotiateBinary(client_sock, connLockstep);
+    std::string rxBuffer;
+    if (binary) {
+        std::cout << "Client negotiated binary protocol.\n";
+        // Announce the stepping mode before the first state; older clients skip non-state frames
+        std::string hello = std::string("{\"type\":\"hello\",\"lockstep\":") + (connLockstep ? "true" : "false") +
+                            ",\"dt\":" + std::to_string(fixedDt) + "}";
+        std::string frame;
+        appendFrame(frame, frameJson, hello);
+        if (send(client_sock, frame.data(), frame.size(), 0) == -1) {
+            return;
+        }
+    }
     while (true) {
-        std::string state = getStateJson();
-        ssize_t sent = send(client_sock, (state + "\n").c_str(), state.size() + 1, 0);
+        std::string state = binary ? getStateFrame() : getStateJson(connLockstep) + "\n";
+        ssize_t sent = send(client_sock, state.data(), state.size(), 0);
         if (sent == -1) {
             std::cerr << "Send failed\n";
             break;
         }
-        char buffer[4096];
-        int len = recv(client_sock, buffer, sizeof(buffer) - 1, 0);
-        if (len > 0) {
-            buffer[len] = '\0';
-            std::string msg(buffer);
-            size_t pos = msg.find("\"action\":");
-            if (pos != std::string::npos) {
-                size_t start = pos + 10;
-                size_t end = msg.find_first_of(",}", start);
-                try {
-                    int action = std::stoi(msg.substr(start, end - start));
-                    setBotAction(action);
-                } catch (const std::exception& e) {
-                    std::cerr << "Invalid action JSON: " << e.what() << "\n";
-                }
-            }
-        } else if (len == 0) {
-            // Client disconnected
-            break;
-        } else {
-            std::cerr << "Recv error\n";
+        bool received = binary ? recvBinaryAction(client_sock, rxBuffer, connLockstep) : recvJsonAction(client_sock);
+        if (!received) {
             break;
         }
+        if (connLockstep) {
+            // Lockstep: exactly one tick per action, as fast as the client drives it
+            update(fixedDt);
+            continue;
+        }
         float dt = clock.restart().asSeconds();
         accumulator += dt;
         while (accumulator >= fixedDt) {
@@ -7,21 +7,32 @@
 #include "Ball.h"
 #include "PowerUpManager.h"
 
+const float fixedDt = 1.0f / 60.0f;  // Simulation tick
+
 class Game {
 public:
-    Game(bool serverMode = false);
+    Game(bool serverMode = false, int port = 6000, bool lockstep = false, unsigned seed = 42);
     ~Game();
     void run();
 
 private:
+    friend class GameHost;  // Hosts several server-mode games on one connection
+
     void update(float dt);
     void render();
     void handleInput();
     void reset();
     void setBotAction(int action);
-    std::string getStateJson();
+    std::string getStateJson(bool connLockstep);
+    std::string getStateFrame();
+    std::string getStatePayload();
     void serverLoop();
     void handleClient(int client_sock);
+    bool negotiateBinary(int client_sock, bool& lockstep);
+    bool recvJsonAction(int client_sock);
+    bool recvBinaryAction(int client_sock, std::string& rxBuffer, bool& lockstep);
+    static bool parseLockstepRequest(const std::string& msg, bool& lockstep);
+    static bool sendLockstepReply(int client_sock, bool lockstep);
 
     sf::RenderWindow* window;
     Paddle playerPaddle, botPaddle;
@@ -30,7 +41,10 @@ private:
     bool paused;
     sf::Clock clock;
     std::string title;
+    Random rng;  // This game's rand(), seeded with --seed: serves and power-up spawns
     PowerUpManager powerUpManager;
     bool serverMode;
+    int port;
+    bool lockstep;  // Default for new connections; binary clients can opt in per connection
     int botAction;
 };
\ No newline at end of file
@@ -0,0 +1,162 @@
+#include "GameHost.h"
+#include "Protocol.h"
+#include <iostream>
+#include <sys/socket.h>
+#include <netinet/in.h>
+#include <unistd.h>
+#include <cstring>
+
+GameHost::GameHost(int gameCount, int p, bool ls, unsigned s) : port(p), lockstep(ls), seed(s) {
+    for (int i = 0; i < gameCount; ++i) {
+        games.push_back(std::make_unique<Game>(true, p, ls, s + static_cast<unsigned>(i)));
+    }
+}
+
+void GameHost::run() {
+    int server_sock = socket(AF_INET, SOCK_STREAM, 0);
+    if (server_sock == -1) {
+        std::cerr << "Failed to create socket\n";
+        return;
+    }
+    sockaddr_in addr;
+    memset(&addr, 0, sizeof(addr));
+    addr.sin_family = AF_INET;
+    addr.sin_port = htons(static_cast<uint16_t>(port));
+    addr.sin_addr.s_addr = INADDR_ANY;
+    if (bind(server_sock, (sockaddr*)&addr, sizeof(addr)) == -1) {
+        std::cerr << "Bind failed\n";
+        close(server_sock);
+        return;
+    }
+    if (listen(server_sock, 1) == -1) {
+        std::cerr << "Listen failed\n";
+        close(server_sock);
+        return;
+    }
+    std::cout << "Server started with " << games.size() << " games, waiting for clients on port " << port << "...\n";
+    while (true) {
+        sockaddr_in client_addr;
+        socklen_t client_len = sizeof(client_addr);
+        int client_sock = accept(server_sock, (sockaddr*)&client_addr, &client_len);
+        if (client_sock == -1) {
+            std::cerr << "Accept failed\n";
+            continue;
+        }
+        std::cout << "Client connected.\n";
+        handleClient(client_sock);
+        close(client_sock);
+        std::cout << "Client disconnected, waiting for next client...\n";
+    }
+    close(server_sock);
+}
+
+std::string GameHost::getGameStateFrame(uint16_t id) {
+    std::string payload;
+    appendU16(payload, id);
+    payload += games[id]->getStatePayload();
+    std::string frame;
+    appendFrame(frame, frameGameState, payload);
+    return frame;
+}
+
+void GameHost::handleClient(int client_sock) {
+    bool connLockstep = lockstep;
+    if (!games.front()->negotiateBinary(client_sock, connLockstep)) {
+        std::cerr << "Multi-game server needs the binary protocol\n";
+        return;
+    }
+    std::string hello = std::string("{\"type\":\"hello\",\"lockstep\":") + (connLockstep ? "true" : "false") +
+                        ",\"dt\":" + std::to_string(fixedDt) + ",\"games\":" + std::to_string(games.size()) +
+                        ",\"seed\":" + std::to_string(seed) + "}";
+    std::string out;
+    appendFrame(out, frameJson, hello);
+    for (size_t id = 0; id < games.size(); ++id) {
+        out += getGameStateFrame(static_cast<uint16_t>(id));
+    }
+    if (send(client_sock, out.data(), out.size(), 0) == -1) {
+        return;
+    }
+
+    float accumulator = 0.0f;
+    clock.restart();
+    std::string rxBuffer;
+    GameActions acted;
+    while (true) {
+        acted.clear();
+        if (!recvGameActions(client_sock, rxBuffer, acted, connLockstep)) {
+            break;
+        }
+        out.clear();
+        if (connLockstep) {
+            // In arrival order, one tick of the acted-on game per action, each answered
+            // with the state it produced (a game listed twice ticks twice)
+            for (const auto& [id, action] : acted) {
+                games[id]->setBotAction(action);
+                games[id]->update(fixedDt);
+                out += getGameStateFrame(id);
+            }
+        } else {
+            // Real time: every game follows the wall clock, one frame wait per batch of
+            // actions; a game's last action in the batch holds, and each is answered
+            for (const auto& [id, action] : acted) {
+                games[id]->setBotAction(action);
+            }
+            accumulator += clock.restart().asSeconds();
+            while (accumulator >= fixedDt) {
+                for (auto& game : games) {
+                    game->update(fixedDt);
+                }
+                accumulator -= fixedDt;
+            }
+            for (const auto& entry : acted) {
+                out += getGameStateFrame(entry.first);
+            }
+        }
+        if (send(client_sock, out.data(), out.size(), 0) == -1) {
+            std::cerr << "Send failed\n";
+            break;
+        }
+        if (!connLockstep) {
+            usleep(16000);
+        }
+    }
+}
+
+bool GameHost::recvGameActions(int client_sock, std::string& rxBuffer, GameActions& acted, bool& lockstep) {
+    // Blocks until at least one game action arrives, then takes every complete frame already received
+    char buffer[65536];
+    while (true) {
+        size_t offset = 0;
+        uint8_t type;
+        uint32_t length;
+        FrameStatus status;
+        while ((status = peekFrame(rxBuffer, offset, type, length)) == FrameStatus::Ready) {
+            const char* payload = rxBuffer.data() + offset + frameHeaderSize;
+            if (type == frameGameAction && length >= 3) {
+                uint16_t id = static_cast<uint16_t>(static_cast<uint8_t>(payload[0]) | static_cast<uint8_t>(payload[1]) << 8);
+                if (id < games.size()) {
+                    acted.emplace_back(id, static_cast<int8_t>(payload[2]));
+                } else {
+                    std::cerr << "Action for unknown game " << id << "\n";
+                }
+            } else if (type == frameJson && Game::parseLockstepRequest(std::string(payload, length), lockstep)
+                       && !Game::sendLockstepReply(client_sock, lockstep)) {
+                return false;
+            }
+            offset += frameHeaderSize + length;
+        }
+        rxBuffer.erase(0, offset);
+        if (status == FrameStatus::TooLarge) {
+            std::cerr << "Frame too large\n";
+            return false;
+        }
+        if (!acted.empty()) {
+            return true;
+        }
+        ssize_t len = recv(client_sock, buffer, sizeof(buffer), 0);
+        if (len <= 0) {
+            return false;
+        }
+        rxBuffer.append(buffer, static_cast<size_t>(len));
+    }
+}
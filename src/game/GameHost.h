@@ -0,0 +1,29 @@
+#pragma once
+
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+#include "Game.h"
+
+// Server mode with several independent games in one process (--games N). A
+// binary client steps any of them over a single connection: every action and
+// state frame carries the game id (see src/ai/protocol.py).
+class GameHost {
+public:
+    GameHost(int gameCount, int port = 6000, bool lockstep = false, unsigned seed = 42);
+    void run();
+
+private:
+    void handleClient(int client_sock);
+    // (game id, action) in arrival order; a game may appear more than once
+    using GameActions = std::vector<std::pair<uint16_t, int8_t>>;
+    bool recvGameActions(int client_sock, std::string& rxBuffer, GameActions& acted, bool& lockstep);
+    std::string getGameStateFrame(uint16_t id);
+
+    std::vector<std::unique_ptr<Game>> games;
+    int port;
+    bool lockstep;
+    unsigned seed;  // Game i is seeded with seed + i
+    sf::Clock clock;
+};
@@ -28,6 +28,11 @@ sf::FloatRect PowerUp::getBounds() const {
     return shape.getGlobalBounds();
 }
 
+sf::Vector2f PowerUp::getPosition() const {
+    // Return center position
+    return shape.getPosition() + sf::Vector2f(shape.getRadius(), shape.getRadius());
+}
+
 PowerUpType PowerUp::getType() const {
     return type;
 }
\ No newline at end of file
@@ -10,6 +10,7 @@ public:
     void update(float dt);
     void draw(sf::RenderWindow& window);
     sf::FloatRect getBounds() const;
+    sf::Vector2f getPosition() const;
     PowerUpType getType() const;
 
 private:
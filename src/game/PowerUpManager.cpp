@@ -1,7 +1,6 @@
 #include "PowerUpManager.h"
-#include <cstdlib>
 
-PowerUpManager::PowerUpManager() {
+PowerUpManager::PowerUpManager(Random& r) : rng(r) {
     // Hardcode config values
     durations[PowerUpType::ExtendPaddle] = 10.0f;
     durations[PowerUpType::SplitBall] = 0.0f;
@@ -66,7 +65,7 @@ void PowerUpManager::draw(sf::RenderWindow& window) {
 }
 
 void PowerUpManager::spawnPowerUp(PowerUpType type) {
-    float x = static_cast<float>(std::rand() % 800);
+    float x = static_cast<float>(rng.next() % 800);
     sf::Vector2f pos(x, 0);
     powerUps.emplace_back(type, pos);
 }
@@ -78,7 +77,7 @@ void PowerUpManager::applyEffect(PowerUpType type, Paddle& playerPaddle, std::ve
             activeEffects.push_back({type, durations[type]});
             break;
         case PowerUpType::SplitBall:
-            balls.emplace_back(); // Spawn extra ball
+            balls.emplace_back(rng); // Spawn extra ball
             break;
         case PowerUpType::SlowMotion:
             for (auto& ball : balls) {
@@ -107,4 +106,8 @@ void PowerUpManager::revertEffect(PowerUpType type, Paddle& playerPaddle, std::v
 
 const std::vector<ActiveEffect>& PowerUpManager::getActiveEffects() const {
     return activeEffects;
+}
+
+const std::vector<PowerUp>& PowerUpManager::getPowerUps() const {
+    return powerUps;
 }
\ No newline at end of file
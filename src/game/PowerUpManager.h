@@ -13,16 +13,18 @@ struct ActiveEffect {
 
 class PowerUpManager {
 public:
-    PowerUpManager();
+    explicit PowerUpManager(Random& rng);
     void update(float dt, const std::vector<Ball>& balls, Paddle& playerPaddle, std::vector<Ball>& ballsRef);
     void draw(sf::RenderWindow& window);
     const std::vector<ActiveEffect>& getActiveEffects() const;
+    const std::vector<PowerUp>& getPowerUps() const;
 
 private:
     void spawnPowerUp(PowerUpType type);
     void applyEffect(PowerUpType type, Paddle& playerPaddle, std::vector<Ball>& balls);
     void revertEffect(PowerUpType type, Paddle& playerPaddle, std::vector<Ball>& balls);
 
+    Random& rng;  // The owning game's generator: spawn positions and split balls
     std::vector<PowerUp> powerUps;
     std::vector<ActiveEffect> activeEffects;
     std::map<PowerUpType, float> spawnTimers;
@@ -0,0 +1,73 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+#include <string>
+
+// Binary protocol (see src/ai/protocol.py): clients opt in by sending the magic
+// right after connecting; frames are <uint32 length><uint8 type><payload>, little-endian.
+const char protocolMagic[4] = {'P', 'E', 'B', '1'};
+const uint8_t frameState = 1;
+const uint8_t frameAction = 2;
+const uint8_t frameJson = 3;
+const uint8_t frameGameState = 6;   // <uint16 game id> + state payload (GameHost)
+const uint8_t frameGameAction = 7;  // <uint16 game id> + int8 action (GameHost)
+const size_t frameHeaderSize = 5;
+const uint32_t maxFrameLength = 65536;  // Longest payload accepted, as the inference server's max_line
+
+inline void appendU16(std::string& out, uint16_t value) {
+    out.push_back(static_cast<char>(value & 0xff));
+    out.push_back(static_cast<char>(value >> 8));
+}
+
+inline void appendU32(std::string& out, uint32_t value) {
+    for (int i = 0; i < 4; ++i) {
+        out.push_back(static_cast<char>((value >> (8 * i)) & 0xff));
+    }
+}
+
+inline void appendFloat(std::string& out, float value) {
+    // IEEE-754 float32; all supported targets are little-endian
+    char bytes[sizeof(float)];
+    std::memcpy(bytes, &value, sizeof(float));
+    out.append(bytes, sizeof(float));
+}
+
+inline void appendFrame(std::string& out, uint8_t type, const char* payload, size_t size) {
+    appendU32(out, static_cast<uint32_t>(size));
+    out.push_back(static_cast<char>(type));
+    out.append(payload, size);
+}
+
+inline void appendFrame(std::string& out, uint8_t type, const std::string& payload) {
+    appendFrame(out, type, payload.data(), payload.size());
+}
+
+inline uint32_t readU32(const std::string& in, size_t offset) {
+    uint32_t value = 0;
+    for (int i = 0; i < 4; ++i) {
+        value |= static_cast<uint32_t>(static_cast<uint8_t>(in[offset + i])) << (8 * i);
+    }
+    return value;
+}
+
+enum class FrameStatus { Incomplete, Ready, TooLarge };
+
+// Header of the frame at `offset` in `in`: Ready once the whole frame has arrived, and
+// TooLarge as soon as the header announces more than maxFrameLength bytes, so the
+// connection is dropped instead of buffering the payload
+inline FrameStatus peekFrame(const std::string& in, size_t offset, uint8_t& type, uint32_t& length) {
+    if (in.size() - offset < frameHeaderSize) {
+        return FrameStatus::Incomplete;
+    }
+    length = readU32(in, offset);
+    if (length > maxFrameLength) {
+        return FrameStatus::TooLarge;
+    }
+    if (in.size() - offset < frameHeaderSize + static_cast<size_t>(length)) {
+        return FrameStatus::Incomplete;
+    }
+    type = static_cast<uint8_t>(in[offset + 4]);
+    return FrameStatus::Ready;
+}
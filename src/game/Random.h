@@ -0,0 +1,53 @@
+#pragma once
+
+#include <cstdint>
+
+// glibc's srand()/rand() (the default TYPE_3 additive feedback generator) as an
+// object each Game owns. Games in one process (GameHost) draw independently and
+// thread-safely, no platform's C library is involved, and the draws still match
+// ai.pong_sim.GlibcRand and the recorded traces.
+class Random {
+public:
+    explicit Random(unsigned seed = 1) : seed(seed) {
+        reseed();
+    }
+
+    // srand(seed): restart the sequence (every new ball is served from the start)
+    void reseed() {
+        int64_t word = seed ? seed : 1;
+        state[0] = static_cast<uint32_t>(word);
+        for (int i = 1; i < degree; ++i) {
+            // 16807 * word % 2147483647 without overflow (Schrage's method, as glibc)
+            int64_t hi = word / 127773;
+            int64_t lo = word % 127773;
+            word = 16807 * lo - 2836 * hi;
+            if (word < 0) {
+                word += 2147483647;
+            }
+            state[i] = static_cast<uint32_t>(word);
+        }
+        front = separation;
+        rear = 0;
+        for (int i = 0; i < 10 * degree; ++i) {
+            next();
+        }
+    }
+
+    // rand(): 0 .. 2^31 - 1
+    int next() {
+        state[front] += state[rear];
+        int result = static_cast<int>(state[front] >> 1);
+        front = front + 1 == degree ? 0 : front + 1;
+        rear = rear + 1 == degree ? 0 : rear + 1;
+        return result;
+    }
+
+private:
+    static const int degree = 31;
+    static const int separation = 3;
+
+    unsigned seed;
+    uint32_t state[degree];
+    int front;
+    int rear;
+};
@@ -1,14 +1,38 @@
 #include "Game.h"
+#include "GameHost.h"
+#include <cstdlib>
 #include <cstring>
 
 int main(int argc, char* argv[]) {
     bool server = false;
+    int port = 6000;
+    bool lockstep = false;
+    int games = 1;
+    unsigned seed = 42;
     for (int i = 1; i < argc; ++i) {
         if (std::strcmp(argv[i], "--server") == 0) {
             server = true;
+        } else if (std::strcmp(argv[i], "--lockstep") == 0) {
+            // One fixed tick per received action instead of real time; implies --server
+            server = true;
+            lockstep = true;
+        } else if (std::strcmp(argv[i], "--games") == 0 && i + 1 < argc) {
+            // Several independent games multiplexed over one binary connection; implies --server
+            server = true;
+            games = std::atoi(argv[++i]);
+        } else if (std::strcmp(argv[i], "--seed") == 0 && i + 1 < argc) {
+            // rand() seed for serves and power-up spawns; hosted game i gets seed + i
+            seed = static_cast<unsigned>(std::strtoul(argv[++i], nullptr, 10));
+        } else if (std::strcmp(argv[i], "--port") == 0 && i + 1 < argc) {
+            port = std::atoi(argv[++i]);
         }
     }
-    Game game(server);
+    if (games > 1) {
+        GameHost host(games, port, lockstep, seed);
+        host.run();
+        return 0;
+    }
+    Game game(server, port, lockstep, seed);
     game.run();
     return 0;
 }
\ No newline at end of file
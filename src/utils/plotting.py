@@ -0,0 +1,12 @@
+def load_pyplot():
+    """matplotlib.pyplot, imported on first use, or None if matplotlib is not installed.
+
+    Scripts only import matplotlib when they actually plot, so --help,
+    --no-plot and headless runs neither pay for the import nor need it.
+    """
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed; skipping plots")
+        return None
+    return plt
@@ -0,0 +1,96 @@
+// Records a game trace for tests/unit/test_pong_sim.py: the real Game::update
+// driven headlessly one fixedDt tick per action, as the --server loop does when
+// each action arrives one frame apart.
+//
+// Build and run from the repository root (SFML itself is not needed, see
+// sfml_stub/SFML/Graphics.hpp):
+//
+//   g++ -std=c++17 -O2 -Itests/fixtures/game_trace/sfml_stub -Isrc/game
+//       tests/fixtures/game_trace/record_trace.cpp src/game/Game.cpp src/game/Ball.cpp
+//       src/game/Paddle.cpp src/game/PowerUp.cpp src/game/PowerUpManager.cpp -o /tmp/record_trace
+//   /tmp/record_trace 12000 10 7 tests/fixtures/game_trace/trace_seed7.bin
+//
+// Output is a sequence of protocol frames (src/ai/protocol.py): a JSON frame
+// with the settings, an ACTIONS frame with the bot action (-1/0/1) of every
+// tick, then a STATE frame for the initial state and after every `stride` ticks.
+
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <map>
+#include <string>
+#include <vector>
+#include <SFML/Graphics.hpp>
+
+// Game keeps its state private; the recorder reads it directly
+#define private public
+#include "Game.h"
+#undef private
+
+static const float traceDt = 1.0f / 60.0f;  // Game.cpp fixedDt
+
+static std::string frame(uint8_t type, const std::string& payload) {
+    std::string out;
+    uint32_t length = static_cast<uint32_t>(payload.size());
+    for (int i = 0; i < 4; ++i) out.push_back(static_cast<char>((length >> (8 * i)) & 0xff));
+    out.push_back(static_cast<char>(type));
+    return out + payload;
+}
+
+int main(int argc, char** argv) {
+    if (argc != 5) {
+        std::cerr << "usage: record_trace <ticks> <stride> <seed> <out>\n";
+        return 1;
+    }
+    const int ticks = std::atoi(argv[1]);
+    const int stride = std::atoi(argv[2]);
+    uint32_t rng = static_cast<uint32_t>(std::atoi(argv[3]));
+
+    // Game prints every score to stdout; keep the console for the summary
+    std::streambuf* console = std::cout.rdbuf(nullptr);
+    Game game(true);
+
+    // Bot policy: mostly track the first ball so rallies last, with random
+    // spells so both sides score. Its own LCG keeps the game's rand() untouched.
+    std::vector<int8_t> actions;
+    std::string states = game.getStateFrame();
+    int randomFor = 0;
+    int8_t randomAction = 0;
+    for (int t = 0; t < ticks; ++t) {
+        rng = rng * 1664525u + 1013904223u;
+        uint32_t r = rng >> 8;
+        int8_t action;
+        if (randomFor > 0) {
+            --randomFor;
+            action = randomAction;
+        } else if (r % 100 < 2) {
+            randomFor = 10 + static_cast<int>((r >> 8) % 50);
+            randomAction = static_cast<int8_t>(static_cast<int>((r >> 16) % 3) - 1);
+            action = randomAction;
+        } else {
+            float ballY = game.balls[0].getPosition().y;
+            float botY = game.botPaddle.getPosition().y;
+            action = ballY < botY - 5 ? 1 : (ballY > botY + 5 ? -1 : 0);
+        }
+        actions.push_back(action);
+        game.setBotAction(action);
+        game.update(traceDt);
+        if ((t + 1) % stride == 0) {
+            states += game.getStateFrame();
+        }
+    }
+
+    std::cout.rdbuf(console);
+    std::string settings = "{\"ticks\": " + std::to_string(ticks) + ", \"stride\": " + std::to_string(stride) +
+                           ", \"seed\": " + argv[3] + "}";
+    std::ofstream out(argv[4], std::ios::binary);
+    out << frame(3, settings);
+    out << frame(5, std::string(reinterpret_cast<const char*>(actions.data()), actions.size()));
+    out << states;
+    std::cout << "Recorded " << ticks << " ticks, score " << game.playerScore << "-" << game.botScore
+              << ", " << game.balls.size() << " balls, " << game.powerUpManager.getPowerUps().size()
+              << " power-ups in flight\n";
+    return 0;
+}
@@ -0,0 +1,262 @@
+#pragma once
+
+// Minimal headless stand-in for the parts of SFML 3 the game logic uses, so
+// Game/Ball/Paddle/PowerUp/PowerUpManager can be compiled into the trace
+// recorder without SFML. Geometry (shape points, bounds, transforms and
+// Rect::findIntersection) follows the SFML 3.0 sources operation for
+// operation, in float, because collision timing depends on it; windowing,
+// input and drawing are no-ops.
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
+#include <optional>
+#include <string>
+#include <vector>
+
+namespace sf {
+
+template <typename T>
+struct Vector2 {
+    T x{}, y{};
+    constexpr Vector2() = default;
+    constexpr Vector2(T x_, T y_) : x(x_), y(y_) {}
+};
+
+template <typename T> Vector2<T> operator-(const Vector2<T>& v) { return {-v.x, -v.y}; }
+template <typename T> Vector2<T> operator+(const Vector2<T>& a, const Vector2<T>& b) { return {a.x + b.x, a.y + b.y}; }
+template <typename T> Vector2<T> operator-(const Vector2<T>& a, const Vector2<T>& b) { return {a.x - b.x, a.y - b.y}; }
+template <typename T> Vector2<T> operator*(const Vector2<T>& v, T s) { return {v.x * s, v.y * s}; }
+template <typename T> Vector2<T> operator*(T s, const Vector2<T>& v) { return {v.x * s, v.y * s}; }
+template <typename T> Vector2<T> operator/(const Vector2<T>& v, T s) { return {v.x / s, v.y / s}; }
+
+using Vector2f = Vector2<float>;
+using Vector2u = Vector2<unsigned int>;
+
+class Angle {
+public:
+    constexpr explicit Angle(float radians) : m_radians(radians) {}
+    constexpr float asRadians() const { return m_radians; }
+private:
+    float m_radians;
+};
+
+namespace priv { constexpr float pi = 3.141592654f; }
+inline Angle degrees(float angle) { return Angle(angle * (priv::pi / 180.f)); }
+inline Angle radians(float angle) { return Angle(angle); }
+inline Angle operator*(Angle a, float s) { return radians(a.asRadians() * s); }
+inline Angle operator*(float s, Angle a) { return a * s; }
+inline Angle operator-(Angle a, Angle b) { return radians(a.asRadians() - b.asRadians()); }
+
+// Vector2(T r, Angle phi)
+inline Vector2f polar(float r, Angle phi) {
+    return {r * static_cast<float>(std::cos(phi.asRadians())), r * static_cast<float>(std::sin(phi.asRadians()))};
+}
+
+template <typename T>
+struct Rect {
+    Vector2<T> position, size;
+    constexpr Rect() = default;
+    constexpr Rect(Vector2<T> p, Vector2<T> s) : position(p), size(s) {}
+
+    std::optional<Rect<T>> findIntersection(const Rect<T>& rectangle) const {
+        // By value: std::minmax would return references to the temporaries
+        const T r1MinX = std::min(position.x, static_cast<T>(position.x + size.x));
+        const T r1MaxX = std::max(position.x, static_cast<T>(position.x + size.x));
+        const T r1MinY = std::min(position.y, static_cast<T>(position.y + size.y));
+        const T r1MaxY = std::max(position.y, static_cast<T>(position.y + size.y));
+        const T r2MinX = std::min(rectangle.position.x, static_cast<T>(rectangle.position.x + rectangle.size.x));
+        const T r2MaxX = std::max(rectangle.position.x, static_cast<T>(rectangle.position.x + rectangle.size.x));
+        const T r2MinY = std::min(rectangle.position.y, static_cast<T>(rectangle.position.y + rectangle.size.y));
+        const T r2MaxY = std::max(rectangle.position.y, static_cast<T>(rectangle.position.y + rectangle.size.y));
+        const T interLeft = std::max(r1MinX, r2MinX);
+        const T interTop = std::max(r1MinY, r2MinY);
+        const T interRight = std::min(r1MaxX, r2MaxX);
+        const T interBottom = std::min(r1MaxY, r2MaxY);
+        if ((interLeft < interRight) && (interTop < interBottom)) {
+            return Rect<T>({interLeft, interTop}, {interRight - interLeft, interBottom - interTop});
+        }
+        return std::nullopt;
+    }
+};
+
+using FloatRect = Rect<float>;
+
+struct Color {
+    std::uint8_t r = 0, g = 0, b = 0, a = 255;
+    static const Color Black, White, Green, Blue, Yellow;
+};
+inline const Color Color::Black{0, 0, 0, 255};
+inline const Color Color::White{255, 255, 255, 255};
+inline const Color Color::Green{0, 255, 0, 255};
+inline const Color Color::Blue{0, 0, 255, 255};
+inline const Color Color::Yellow{255, 255, 0, 255};
+
+class Transform {
+public:
+    Transform(float a00, float a01, float a02, float a10, float a11, float a12)
+        : m{a00, a10, 0.f, 0.f, a01, a11, 0.f, 0.f, 0.f, 0.f, 1.f, 0.f, a02, a12, 0.f, 1.f} {}
+
+    Vector2f transformPoint(Vector2f point) const {
+        return {m[0] * point.x + m[4] * point.y + m[12], m[1] * point.x + m[5] * point.y + m[13]};
+    }
+
+    FloatRect transformRect(const FloatRect& rectangle) const {
+        const Vector2f points[] = {
+            transformPoint(rectangle.position),
+            transformPoint({rectangle.position.x, rectangle.position.y + rectangle.size.y}),
+            transformPoint({rectangle.position.x + rectangle.size.x, rectangle.position.y}),
+            transformPoint(rectangle.position + rectangle.size)};
+        float left = points[0].x, top = points[0].y, right = points[0].x, bottom = points[0].y;
+        for (int i = 1; i < 4; ++i) {
+            if (points[i].x < left) left = points[i].x;
+            else if (points[i].x > right) right = points[i].x;
+            if (points[i].y < top) top = points[i].y;
+            else if (points[i].y > bottom) bottom = points[i].y;
+        }
+        return FloatRect({left, top}, {right - left, bottom - top});
+    }
+
+private:
+    float m[16];
+};
+
+class RenderWindow;
+
+// Shape + Transformable, without rotation, scale or origin (the game never sets them)
+class Shape {
+public:
+    virtual ~Shape() = default;
+    virtual std::size_t getPointCount() const = 0;
+    virtual Vector2f getPoint(std::size_t index) const = 0;
+    virtual Vector2f getGeometricCenter() const = 0;
+
+    void setPosition(Vector2f position) { m_position = position; }
+    Vector2f getPosition() const { return m_position; }
+    void move(Vector2f offset) { setPosition(m_position + offset); }
+    void setFillColor(const Color&) {}
+    FloatRect getLocalBounds() const { return m_bounds; }
+
+    Transform getTransform() const {
+        const float angle = -0.f;
+        const float cosine = std::cos(angle);
+        const float sine = std::sin(angle);
+        const float sxc = 1.f * cosine, syc = 1.f * cosine, sxs = 1.f * sine, sys = 1.f * sine;
+        const float tx = -0.f * sxc - 0.f * sys + m_position.x;
+        const float ty = 0.f * sxs - 0.f * syc + m_position.y;
+        return Transform(sxc, sys, tx, -sxs, syc, ty);
+    }
+
+    FloatRect getGlobalBounds() const { return getTransform().transformRect(getLocalBounds()); }
+
+protected:
+    void update() {
+        // Vertex 0 is the geometric centre, 1..count the outline points
+        std::vector<Vector2f> vertices;
+        vertices.push_back(getGeometricCenter());
+        for (std::size_t i = 0; i < getPointCount(); ++i) vertices.push_back(getPoint(i));
+        float left = vertices[0].x, top = vertices[0].y, right = vertices[0].x, bottom = vertices[0].y;
+        for (const Vector2f& p : vertices) {
+            left = std::min(left, p.x);
+            right = std::max(right, p.x);
+            top = std::min(top, p.y);
+            bottom = std::max(bottom, p.y);
+        }
+        m_bounds = FloatRect({left, top}, {right - left, bottom - top});
+    }
+
+private:
+    Vector2f m_position;
+    FloatRect m_bounds;
+};
+
+class CircleShape : public Shape {
+public:
+    explicit CircleShape(float radius = 0, std::size_t pointCount = 30) : m_radius(radius), m_pointCount(pointCount) { update(); }
+    void setRadius(float radius) { m_radius = radius; update(); }
+    float getRadius() const { return m_radius; }
+    std::size_t getPointCount() const override { return m_pointCount; }
+    Vector2f getPoint(std::size_t index) const override {
+        const Angle angle = static_cast<float>(index) / static_cast<float>(m_pointCount) * degrees(360) - degrees(90);
+        return Vector2f(m_radius, m_radius) + polar(m_radius, angle);
+    }
+    Vector2f getGeometricCenter() const override { return {m_radius, m_radius}; }
+private:
+    float m_radius;
+    std::size_t m_pointCount;
+};
+
+class RectangleShape : public Shape {
+public:
+    explicit RectangleShape(Vector2f size = {}) { setSize(size); }
+    void setSize(Vector2f size) { m_size = size; update(); }
+    Vector2f getSize() const { return m_size; }
+    std::size_t getPointCount() const override { return 4; }
+    Vector2f getPoint(std::size_t index) const override {
+        switch (index) {
+            default:
+            case 0: return {0, 0};
+            case 1: return {m_size.x, 0};
+            case 2: return {m_size.x, m_size.y};
+            case 3: return {0, m_size.y};
+        }
+    }
+    Vector2f getGeometricCenter() const override { return m_size / 2.f; }
+private:
+    Vector2f m_size;
+};
+
+class Time {
+public:
+    explicit Time(float seconds = 0.f) : m_seconds(seconds) {}
+    float asSeconds() const { return m_seconds; }
+private:
+    float m_seconds;
+};
+
+class Clock {
+public:
+    // Real steady clock, so a headless --server build runs its real-time loop
+    Time restart() {
+        auto now = std::chrono::steady_clock::now();
+        float elapsed = std::chrono::duration<float>(now - m_start).count();
+        m_start = now;
+        return Time(elapsed);
+    }
+private:
+    std::chrono::steady_clock::time_point m_start = std::chrono::steady_clock::now();
+};
+
+namespace Keyboard {
+enum class Key { W, S, Up, Down, P };
+inline bool isKeyPressed(Key) { return false; }
+}
+
+struct VideoMode {
+    explicit VideoMode(Vector2u) {}
+};
+
+class Event {
+public:
+    struct Closed {};
+    struct KeyPressed { Keyboard::Key code; };
+    template <typename T> bool is() const { return false; }
+    template <typename T> const T* getIf() const { return nullptr; }
+};
+
+class RenderWindow {
+public:
+    RenderWindow(VideoMode, const std::string&) {}
+    bool isOpen() const { return false; }
+    void close() {}
+    std::optional<Event> pollEvent() { return std::nullopt; }
+    void clear(const Color&) {}
+    template <typename T> void draw(const T&) {}
+    void display() {}
+    bool hasFocus() const { return false; }
+    void setTitle(const std::string&) {}
+};
+
+}  // namespace sf
@@ -0,0 +1,217 @@
+import json
+import shutil
+import socket
+import subprocess
+import sys
+import os
+import time
+
+import numpy as np
+import pytest
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai import protocol as wire
+from ai.pong_env import PongEnv
+from ai.pong_sim import PongSim
+from ai.remote_vector_env import MultiGamePongVectorEnv, RemotePongVectorEnv
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+SOURCES = ['main.cpp', 'Game.cpp', 'GameHost.cpp', 'Ball.cpp', 'Paddle.cpp', 'PowerUp.cpp', 'PowerUpManager.cpp']
+
+@pytest.fixture(scope='module')
+def game_binary(tmp_path_factory):
+    """The real game server, built headless against the SFML stub"""
+    if shutil.which('g++') is None:
+        pytest.skip("g++ is not available")
+    binary = str(tmp_path_factory.mktemp('game') / 'pong_evolved')
+    subprocess.run(['g++', '-std=c++17', '-O2',
+                    '-I' + os.path.join(ROOT, 'tests', 'fixtures', 'game_trace', 'sfml_stub'),
+                    '-I' + os.path.join(ROOT, 'src', 'game'),
+                    *[os.path.join(ROOT, 'src', 'game', name) for name in SOURCES],
+                    '-o', binary], check=True)
+    return binary
+
+@pytest.fixture
+def game_server(game_binary):
+    processes = []
+    def start(*args):
+        with socket.create_server(('127.0.0.1', 0)) as probe:
+            port = probe.getsockname()[1]
+        proc = subprocess.Popen([game_binary, '--server', '--port', str(port), *args],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        processes.append(proc)
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                # The game serves one client at a time; this probe disconnects before any action
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return port
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+    yield start
+    for proc in processes:
+        proc.kill()
+        proc.wait()
+
+def test_client_requested_lockstep_matches_simulator(game_server):
+    port = game_server()
+    env = PongEnv(port=port, protocol='binary')
+    state = env.reset()
+    assert env.server_lockstep
+    sim = PongSim()
+    assert state == sim.state()
+    for i in range(3000):
+        state, _, _, _ = env.step(i // 7 % 3)
+        assert state == sim.step(i // 7 % 3 - 1), f"diverged at tick {i + 1}"
+    env.close()
+
+@pytest.mark.parametrize('games', [None, '2'])
+def test_lockstep_requests_are_answered(game_server, games):
+    port = game_server(*(['--games', games] if games else []))
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+        reader = wire.SocketReader(sock)
+        assert wire.negotiate_binary(sock, reader)
+        msg_type, payload = reader.read_frame()
+        assert msg_type == wire.JSON and json.loads(bytes(payload))['lockstep'] is False
+        for requested in (True, False):
+            sock.sendall(wire.encode_json({'lockstep': requested}))
+            # Past the first states to the game's reply
+            msg_type, payload = reader.read_frame()
+            while msg_type != wire.JSON:
+                msg_type, payload = reader.read_frame()
+            assert json.loads(bytes(payload)) == {'type': 'lockstep', 'lockstep': requested}
+
+def test_lockstep_flag_applies_to_json_clients(game_server):
+    port = game_server('--lockstep')
+    env = PongEnv(port=port, protocol='json')
+    obs = env.reset()
+    assert env.server_lockstep
+    sim = PongSim()
+    for _ in range(300):
+        obs, _, _, _ = env.step(2)
+        expected = sim.step(1)
+    np.testing.assert_allclose(env._flatten_obs(obs), env._flatten_obs(expected), atol=1e-3)
+    env.close()
+
+def test_json_hello_skips_the_binary_wait(game_server):
+    port = game_server()
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+        start = time.perf_counter()
+        sock.sendall(wire.encode_hello(lockstep=True))
+        reader = wire.SocketReader(sock)
+        msg = json.loads(bytes(reader.read_line()))
+        # Without the hello the game waits 100 ms for a binary magic
+        assert time.perf_counter() - start < 0.1
+    assert msg['lockstep'] is True
+    np.testing.assert_allclose(wire.flatten_state(msg['data']), wire.flatten_state(PongSim().state()), atol=1e-3)
+
+    env = PongEnv(port=port, protocol='json')
+    env.reset()
+    assert env.server_lockstep
+    sim = PongSim()
+    for i in range(300):
+        state, _, _, _ = env.step(i // 7 % 3)
+        expected = sim.step(i // 7 % 3 - 1)
+    np.testing.assert_allclose(env._flatten_obs(state), env._flatten_obs(expected), atol=1e-3)
+    env.close()
+
+def test_oversized_frame_drops_the_client(game_server):
+    port = game_server()
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+        reader = wire.SocketReader(sock)
+        assert wire.negotiate_binary(sock, reader)
+        while reader.read_frame()[0] != wire.STATE:
+            pass
+        # Only the header: the game must not wait for (or buffer) a 1 GB payload
+        sock.sendall(wire.FRAME_HEADER.pack(1 << 30, wire.ACTION))
+        assert sock.recv(1) == b''
+
+def test_lockstep_outpaces_real_time(game_server):
+    port = game_server()
+    env = PongEnv(port=port, protocol='binary', lockstep=False)
+    env.reset()
+    assert not env.server_lockstep
+    start = time.perf_counter()
+    for _ in range(10):
+        env.step(1)
+    real_time = 10 / (time.perf_counter() - start)
+    env.close()
+
+    env = PongEnv(port=port, protocol='binary')
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(1000):
+        env.step(1)
+    lockstep = 1000 / (time.perf_counter() - start)
+    env.close()
+    # Real time is paced at ~60 steps/s by the server's 16 ms sleep
+    assert real_time < 100 and lockstep > 10 * real_time
+
+def test_remote_vector_env_steps_servers_in_lockstep(game_server):
+    ports = [game_server() for _ in range(2)]
+    env = RemotePongVectorEnv([f'127.0.0.1:{port}' for port in ports])
+    obs, _ = env.reset()
+    assert all(conn.lockstep for conn in env.connections)
+    sims = [PongSim() for _ in ports]
+    for tick in range(500):
+        actions = [tick // 9 % 3, tick // 13 % 3]
+        obs, _, _, _, _ = env.step(actions)
+        expected = np.stack([wire.flatten_state(sim.step(a - 1)) for sim, a in zip(sims, actions)])
+        np.testing.assert_array_equal(obs, expected, err_msg=f"diverged at tick {tick + 1}")
+    env.close()
+
+def test_multi_game_server_matches_simulators(game_server):
+    port = game_server('--games', '4')
+    env = MultiGamePongVectorEnv(f'127.0.0.1:{port}')
+    obs, _ = env.reset()
+    assert env.num_envs == 4 and env.server_lockstep
+    # Hosted game i is seeded with --seed (default 42) + i
+    sims = [PongSim(seed=42 + i) for i in range(4)]
+    np.testing.assert_array_equal(obs, np.stack([wire.flatten_state(sim.state()) for sim in sims]))
+    assert len({tuple(row[2:4]) for row in obs}) == 4
+    rng = np.random.RandomState(0)
+    for tick in range(3000):
+        track = np.where(obs[:, 1] < obs[:, 9], 2, 0)
+        actions = np.where((np.arange(4) * 7 + tick) // 40 % 5 == 0, rng.randint(0, 3, 4), track)
+        obs, rewards, _, _, _ = env.step(actions)
+        expected = np.stack([wire.flatten_state(sim.step(int(a) - 1)) for sim, a in zip(sims, actions)])
+        np.testing.assert_array_equal(obs, expected, err_msg=f"diverged at tick {tick + 1}")
+    env.close()
+
+def test_multi_game_server_applies_repeated_game_actions_in_order(game_server):
+    port = game_server('--games', '2', '--lockstep')
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+        reader = wire.SocketReader(sock)
+        assert wire.negotiate_binary(sock, reader)
+        assert reader.read_frame()[0] == wire.JSON
+        for _ in range(2):
+            assert reader.read_frame()[0] == wire.GAME_STATE
+        # Game 0 twice in one batch: two ticks, each answered with its own state
+        sock.sendall(wire.encode_game_action(0, 1) + wire.encode_game_action(1, 0) + wire.encode_game_action(0, -1))
+        replies = []
+        for _ in range(3):
+            msg_type, payload = reader.read_frame()
+            assert msg_type == wire.GAME_STATE
+            (game,) = wire.GAME_ID.unpack_from(payload)
+            replies.append((game, wire.decode_features(payload[wire.GAME_ID.size:])))
+    sims = [PongSim(seed=42), PongSim(seed=43)]
+    expected = [(0, sims[0].step(1)), (1, sims[1].step(0)), (0, sims[0].step(-1))]
+    assert [game for game, _ in replies] == [game for game, _ in expected]
+    for (_, features), (_, state) in zip(replies, expected):
+        np.testing.assert_array_equal(features, wire.flatten_state(state))
+
+def test_multi_game_env_needs_multi_game_server(game_server):
+    port = game_server('--games', '3', '--lockstep', '--seed', '7')
+    env = MultiGamePongVectorEnv(f'127.0.0.1:{port}', num_envs=2, max_episode_steps=5)
+    obs, _ = env.reset()
+    np.testing.assert_array_equal(obs, np.stack([wire.flatten_state(PongSim(seed=seed).state()) for seed in (7, 8)]))
+    for step in range(1, 6):
+        _, _, _, truncated, _ = env.step([1, 2])
+    assert truncated.all() and env.games == 3
+    env.close()
+    with pytest.raises(ValueError):
+        MultiGamePongVectorEnv(f'127.0.0.1:{game_server()}')
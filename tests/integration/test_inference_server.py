@@ -0,0 +1,565 @@
+import asyncio
+import json
+import signal
+import socket
+import subprocess
+import sys
+import os
+import threading
+import time
+import urllib.request
+
+import pytest
+import torch
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai.model import DQN
+from ai.inference_server import InferenceServer
+from ai import protocol as wire
+from ai.model_registry import heuristic_action
+from ai.shm_ring import ShmRingClient, ShmRingServer
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    torch.manual_seed(0)
+    path = tmp_path / 'dqn_model.pth'
+    torch.save(DQN().state_dict(), path)
+    return str(path)
+
+
+@pytest.fixture
+def async_server(model_path):
+    server = InferenceServer(model_path, host='127.0.0.1', port=0)
+    server.load_model()
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve_async()), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+    return server
+
+
+def request(sock_file, sock, msg):
+    sock.sendall((json.dumps(msg) + '\n').encode('utf-8'))
+    return json.loads(sock_file.readline())
+
+
+def test_async_server_ping(async_server):
+    with socket.create_connection(('127.0.0.1', async_server.port), timeout=5) as sock:
+        reply = request(sock.makefile('r'), sock, {'ping': True})
+    assert reply['pong'] is True
+    assert reply['model_version'] == 1 and len(reply['model_hash']) == 12
+
+
+def test_async_server_many_clients(async_server):
+    states = torch.randn(50, 14)
+    with torch.no_grad():
+        expected = async_server.model(states).argmax(dim=1).tolist()
+
+    clients = [socket.create_connection(('127.0.0.1', async_server.port), timeout=5) for _ in range(50)]
+    try:
+        # All connections stay open while every client sends before any reads
+        for sock, state in zip(clients, states):
+            sock.sendall((json.dumps({'state': state.tolist()}) + '\n').encode('utf-8'))
+        actions = [json.loads(sock.makefile('r').readline())['action'] for sock in clients]
+    finally:
+        for sock in clients:
+            sock.close()
+
+    assert actions == expected
+
+
+def test_async_server_rejects_bad_state(async_server):
+    with socket.create_connection(('127.0.0.1', async_server.port), timeout=5) as sock:
+        reply = request(sock.makefile('r'), sock, {'state': [0.0] * 3})
+    assert reply == {'error': 'Invalid state size'}
+
+
+def test_async_server_batches_pipelined_states(async_server):
+    states = torch.randn(32, 14)
+    with torch.no_grad():
+        expected = async_server.model(states).argmax(dim=1).tolist()
+
+    with socket.create_connection(('127.0.0.1', async_server.port), timeout=5) as sock:
+        payload = ''.join(json.dumps({'state': state.tolist()}) + '\n' for state in states)
+        sock.sendall(payload.encode('utf-8'))
+        sock_file = sock.makefile('r')
+        actions = [json.loads(sock_file.readline())['action'] for _ in states]
+        stats = request(sock_file, sock, {'stats': True})['stats']
+
+    # Replies come back in request order even though states were batched
+    assert actions == expected
+    batching = stats['models']['default']['batching']
+    assert batching['requests'] == 32
+    assert batching['batches'] < 32
+    assert 'queue_wait_ms' in batching
+
+
+def test_async_server_binary_protocol(async_server):
+    states = torch.randn(8, 14)
+    with torch.no_grad():
+        expected = async_server.model(states).argmax(dim=1).tolist()
+
+    with socket.create_connection(('127.0.0.1', async_server.port), timeout=5) as sock:
+        reader = wire.SocketReader(sock)
+        assert wire.negotiate_binary(sock, reader)
+        sock.sendall(b''.join(wire.encode_frame(wire.STATE, state.numpy().tobytes()) for state in states))
+        actions = []
+        for _ in states:
+            msg_type, payload = reader.read_frame()
+            assert msg_type == wire.ACTION
+            actions.append(wire.ACTION_VALUE.unpack(payload)[0])
+        sock.sendall(wire.encode_json({'ping': True}))
+        msg_type, payload = reader.read_frame()
+
+    assert actions == expected
+    assert msg_type == wire.JSON and json.loads(bytes(payload))['pong'] is True
+
+
+def test_blocking_server_rejects_oversized_frame(model_path):
+    server = InferenceServer(model_path, host='127.0.0.1', port=0)
+    server.load_model()
+    client, conn = socket.socketpair()
+    thread = threading.Thread(target=server.handle_client, args=(conn,), daemon=True)
+    thread.start()
+    with client, conn:
+        reader = wire.SocketReader(client)
+        assert wire.negotiate_binary(client, reader)
+        # A 2 GiB length must not be buffered before it is refused
+        client.sendall(wire.FRAME_HEADER.pack(1 << 31, wire.STATE))
+        msg_type, payload = reader.read_frame()
+        thread.join(5)
+    assert msg_type == wire.JSON and json.loads(bytes(payload)) == {'error': 'Message too large'}
+    assert not thread.is_alive()
+
+
+def test_batched_states_request(async_server):
+    states = torch.randn(16, 14)
+    with torch.no_grad():
+        q_values = async_server.model(states)
+
+    with socket.create_connection(('127.0.0.1', async_server.port), timeout=5) as sock:
+        sock_file = sock.makefile('r')
+        reply = request(sock_file, sock, {'states': states.tolist(), 'q_values': True})
+        assert reply['actions'] == q_values.argmax(dim=1).tolist()
+        assert torch.allclose(torch.tensor(reply['q_values']), q_values, atol=1e-5)
+        assert 'q_values' not in request(sock_file, sock, {'states': states[:2].tolist()})
+
+        assert request(sock_file, sock, {'states': [[0.0] * 14, [0.0] * 13]}) == {'error': 'Invalid states'}
+        assert request(sock_file, sock, {'states': [[0.0] * 3]}) == {'error': 'Invalid state size'}
+        assert request(sock_file, sock, {'states': []}) == {'error': 'Invalid state size'}
+
+    with socket.create_connection(('127.0.0.1', async_server.port), timeout=5) as sock:
+        reader = wire.SocketReader(sock)
+        assert wire.negotiate_binary(sock, reader)
+        sock.sendall(wire.encode_states(states.numpy()))
+        msg_type, payload = reader.read_frame()
+        assert msg_type == wire.ACTIONS
+        assert bytes(payload) == bytes(q_values.argmax(dim=1).to(torch.int8).numpy())
+
+
+def test_admin_reload_swaps_model(async_server, model_path):
+    states = torch.randn(16, 14)
+    with socket.create_connection(('127.0.0.1', async_server.port), timeout=5) as sock:
+        sock_file = sock.makefile('r')
+        old_hash = request(sock_file, sock, {'ping': True})['model_hash']
+
+        torch.manual_seed(1)
+        new_model = DQN()
+        torch.save(new_model.state_dict(), model_path)
+        reply = request(sock_file, sock, {'reload': True})
+        assert reply['reloaded'] is True
+        assert reply['model_version'] == 2 and reply['model_hash'] != old_hash
+
+        actions = [request(sock_file, sock, {'state': state.tolist()})['action'] for state in states]
+    with torch.no_grad():
+        assert actions == new_model(states).argmax(dim=1).tolist()
+
+
+def test_deadline_falls_back_to_heuristic(model_path):
+    server = InferenceServer(model_path, host='127.0.0.1', port=0, max_batch_size=4)
+    server.load_model()
+    scheduler = server.scheduler
+    infer = scheduler.infer_fn
+
+    def slow_infer(states):
+        time.sleep(0.02)
+        return infer(states)
+    scheduler.infer_fn = slow_infer
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve_async()), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+
+    states = torch.randn(64, 14) * 300
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as sock:
+        sock_file = sock.makefile('r')
+        start = time.perf_counter()
+        payload = ''.join(json.dumps({'state': state.tolist(), 'deadline_ms': 50}) + '\n' for state in states)
+        sock.sendall(payload.encode('utf-8'))
+        actions = [json.loads(sock_file.readline())['action'] for _ in states]
+        elapsed = time.perf_counter() - start
+
+        # Without deadlines 16 batches of 20 ms would take 320 ms
+        assert elapsed < 0.2
+        stats = request(sock_file, sock, {'stats': True})['stats']['models']['default']
+        assert stats['deadline_misses'] > 0
+        served = stats['batching']['requests']
+        assert served + stats['deadline_misses'] == 64
+        assert actions[served:] == [heuristic_action(state.numpy()) for state in states[served:]]
+
+        # A request the latency estimate already rules out is answered at once
+        scheduler.forward_time = 1.0
+        request(sock_file, sock, {'state': [0.0] * 14, 'deadline_ms': 5})
+        assert stats_from(server.port)['models']['default']['batching']['deadline_rejected'] == 1
+
+
+@pytest.mark.parametrize('deadline_ms', [True, False, 0, -5, '5'])
+def test_invalid_deadline_is_rejected(async_server, deadline_ms):
+    with socket.create_connection(('127.0.0.1', async_server.port), timeout=5) as sock:
+        reply = request(sock.makefile('r'), sock, {'state': [0.0] * 14, 'deadline_ms': deadline_ms})
+    assert reply == {'error': 'Invalid deadline_ms'}
+
+
+def test_overload_sheds_with_retry_hint(model_path):
+    server = InferenceServer(model_path, host='127.0.0.1', port=0, max_batch_size=4, max_inflight=8)
+    server.load_model()
+    infer = server.scheduler.infer_fn
+
+    def slow_infer(states):
+        time.sleep(0.01)
+        return infer(states)
+    server.scheduler.infer_fn = slow_infer
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve_async()), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as sock:
+        sock_file = sock.makefile('r')
+        sock.sendall((json.dumps({'state': [0.0] * 14}) + '\n').encode('utf-8') * 32)
+        replies = [json.loads(sock_file.readline()) for _ in range(32)]
+        admission = request(sock_file, sock, {'stats': True})['stats']['admission']
+
+    shed = [reply for reply in replies if 'error' in reply]
+    assert len(shed) == admission['shed_overloaded'] == 32 - admission['admitted'] > 0
+    assert all(reply['error'] == 'overloaded' and reply['retry_after_ms'] > 0 for reply in shed)
+    assert admission['peak_inflight'] == 8 and admission['inflight'] == 0
+
+
+def test_async_states_go_through_scheduler_and_admission(model_path):
+    server = InferenceServer(model_path, host='127.0.0.1', port=0, max_inflight=8, cache_size=128)
+    server.load_model()
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve_async()), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+
+    states = torch.randn(8, 14) * 300
+    with torch.no_grad():
+        expected = server.model(states).argmax(dim=1).tolist()
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as sock:
+        sock_file = sock.makefile('r')
+        assert request(sock_file, sock, {'states': states.tolist()})['actions'] == expected
+        assert request(sock_file, sock, {'states': states.tolist()})['actions'] == expected
+        # Each state counts against --max-inflight
+        assert request(sock_file, sock, {'states': [[0.0] * 14] * 9}) == {'error': 'batch_too_large', 'max_inflight': 8}
+        assert request(sock_file, sock, {'states': [[0.0] * 14], 'deadline_ms': True}) == {'error': 'Invalid deadline_ms'}
+        stats = request(sock_file, sock, {'stats': True})['stats']
+    model = stats['models']['default']
+    assert model['cache']['misses'] == 8 and model['cache']['hits'] == 8
+    assert model['batching']['requests'] == 8
+    assert stats['admission']['admitted'] == 16 and stats['admission']['inflight'] == 0
+
+
+def test_drain_estimate_uses_the_routed_model(model_path):
+    server = InferenceServer(model_path, models=[('fast', model_path, 1.0), ('slow', model_path, 0.0)])
+    server.load_model()
+    server.registry.get('fast').scheduler.forward_time = 0.001
+    server.registry.get('slow').scheduler.forward_time = 0.1
+    assert server.drain_ms(server.registry.get('slow')) > 50 > server.drain_ms(server.registry.get('fast'))
+    assert server.drain_ms() == server.drain_ms(server.registry.get('fast'))
+
+
+def test_action_cache_skips_repeated_states(model_path):
+    server = InferenceServer(model_path, host='127.0.0.1', port=0, cache_size=128)
+    server.load_model()
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve_async()), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+
+    states = torch.randn(4, 14) * 300
+    with torch.no_grad():
+        expected = server.model(states).argmax(dim=1).tolist()
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as sock:
+        sock_file = sock.makefile('r')
+        for _ in range(5):
+            actions = [request(sock_file, sock, {'state': state.tolist()})['action'] for state in states]
+            assert actions == expected
+        stats = request(sock_file, sock, {'stats': True})['stats']['models']['default']
+        assert stats['cache']['hits'] == 16 and stats['cache']['misses'] == 4
+        assert stats['batching']['requests'] == 4
+
+        # Reloading drops actions computed by the old weights
+        request(sock_file, sock, {'reload': True})
+        request(sock_file, sock, {'state': states[0].tolist()})
+        stats = request(sock_file, sock, {'stats': True})['stats']['models']['default']
+        assert stats['cache']['size'] == 1 and stats['batching']['requests'] == 5
+
+
+def test_unix_socket_and_shm_ring(model_path, tmp_path):
+    path = str(tmp_path / 'inference.sock')
+    ring = f'pong_test_{os.getpid()}'
+    server = InferenceServer(model_path, unix_socket=path, shm_name=ring, shm_slots=8)
+    server.load_model()
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve_async()), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+
+    states = torch.randn(20, 14)
+    with torch.no_grad():
+        expected = server.model(states).argmax(dim=1).tolist()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5)
+        sock.connect(path)
+        sock_file = sock.makefile('r')
+        assert [request(sock_file, sock, {'state': state.tolist()})['action'] for state in states] == expected
+
+    client = ShmRingClient(ring)
+    try:
+        assert [client.predict(state.numpy()) for state in states] == expected
+        # Pipelined: fill every slot, then collect in order
+        for state in states[:8]:
+            assert client.submit(state.numpy())
+        assert not client.submit(states[8].numpy())
+        assert [client.wait_action() for _ in range(8)] == expected[:8]
+    finally:
+        client.close()
+        server.stop_shm()
+    assert server.registry.primary.requests == 20 + 28
+
+
+def test_shm_ring_survives_a_failed_batch():
+    class FlakyModel:
+        calls = 0
+
+        def predict_batch_sync(self, states):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("forward pass failed")
+            return [2] * len(states)
+
+    model = FlakyModel()
+    ring = f'pong_test_flaky_{os.getpid()}'
+    server = ShmRingServer(ring, lambda: model, slots=4)
+    server.start()
+    client = ShmRingClient(ring)
+    try:
+        state = [0.0] * 14
+        state[1], state[9] = 500.0, 100.0  # Ball below the paddle: the heuristic moves down
+        assert client.predict(state) == heuristic_action(state) == 0
+        assert client.predict(state) == 2
+        assert server.thread.is_alive()
+    finally:
+        client.close()
+        server.close()
+
+
+def test_metrics_endpoint(model_path):
+    server = InferenceServer(model_path, host='127.0.0.1', port=0, metrics_port=0)
+    server.load_model()
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve_async()), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as sock:
+        sock_file = sock.makefile('r')
+        for _ in range(10):
+            request(sock_file, sock, {'state': [0.0] * 14})
+        stats = request(sock_file, sock, {'stats': True})['stats']
+    assert stats['parse_ms']['count'] == 10
+    assert stats['models']['default']['latency_ms']['count'] == 10
+    assert stats['models']['default']['batching']['forward_ms']['count'] >= 1
+
+    url = f'http://127.0.0.1:{server.metrics_server.port}'
+    with urllib.request.urlopen(url + '/metrics', timeout=5) as response:
+        lines = response.read().decode('utf-8').splitlines()
+    assert 'pong_requests_total{model="default"} 10' in lines
+    assert 'pong_request_seconds_count{model="default"} 10' in lines
+    assert 'pong_parse_seconds_count 10' in lines
+    assert any(line.startswith('pong_send_seconds_count') for line in lines)
+    with urllib.request.urlopen(url + '/stats', timeout=5) as response:
+        assert json.loads(response.read())['models']['default']['requests'] == 10
+    server.stop_metrics()
+
+
+def test_named_models_and_ab_split(tmp_path):
+    torch.manual_seed(0)
+    models = {'bc': DQN(), 'dqn': DQN()}
+    specs = []
+    for name, model in models.items():
+        path = tmp_path / f'{name}.pth'
+        torch.save(model.state_dict(), path)
+        specs.append((name, str(path), 1.0))
+    server = InferenceServer(None, host='127.0.0.1', port=0, models=specs)
+    server.load_model()
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve_async()), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+
+    states = torch.randn(10, 14)
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as sock:
+        sock_file = sock.makefile('r')
+        for name, model in models.items():
+            actions = [request(sock_file, sock, {'state': state.tolist(), 'model': name})['action']
+                       for state in states]
+            with torch.no_grad():
+                assert actions == model(states).argmax(dim=1).tolist()
+        assert request(sock_file, sock, {'state': [0.0] * 14, 'model': 'nope'}) == {'error': 'Unknown model: nope'}
+
+    # Unnamed traffic sticks to one A/B arm per connection
+    for _ in range(20):
+        with socket.create_connection(('127.0.0.1', server.port), timeout=5) as sock:
+            sock_file = sock.makefile('r')
+            for _ in range(3):
+                request(sock_file, sock, {'state': [0.0] * 14})
+    stats = stats_from(server.port)['models']
+    assert stats['bc']['requests'] + stats['dqn']['requests'] == 2 * 10 + 20 * 3
+    assert (stats['bc']['requests'] - 10) % 3 == 0
+    assert stats['bc']['requests'] > 10 and stats['dqn']['requests'] > 10
+
+
+def test_watch_reloads_changed_model(model_path):
+    server = InferenceServer(model_path, host='127.0.0.1', port=0, watch_interval=0.05)
+    server.load_model()
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve_async()), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+
+    torch.save(DQN().state_dict(), model_path)
+    deadline = time.time() + 10
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as sock:
+        sock_file = sock.makefile('r')
+        while request(sock_file, sock, {'ping': True})['model_version'] < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        assert request(sock_file, sock, {'ping': True})['model_version'] == 2
+
+
+def stats_from(port):
+    for _ in range(100):
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=2) as sock:
+                return request(sock.makefile('r'), sock, {'stats': True})['stats']
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError("Server did not come up")
+
+
+@pytest.mark.skipif(not hasattr(socket, 'SO_REUSEPORT'), reason='SO_REUSEPORT not available')
+def test_workers_share_port_and_restart(model_path):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    script = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'ai', 'inference_server.py')
+    proc = subprocess.Popen([sys.executable, script, '--model', model_path, '--host', '127.0.0.1',
+                             '--port', str(port), '--workers', '2'], stdout=subprocess.DEVNULL)
+    try:
+        pids = {stats_from(port)['pid'] for _ in range(40)}
+        assert len(pids) == 2
+
+        # A killed worker is replaced and the port keeps serving
+        os.kill(pids.pop(), signal.SIGKILL)
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            new_pids = {stats_from(port)['pid'] for _ in range(40)}
+            if len(new_pids) == 2 and pids < new_pids:
+                break
+            time.sleep(0.2)
+        assert len(new_pids) == 2 and pids < new_pids
+    finally:
+        proc.send_signal(signal.SIGINT)
+        proc.wait(10)
+
+
+def worker_models(port, connections=40):
+    """{pid: (model_version, model_hash)} of the workers that answered"""
+    seen = {}
+    for _ in range(connections):
+        stats = stats_from(port)
+        seen[stats['pid']] = (stats['models']['default']['model_version'], stats['models']['default']['model_hash'])
+    return seen
+
+
+@pytest.mark.skipif(not hasattr(socket, 'SO_REUSEPORT'), reason='SO_REUSEPORT not available')
+def test_workers_agree_on_reloaded_model(model_path):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    script = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'ai', 'inference_server.py')
+    proc = subprocess.Popen([sys.executable, script, '--model', model_path, '--host', '127.0.0.1',
+                             '--port', str(port), '--workers', '2'], stdout=subprocess.DEVNULL)
+    try:
+        models = worker_models(port)
+        assert len(models) == 2 and len(set(models.values())) == 1
+
+        # An admin reload reaches one worker; the other follows it
+        torch.save(DQN().state_dict(), model_path)
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+            reloaded = request(sock.makefile('r'), sock, {'reload': True})
+        expected = (reloaded['model_version'], reloaded['model_hash'])
+        assert expected[0] == 2 and expected not in models.values()
+        deadline = time.time() + 10
+        while set(worker_models(port).values()) != {expected} and time.time() < deadline:
+            time.sleep(0.1)
+        models = worker_models(port)
+        assert len(models) == 2 and set(models.values()) == {expected}
+
+        # A restarted worker forks from the supervisor's startup weights but serves the reloaded ones
+        os.kill(next(iter(models)), signal.SIGKILL)
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            restarted = worker_models(port)
+            if len(restarted) == 2 and restarted.keys() != models.keys():
+                break
+            time.sleep(0.2)
+        assert len(restarted) == 2 and restarted.keys() != models.keys()
+        assert set(restarted.values()) == {expected}
+    finally:
+        proc.send_signal(signal.SIGINT)
+        proc.wait(10)
+
+
+def load_tester(*args, **kwargs):
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts', 'evaluation'))
+    from load_test import LoadTester
+    return LoadTester(*args, **kwargs)
+
+
+def test_open_loop_load_test(async_server):
+    tester = load_tester('127.0.0.1', async_server.port)
+    summary = asyncio.run(tester.run_open_loop(rate=200, duration=0.5)).summary()
+    assert summary['successful'] == 100 and summary['failed'] == 0
+    assert summary['target_rps'] == 200 and summary['achieved_rps'] > 150
+    latency = summary['latency_ms']
+    assert 0 < latency['p50'] <= latency['p90'] <= latency['p99'] <= latency['p99.9'] <= latency['max']
+
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_persistent_pipelined_load_test(async_server, binary):
+    tester = load_tester('127.0.0.1', async_server.port, binary=binary)
+    summary = asyncio.run(tester.run_closed_loop(400, workers=2, persistent=True, pipeline=8)).summary()
+    assert summary['successful'] == 400 and summary['failed'] == 0
+
+    summary = asyncio.run(tester.run_open_loop(rate=400, duration=0.25, connections=4, pipeline=4)).summary()
+    assert summary['successful'] == 100 and summary['failed'] == 0
+
+    tester.batch_size = 16
+    summary = asyncio.run(tester.run_closed_loop(50, workers=2, persistent=True)).summary()
+    assert summary['successful'] == 50 and summary['failed'] == 0
+
+
+def test_simulated_games_load_test(async_server):
+    tester = load_tester('127.0.0.1', async_server.port, binary=True)
+    summary = asyncio.run(tester.run_games(games=5, duration=0.5, fps=60)).summary()
+    assert summary['successful'] == 5 * 30 and summary['failed'] == 0
+    assert summary['deadline_ms'] == pytest.approx(1000 / 60)
+    assert summary['late'] + round(summary['on_time_fraction'] * 150) == 150
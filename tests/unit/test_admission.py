@@ -0,0 +1,47 @@
+import sys
+import os
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai.admission import AdmissionControl, TokenBucket
+
+def test_token_bucket_allows_burst_then_limits():
+    bucket = TokenBucket(rate=10.0, burst=3)
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = bucket.take()
+    assert 0.0 < wait <= 0.1
+
+def test_admission_sheds_over_capacity():
+    control = AdmissionControl(max_inflight=2)
+    assert control.admit() is None and control.admit() is None
+    error = control.admit(drain_ms=7.5)
+    assert error == {'error': 'overloaded', 'retry_after_ms': 7.5}
+    control.release()
+    assert control.admit() is None
+    stats = control.stats()
+    assert stats['inflight'] == 2 and stats['peak_inflight'] == 2 and stats['shed_overloaded'] == 1
+
+def test_rate_limit_is_per_session():
+    control = AdmissionControl(rate_limit=1.0, rate_burst=1)
+    first, second = {}, {}
+    assert control.admit(first) is None
+    assert control.admit(first)['error'] == 'rate_limited'
+    assert control.admit(second) is None
+    assert control.stats()['shed_rate_limited'] == 1
+
+def test_batches_count_one_per_state():
+    control = AdmissionControl(max_inflight=8)
+    assert control.admit(count=6) is None
+    assert control.admit(count=3)['error'] == 'overloaded'
+    assert control.admit(count=9) == {'error': 'batch_too_large', 'max_inflight': 8}
+    control.release(6)
+    assert control.admit(count=8) is None
+    stats = control.stats()
+    assert stats['inflight'] == 8 and stats['admitted'] == 14 and stats['shed_overloaded'] == 12
+
+def test_token_bucket_charges_large_batches_as_debt():
+    bucket = TokenBucket(rate=10.0, burst=3)
+    assert bucket.take(5) == 0.0
+    # Two tokens in debt: the next one is 0.3 s away
+    assert 0.2 < bucket.take() <= 0.3
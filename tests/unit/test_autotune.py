@@ -0,0 +1,38 @@
+import json
+import sys
+import os
+
+import pytest
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai.autotune import build_profile, choose, load_profile, thread_candidates
+
+def result(backend, threads, latencies):
+    return {'backend': backend, 'threads': threads,
+            'batches': [{'batch_size': b, 'latency_ms': ms} for b, ms in latencies.items()]}
+
+def test_choose_caps_batch_by_budget_and_maximizes_throughput():
+    results = [
+        result('torch', 1, {1: 0.05, 64: 0.4, 256: 1.5}),
+        result('torch', 4, {1: 0.08, 64: 0.2, 256: 0.6}),
+        result('numpy', 1, {1: 0.01, 64: 0.3, 256: 2.0}),
+    ]
+    assert choose(results, budget_ms=1.0) == {'backend': 'torch', 'threads': 4, 'max_batch_size': 256}
+    # Nothing fits a tiny budget: fall back to the smallest batch, lowest latency wins
+    assert choose(results, budget_ms=0.001) == {'backend': 'numpy', 'threads': 1, 'max_batch_size': 1}
+
+def test_profile_round_trip(tmp_path):
+    profile = build_profile('model.pth', [result('numpy', 1, {1: 0.01, 8: 0.02})], budget_ms=1.0)
+    path = tmp_path / 'profile.json'
+    path.write_text(json.dumps(profile))
+    assert load_profile(str(path)) == {'backend': 'numpy', 'threads': 1, 'max_batch_size': 8}
+
+    path.write_text(json.dumps({**profile, 'version': 99}))
+    with pytest.raises(ValueError):
+        load_profile(str(path))
+
+def test_thread_candidates():
+    assert thread_candidates(6) == [1, 2, 4, 6]
+    assert thread_candidates(1) == [1]
@@ -0,0 +1,45 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai.cache import ActionCache, parse_quantum
+
+def test_nearby_states_share_a_key():
+    cache = ActionCache(16, quantum=1.0)
+    state = np.arange(14, dtype=np.float32) * 10
+    assert cache.key(state) == cache.key(state + 0.3)
+    assert cache.key(state) != cache.key(state + 0.7)
+
+    exact = ActionCache(16, quantum=0)
+    assert exact.key(state) != exact.key(state + 0.3)
+
+    per_feature = ActionCache(16, quantum=[0] + [1.0] * 13)
+    assert per_feature.key(state) != per_feature.key(state + np.eye(14, dtype=np.float32)[0] * 0.3)
+
+def test_lru_eviction_and_stats():
+    cache = ActionCache(2)
+    cache.put(b'a', 0)
+    cache.put(b'b', 1)
+    assert cache.get(b'a') == 0  # 'b' is now least recently used
+    cache.put(b'c', 2)
+    assert cache.get(b'b') is None
+    assert cache.get(b'c') == 2
+
+    stats = cache.stats()
+    assert stats['size'] == 2 and stats['evictions'] == 1
+    assert stats['hits'] == 2 and stats['misses'] == 1
+    assert stats['memory_bytes'] > 0
+
+    cache.clear()
+    assert cache.get(b'a') is None and cache.stats()['size'] == 0
+
+def test_parse_quantum():
+    assert parse_quantum('0.5') == 0.5
+    assert parse_quantum(','.join(['1'] * 14)) == [1.0] * 14
+    with pytest.raises(ValueError):
+        parse_quantum('1,2')
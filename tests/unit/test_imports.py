@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+SRC_DIR = os.path.join(ROOT, 'src')
+MODULES = ['admission', 'agent', 'autotune', 'batching', 'cache', 'inference_server', 'metrics', 'model',
+           'model_registry', 'numpy_backend', 'pong_env', 'pong_sim', 'protocol', 'quantize', 'remote_vector_env',
+           'replay_buffer', 'shm_ring', 'vector_env']
+
+def run(code):
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+def test_package_modules_load_once():
+    # Every module is only ever loaded as ai.<name>, and importing them leaves sys.path alone
+    code = (
+        "import importlib, sys\n"
+        f"sys.path.insert(0, {SRC_DIR!r})\n"
+        "path = list(sys.path)\n"
+        f"for name in {MODULES!r}:\n"
+        "    importlib.import_module('ai.' + name)\n"
+        f"print(sorted(name for name in {MODULES!r} if name in sys.modules), sys.path == path)\n"
+    )
+    assert run(code).strip() == '[] True'
+
+def test_examples_import():
+    code = (
+        "import runpy\n"
+        "for path in ['examples/demo_pong.py', 'examples/demo_train.py']:\n"
+        "    runpy.run_path(path)\n"
+    )
+    run(code)
+
+def test_modules_run_as_scripts():
+    for name in ['inference_server', 'numpy_backend', 'quantize', 'autotune']:
+        result = subprocess.run([sys.executable, os.path.join(SRC_DIR, 'ai', name + '.py'), '--help'],
+                                capture_output=True, text=True)
+        assert result.returncode == 0 and 'usage:' in result.stdout, result.stderr
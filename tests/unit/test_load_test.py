@@ -0,0 +1,45 @@
+import asyncio
+import sys
+import os
+
+# Add scripts directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts', 'evaluation'))
+
+from load_test import LoadTester
+
+class SerialTester(LoadTester):
+    """A fake server answering one request at a time, 10 ms each"""
+
+    async def request(self, payload):
+        if not hasattr(self, 'lock'):
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            await asyncio.sleep(0.01)
+        return {'action': 1}
+
+def test_open_loop_charges_queueing_to_latency():
+    # 200 req/s offered against 100 req/s of capacity: the backlog grows for the
+    # whole run, and an open-loop client must see it in the tail
+    summary = asyncio.run(SerialTester().run_open_loop(rate=200, duration=0.5)).summary()
+    assert summary['successful'] == 100 and summary['failed'] == 0
+    assert summary['latency_ms']['p99'] > 200
+    assert summary['achieved_rps'] < 120
+
+    # A closed-loop client only ever has one request queued and sees the service time
+    summary = asyncio.run(SerialTester().run_closed_loop(50, workers=1)).summary()
+    assert summary['latency_ms']['p99'] < 50
+
+def test_client_backlog_is_counted():
+    summary = asyncio.run(SerialTester().run_open_loop(rate=1000, duration=0.1, max_outstanding=10)).summary()
+    assert summary['errors']['client_backlog'] > 0
+    assert summary['successful'] + summary['failed'] == 100
+
+def test_saturation_search_finds_the_knee():
+    # 100 req/s of capacity; the ramp passes 20 and 40 req/s and fails by 90
+    result = asyncio.run(SerialTester().run_saturation(
+        slo_ms=40.0, start_rps=20.0, ramp=2.0, step_duration=0.5, refine=1))
+    rates = [step['offered_rps'] for step in result['curve']]
+    assert rates == sorted(rates) and 20.0 in rates and 40.0 in rates
+    assert result['saturated'] and not result['curve'][-1]['passed']
+    assert 30.0 < result['knee_rps'] < 100.0
+    assert all(step['passed'] == (not step['violations']) for step in result['curve'])
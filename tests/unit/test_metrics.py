@@ -0,0 +1,39 @@
+import sys
+import os
+
+import numpy as np
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai.metrics import Histogram, exposition
+
+def test_histogram_quantiles_within_bucket_width():
+    values = np.random.RandomState(0).lognormal(mean=-7, sigma=1, size=20000)
+    hist = Histogram()
+    for value in values:
+        hist.observe(value)
+
+    for q in (0.5, 0.9, 0.99):
+        exact = np.percentile(values, q * 100)
+        assert abs(hist.quantile(q) - exact) / exact < 0.26
+    summary = hist.summary(1000.0)
+    assert summary['count'] == 20000
+    assert np.isclose(summary['mean'], values.mean() * 1000.0)
+    assert np.isclose(summary['max'], values.max() * 1000.0)
+
+def test_exposition_is_cumulative():
+    hist = Histogram([0.001, 0.01])
+    for value in (0.0005, 0.005, 0.005, 1.0):
+        hist.observe(value)
+    text = exposition([
+        ('pong_request_seconds', 'histogram', 'Latency', [({'model': 'a'}, hist)]),
+        ('pong_connections', 'gauge', 'Connections', [({}, 3)]),
+    ])
+    lines = text.splitlines()
+    assert '# TYPE pong_request_seconds histogram' in lines
+    assert 'pong_request_seconds_bucket{model="a",le="0.001"} 1' in lines
+    assert 'pong_request_seconds_bucket{model="a",le="0.01"} 3' in lines
+    assert 'pong_request_seconds_bucket{model="a",le="+Inf"} 4' in lines
+    assert 'pong_request_seconds_count{model="a"} 4' in lines
+    assert 'pong_connections 3' in lines
@@ -0,0 +1,66 @@
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai.model_registry import ModelRegistry, ServedModel, heuristic_action, parse_model_spec
+
+class FakeServer:
+    max_batch_size = 8
+    max_wait_ms = 1.0
+    cache_size = 0
+
+def make_registry(weights):
+    registry = ModelRegistry(seed=0)
+    for name, weight in weights.items():
+        registry.add(ServedModel(name, f'{name}.pth', FakeServer(), weight))
+    return registry
+
+def test_parse_model_spec():
+    assert parse_model_spec('bc=models/bc.pth') == ('bc', 'models/bc.pth', 1.0)
+    assert parse_model_spec('hybrid=models/h.pth:0.25') == ('hybrid', 'models/h.pth', 0.25)
+    assert parse_model_spec('win=C:/models/m.pth') == ('win', 'C:/models/m.pth', 1.0)
+    with pytest.raises(ValueError):
+        parse_model_spec('models/bc.pth')
+
+def test_weighted_split_follows_weights():
+    registry = make_registry({'a': 0.9, 'b': 0.1, 'off': 0.0})
+    picks = [registry.route().name for _ in range(5000)]
+    assert picks.count('off') == 0
+    assert 0.85 < picks.count('a') / len(picks) < 0.95
+
+def test_session_sticks_to_one_model():
+    registry = make_registry({'a': 1.0, 'b': 1.0})
+    session = {}
+    first = registry.route(session=session).name
+    assert all(registry.route(session=session).name == first for _ in range(50))
+    assert registry.route('b', session).name == 'b'
+    with pytest.raises(KeyError):
+        registry.route('missing')
+
+def test_heuristic_action_tracks_ball():
+    state = [400, 300, 5, 5, 20, 300, 10, 80, 780, 300, 10, 80, 0, 0]
+    assert heuristic_action(state) == 1  # Within the dead zone
+    state[1] = 450
+    assert heuristic_action(state) == 0  # Ball below the paddle: move down
+    state[1] = 100
+    assert heuristic_action(state) == 2
+
+def test_counters_are_thread_safe():
+    # The shm ring thread records requests while the event loop does
+    entry = ServedModel('a', 'a.pth', FakeServer())
+    def work():
+        for _ in range(20000):
+            entry.record(time.perf_counter())
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert entry.requests == 80000
+    assert entry.latency_snapshot().count == 80000 and entry.stats()['latency_ms']['count'] == 80000
@@ -0,0 +1,68 @@
+import subprocess
+import sys
+import os
+
+import numpy as np
+import torch
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai.model import DQN, load_policy_state_dict
+from ai.numpy_backend import NumpyDQN, export_npz, load_raw
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+
+def test_numpy_backend_matches_torch(tmp_path):
+    torch.manual_seed(0)
+    model = DQN()
+    checkpoint = tmp_path / 'checkpoint.pth'
+    # Full DQNAgent-style checkpoint
+    torch.save({'policy_net': model.state_dict(), 'epsilon': 0.1}, checkpoint)
+    npz_path = export_npz(str(checkpoint), str(tmp_path / 'model.npz'))
+
+    states = np.random.RandomState(0).randn(1000, 14).astype(np.float32) * 200
+    with torch.no_grad():
+        expected = model(torch.from_numpy(states)).numpy()
+    q_values = NumpyDQN.load(npz_path)(states)
+
+    np.testing.assert_allclose(q_values, expected, rtol=1e-4, atol=1e-4)
+    assert (q_values.argmax(axis=1) == expected.argmax(axis=1)).all()
+
+def test_numpy_server_does_not_import_torch(tmp_path):
+    torch.save(DQN().state_dict(), tmp_path / 'model.pth')
+    npz_path = export_npz(str(tmp_path / 'model.pth'), str(tmp_path / 'model.npz'))
+    code = (
+        "import sys, json\n"
+        f"sys.path.insert(0, {SRC_DIR!r})\n"
+        "from ai.inference_server import InferenceServer\n"
+        f"server = InferenceServer({npz_path!r}, backend='numpy')\n"
+        "server.load_model()\n"
+        "reply = json.loads(server.process_message(json.dumps({'state': [0.0] * 14})))\n"
+        "print(reply['action'] in (0, 1, 2), 'torch' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == 'True False'
+
+def test_raw_weights_are_memory_mapped(tmp_path):
+    torch.manual_seed(0)
+    model = DQN()
+    torch.save({'policy_net': model.state_dict(), 'epsilon': 0.1}, tmp_path / 'checkpoint.pth')
+    raw_path = export_npz(str(tmp_path / 'checkpoint.pth'), str(tmp_path / 'model.raw'))
+
+    arrays = load_raw(raw_path)
+    assert set(arrays) == set(model.state_dict())
+    weight = arrays['net.0.weight']
+    assert isinstance(weight.base, np.memmap) and not weight.flags.writeable
+    assert all(array.ctypes.data % 64 == 0 for array in arrays.values())
+
+    states = np.random.RandomState(0).randn(100, 14).astype(np.float32) * 200
+    with torch.no_grad():
+        expected = model(torch.from_numpy(states)).numpy()
+    np.testing.assert_allclose(NumpyDQN.load(raw_path)(states), expected, rtol=1e-4, atol=1e-4)
+
+    # The torch backend reads the same file without unpickling anything
+    reloaded = DQN()
+    reloaded.load_state_dict(load_policy_state_dict(raw_path))
+    with torch.no_grad():
+        np.testing.assert_array_equal(reloaded(torch.from_numpy(states)).numpy(), expected)
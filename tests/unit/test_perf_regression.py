@@ -0,0 +1,39 @@
+import sys
+import os
+
+# Add scripts directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts', 'evaluation'))
+
+from perf_regression import METRICS, compare, comparable, scenario_metrics
+
+THRESHOLDS = {metric: threshold for metric, (_, threshold) in METRICS.items()}
+
+def results(**scenarios):
+    return {'suite_version': 1, 'settings': {'backend': 'torch'}, 'host': {'cpus': 4}, 'scenarios': scenarios}
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = results(single={'p50_ms': 1.0, 'p99_ms': 2.0, 'throughput_rps': 1000.0, 'failed': 0})
+    faster = results(single={'p50_ms': 0.5, 'p99_ms': 2.5, 'throughput_rps': 900.0, 'failed': 0})
+    rows, regressed = compare(faster, baseline, THRESHOLDS)
+    assert not regressed and len(rows) == 3
+
+    slower = results(single={'p50_ms': 1.5, 'p99_ms': 2.0, 'throughput_rps': 700.0, 'failed': 0})
+    rows, regressed = compare(slower, baseline, THRESHOLDS)
+    assert regressed
+    assert {row['metric'] for row in rows if row['regressed']} == {'p50_ms', 'throughput_rps'}
+
+    broken = results(single={'failed': 3})
+    assert compare(broken, baseline, THRESHOLDS)[1]
+
+def test_incomparable_baselines_are_refused():
+    current = results()
+    assert comparable(current, results()) is None
+    assert 'CPUs' in comparable(current, {**results(), 'host': {'cpus': 8}})
+    assert 'settings' in comparable(current, {**results(), 'settings': {'backend': 'numpy'}})
+
+def test_scenario_metrics_take_the_median_and_count_states():
+    summaries = [{'failed': 0, 'achieved_rps': rps, 'latency_ms': {'p50': p50, 'p99': 2 * p50}}
+                 for rps, p50 in [(100.0, 1.0), (300.0, 9.0), (200.0, 2.0)]]
+    assert scenario_metrics(summaries, batch_size=64) == {
+        'p50_ms': 2.0, 'p99_ms': 4.0, 'throughput_rps': 200.0 * 64, 'failed': 0}
+    assert scenario_metrics([{**summaries[0], 'failed': 2}]) == {'failed': 2}
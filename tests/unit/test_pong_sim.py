@@ -0,0 +1,82 @@
+import json
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai import protocol as wire
+from ai.pong_env import PongEnv
+from ai.pong_sim import PongSim, GlibcRand, BALL_BOUNDS, POWER_UP_BOUNDS
+
+TRACE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures', 'game_trace')
+TRACES = sorted(name for name in os.listdir(TRACE_DIR) if name.endswith('.bin'))
+
+def load_trace(name):
+    """(settings, bot actions, recorded states) from a record_trace.cpp file"""
+    with open(os.path.join(TRACE_DIR, name), 'rb') as f:
+        data = f.read()
+    frames = []
+    offset = 0
+    while offset < len(data):
+        length, msg_type = wire.FRAME_HEADER.unpack_from(data, offset)
+        offset += wire.FRAME_HEADER.size
+        frames.append((msg_type, data[offset:offset + length]))
+        offset += length
+    (_, settings), (_, actions) = frames[:2]
+    states = [wire.decode_state(payload) for msg_type, payload in frames[2:] if msg_type == wire.STATE]
+    return json.loads(settings), np.frombuffer(actions, dtype=np.int8), states
+
+def test_glibc_rand():
+    rng = GlibcRand(42)
+    assert [rng.rand() for _ in range(3)] == [71876166, 708592740, 1483128881]
+    rng = GlibcRand(1)
+    assert [rng.rand() for _ in range(3)] == [1804289383, 846930886, 1681692777]
+
+def test_sfml_circle_bounds():
+    # CircleShape's 30-point outline does not reach the full diameter horizontally
+    assert np.float32(BALL_BOUNDS[2]) == np.float32(19.8904381)
+    assert np.float32(POWER_UP_BOUNDS[0]) == np.float32(0.0821714401)
+
+@pytest.mark.parametrize('name', TRACES)
+def test_matches_game_trace(name):
+    settings, actions, states = load_trace(name)
+    assert len(actions) == settings['ticks']
+    sim = PongSim()
+    assert sim.state() == states[0]
+    stride = settings['stride']
+    for tick, action in enumerate(actions):
+        state = sim.step(int(action))
+        if (tick + 1) % stride == 0:
+            assert state == states[(tick + 1) // stride], f"diverged at tick {tick + 1}"
+
+def test_trace_covers_game_events():
+    # Guards the fixtures: the traces must exercise scoring and every power-up effect
+    seen = set()
+    for name in TRACES:
+        _, _, states = load_trace(name)
+        for state in states:
+            seen.update(('effect', e['type']) for e in state['active_effects'])
+            if len(state['balls']) > 1:
+                seen.add('split')
+            if state['player_paddle']['width'] > 20:
+                seen.add('extended')
+        assert states[-1]['scores']['player'] > 0 and states[-1]['scores']['bot'] > 0
+    assert {('effect', 0), ('effect', 2), 'split', 'extended'} <= seen
+
+def test_sim_env():
+    env = PongEnv(mode='sim')
+    obs = env.reset()
+    assert set(obs) == {'balls', 'player_paddle', 'bot_paddle', 'scores', 'power_ups', 'active_effects'}
+    assert env._flatten_obs(obs).shape == (14,)
+    total = 0
+    for _ in range(2000):
+        obs, reward, done, _ = env.step(0)
+        total += reward
+        assert not done
+    # Action 0 parks the bot at the bottom; rewards add up to the score difference
+    assert total == obs['scores']['player'] - obs['scores']['bot'] != 0
+    env.close()
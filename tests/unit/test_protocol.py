@@ -0,0 +1,68 @@
+import socket
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai import protocol as wire
+
+STATE = {
+    'balls': [{'x': 400.5, 'y': 300.25, 'vx': -150.0, 'vy': 80.0}, {'x': 10.0, 'y': 20.0, 'vx': 1.0, 'vy': 2.0}],
+    'player_paddle': {'x': 20.0, 'y': 300.0, 'width': 20.0, 'height': 100.0},
+    'bot_paddle': {'x': 780.0, 'y': 120.0, 'width': 20.0, 'height': 100.0},
+    'scores': {'player': 3, 'bot': 5},
+    'power_ups': [{'type': 1, 'x': 215.0, 'y': 40.0}],
+    'active_effects': [{'type': 2, 'time_left': 4.5}],
+}
+
+def test_state_round_trip():
+    frame = wire.encode_state(STATE)
+    length, msg_type = wire.FRAME_HEADER.unpack_from(frame)
+    payload = frame[wire.FRAME_HEADER.size:]
+    assert msg_type == wire.STATE and length == len(payload)
+    assert wire.decode_state(payload) == STATE
+    np.testing.assert_array_equal(wire.decode_features(payload), wire.flatten_state(STATE))
+
+def test_reader_reassembles_split_messages():
+    a, b = socket.socketpair()
+    with a, b:
+        reader = wire.SocketReader(b, size=16)
+        data = wire.encode_state(STATE) + b'{"ping": true}\n' + wire.encode_action(-1)
+        for i in range(0, len(data), 7):
+            a.sendall(data[i:i + 7])
+        msg_type, payload = reader.read_frame()
+        assert msg_type == wire.STATE and wire.decode_state(payload) == STATE
+        assert bytes(reader.read_line()) == b'{"ping": true}'
+        msg_type, payload = reader.read_frame()
+        assert msg_type == wire.ACTION and wire.ACTION_VALUE.unpack(payload) == (-1,)
+
+def test_reader_rejects_oversized_frame():
+    a, b = socket.socketpair()
+    with a, b:
+        reader = wire.SocketReader(b, size=16)
+        # Only the header is sent: the limit is checked before waiting for the payload
+        a.sendall(wire.FRAME_HEADER.pack(1 << 31, wire.STATE))
+        with pytest.raises(ValueError, match="Message too large"):
+            reader.read_frame(limit=65536)
+        assert len(reader.buf) == 16
+
+def test_negotiation_falls_back_to_json():
+    a, b = socket.socketpair()
+    with a, b:
+        reader = wire.SocketReader(a)
+        b.sendall(b'{"data": {}}\n')
+        assert not wire.negotiate_binary(a, reader)
+        assert bytes(reader.read_line()) == b'{"data": {}}'
+        assert b.recv(4) == wire.MAGIC
+
+def test_states_frame_round_trip():
+    states = np.random.RandomState(0).randn(5, 14).astype(np.float32)
+    frame = wire.encode_states(states)
+    length, msg_type = wire.FRAME_HEADER.unpack_from(frame)
+    assert msg_type == wire.STATES and length == 5 * 14 * 4
+    np.testing.assert_array_equal(wire.decode_states(frame[wire.FRAME_HEADER.size:]), states)
+    assert wire.decode_states(b'\x00' * 10) is None
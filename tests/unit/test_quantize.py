@@ -0,0 +1,39 @@
+import json
+import sys
+import os
+
+import numpy as np
+import torch
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai.model import DQN
+from ai.quantize import quantize_dqn, action_agreement
+from ai.inference_server import InferenceServer
+
+def game_like_states(n, seed=0):
+    """Random states with the mixed feature ranges of real game observations"""
+    rng = np.random.RandomState(seed)
+    scale = np.array([800, 600, 8, 8, 800, 600, 20, 100, 800, 600, 20, 100, 5, 5], dtype=np.float32)
+    return rng.rand(n, 14).astype(np.float32) * scale
+
+def test_quantized_model_agrees_with_float():
+    torch.manual_seed(0)
+    model = DQN().eval()
+    states = game_like_states(4000)
+    int8_model = quantize_dqn(model, states[:2000])
+
+    assert action_agreement(model, int8_model, states[2000:]) > 0.95
+
+def test_int8_server_backend(tmp_path):
+    torch.manual_seed(0)
+    torch.save(DQN().state_dict(), tmp_path / 'model.pth')
+    np.savez(tmp_path / 'bc_data.npz', states=game_like_states(500), actions=np.zeros(500))
+    server = InferenceServer(str(tmp_path / 'model.pth'), backend='int8',
+                             calibration_data=str(tmp_path / 'bc_data.npz'))
+    server.load_model()
+
+    assert server.device.type == 'cpu'
+    reply = json.loads(server.process_message(json.dumps({'state': game_like_states(1)[0].tolist()})))
+    assert reply['action'] in (0, 1, 2)
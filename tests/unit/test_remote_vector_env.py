@@ -0,0 +1,215 @@
+import json
+import socket
+import sys
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai import protocol as wire
+from ai.pong_sim import PongSim
+from ai.remote_vector_env import RemotePongVectorEnv, parse_address
+
+class FakeGameServer(threading.Thread):
+    """pong_evolved --server stand-in: a PongSim behind the game's socket loop, one client at a time"""
+
+    def __init__(self, delay=0.0, drop_after=None, can_lockstep=True):
+        super().__init__(daemon=True)
+        self.listener = socket.create_server(('127.0.0.1', 0))
+        self.port = self.listener.getsockname()[1]
+        self.address = f"127.0.0.1:{self.port}"
+        self.sim = PongSim()
+        self.delay = delay
+        self.drop_after = drop_after
+        self.can_lockstep = can_lockstep  # Grant lockstep requests, or refuse them as an older game would
+        self.lockstep = False
+        self.client = None
+        self.connections = 0
+        self.start()
+
+    def run(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            self.client = client
+            self.connections += 1
+            with client:
+                try:
+                    self.serve(client)
+                except OSError:
+                    pass
+
+    def serve(self, client):
+        reader = wire.SocketReader(client)
+        # Like Game::negotiateBinary: a JSON hello line, or the magic within 100 ms
+        client.settimeout(0.1)
+        binary = False
+        try:
+            first = reader.peek(1)
+            if first == b'{':
+                requested = json.loads(bytes(reader.read_line())).get('lockstep', False)
+                self.lockstep = self.can_lockstep and requested
+            else:
+                binary = first == wire.MAGIC[:1] and bytes(reader.read_exact(len(wire.MAGIC))) == wire.MAGIC
+        except socket.timeout:
+            pass
+        client.settimeout(None)
+        if binary:
+            client.sendall(wire.MAGIC)
+            client.sendall(wire.encode_json({'type': 'hello', 'lockstep': False, 'dt': 1 / 60}))
+        steps = 0
+        while True:
+            state = self.sim.state()
+            client.sendall(wire.encode_state(state) if binary else
+                           (json.dumps({'data': state, 'lockstep': self.lockstep}) + '\n').encode())
+            if binary:
+                msg_type, payload = reader.read_frame()
+                while msg_type == wire.JSON:
+                    requested = json.loads(bytes(payload)).get('lockstep', False)
+                    self.lockstep = self.can_lockstep and requested
+                    client.sendall(wire.encode_json({'type': 'lockstep', 'lockstep': self.lockstep}))
+                    msg_type, payload = reader.read_frame()
+                (action,) = wire.ACTION_VALUE.unpack(payload)
+            else:
+                action = json.loads(bytes(reader.read_line()))['data']['action']
+            self.sim.step(action)
+            steps += 1
+            if self.delay:
+                time.sleep(self.delay)
+            if self.drop_after is not None and steps >= self.drop_after:
+                self.drop_after = None
+                return
+
+    def stop(self):
+        self.listener.close()
+        if self.client is not None:
+            try:
+                self.client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+@pytest.fixture
+def servers():
+    started = []
+    def start(count, **kwargs):
+        new = [FakeGameServer(**kwargs) for _ in range(count)]
+        started.extend(new)
+        return new
+    yield start
+    for server in started:
+        server.stop()
+
+def test_parse_address():
+    assert parse_address('example:6001') == ('example', 6001)
+    assert parse_address(':6002') == ('localhost', 6002)
+    assert parse_address(('10.0.0.1', '6003')) == ('10.0.0.1', 6003)
+
+@pytest.mark.parametrize('protocol', ['binary', 'json'])
+def test_steps_match_simulator(servers, protocol):
+    pool = servers(3)
+    env = RemotePongVectorEnv([s.address for s in pool], protocol=protocol)
+    obs, _ = env.reset()
+    sims = [PongSim() for _ in pool]
+    np.testing.assert_array_equal(obs, np.stack([wire.flatten_state(sim.state()) for sim in sims]))
+    rng = np.random.RandomState(0)
+    for _ in range(100):
+        actions = rng.randint(0, 3, len(pool))
+        obs, rewards, terminated, truncated, infos = env.step(actions)
+        expected = np.stack([wire.flatten_state(sim.step(int(a) - 1)) for sim, a in zip(sims, actions)])
+        np.testing.assert_allclose(obs, expected, atol=1e-4)
+        assert not terminated.any() and not truncated.any()
+    env.close()
+
+@pytest.mark.parametrize('protocol', ['binary', 'json'])
+@pytest.mark.parametrize('lockstep', [True, False])
+def test_requests_lockstep(servers, protocol, lockstep):
+    pool = servers(2)
+    env = RemotePongVectorEnv([s.address for s in pool], protocol=protocol, lockstep=lockstep)
+    env.reset()
+    env.step([1, 1])
+    assert [s.lockstep for s in pool] == [lockstep] * 2
+    assert [conn.lockstep for conn in env.connections] == [lockstep] * 2
+    env.close()
+
+@pytest.mark.parametrize('protocol', ['binary', 'json'])
+def test_refused_lockstep_is_not_assumed(servers, protocol):
+    refusing = servers(1, can_lockstep=False)[0]
+    with pytest.raises(ConnectionError):
+        RemotePongVectorEnv([refusing.address], protocol=protocol).reset()
+    env = RemotePongVectorEnv([refusing.address], protocol=protocol, lockstep=False)
+    env.reset()
+    assert not env.connections[0].lockstep
+    env.close()
+    # A server that steps in lockstep is picked over one that refuses
+    spare = servers(1)[0]
+    env = RemotePongVectorEnv([refusing.address, spare.address], num_envs=1, protocol=protocol)
+    env.reset()
+    assert env.addresses == [parse_address(spare.address)] and env.connections[0].lockstep
+    env.close()
+
+def test_network_waits_overlap(servers):
+    pool = servers(4, delay=0.05)
+    env = RemotePongVectorEnv([s.address for s in pool])
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(5):
+        env.step(np.ones(4, dtype=np.int64))
+    # Sequential stepping would take 4 * 5 * 50 ms
+    assert time.perf_counter() - start < 0.6
+    env.close()
+
+def test_reconnects_dropped_connection(servers):
+    pool = servers(2)
+    pool[1].drop_after = 3
+    env = RemotePongVectorEnv([s.address for s in pool], step_timeout=1.0)
+    env.reset()
+    for _ in range(3):
+        obs, _, _, truncated, infos = env.step([1, 1])
+    assert truncated.tolist() == [False, True]
+    assert infos['reconnected'].tolist() == [False, True]
+    assert infos['final_obs'][1] is not None
+    assert env.addresses[1] == parse_address(pool[1].address) and pool[1].connections == 2
+    # The game kept running on the server; stepping carries on from its current state
+    np.testing.assert_array_equal(obs[1], wire.flatten_state(pool[1].sim.state()))
+    obs, _, _, truncated, _ = env.step([1, 1])
+    assert not truncated.any()
+    env.close()
+
+def test_replaces_dead_server_with_spare(servers):
+    pool = servers(3)
+    env = RemotePongVectorEnv([s.address for s in pool], num_envs=2, connect_timeout=0.5, retry_delay=0.01)
+    env.reset()
+    pool[0].stop()
+    obs, _, _, truncated, infos = env.step([1, 1])
+    assert truncated.tolist() == [True, False] and infos['reconnected'][0]
+    assert env.addresses[0] == parse_address(pool[2].address)
+    assert env.spares == [parse_address(pool[0].address)]
+    obs, _, _, truncated, _ = env.step([1, 1])
+    assert not truncated.any() and env.reconnects == 1
+    env.close()
+
+def test_raises_when_no_server_is_reachable(servers):
+    pool = servers(1)
+    env = RemotePongVectorEnv([pool[0].address], connect_timeout=0.5, retry_delay=0.01)
+    env.reset()
+    pool[0].stop()
+    with pytest.raises(ConnectionError):
+        env.step([1])
+    env.close()
+
+def test_episode_truncation(servers):
+    pool = servers(2)
+    env = RemotePongVectorEnv([s.address for s in pool], max_episode_steps=3)
+    env.reset()
+    for step in range(1, 7):
+        obs, _, _, truncated, infos = env.step([1, 1])
+        assert truncated.all() == (step % 3 == 0)
+    np.testing.assert_array_equal(infos['final_obs'][0], obs[0])
+    env.close()
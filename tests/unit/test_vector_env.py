@@ -0,0 +1,107 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from ai import protocol as wire
+from ai.pong_sim import PongSim, SPLIT_BALL, SLOW_MOTION_TYPE
+from ai.vector_env import PongVectorEnv
+from test_pong_sim import load_trace, TRACES
+
+def test_spaces_and_reset():
+    env = PongVectorEnv(5)
+    obs, infos = env.reset()
+    assert obs.shape == (5, 14) and obs.dtype == np.float32
+    assert env.observation_space.contains(obs)
+    np.testing.assert_array_equal(obs, np.tile(wire.flatten_state(PongSim().state()), (5, 1)))
+    obs, rewards, terminated, truncated, infos = env.step(env.action_space.sample())
+    assert obs.shape == (5, 14) and rewards.shape == terminated.shape == truncated.shape == (5,)
+
+def test_matches_game_traces():
+    traces = [load_trace(name) for name in TRACES]
+    env = PongVectorEnv(len(traces), max_score=None)
+    obs, _ = env.reset()
+    stride = traces[0][0]['stride']
+    actions = np.stack([trace[1] for trace in traces]).astype(np.int64) + 1
+    for tick in range(actions.shape[1]):
+        obs, _, _, _, _ = env.step(actions[:, tick])
+        if (tick + 1) % stride == 0:
+            expected = [wire.flatten_state(states[(tick + 1) // stride]) for _, _, states in traces]
+            np.testing.assert_array_equal(obs, np.stack(expected), err_msg=f"diverged at tick {tick + 1}")
+
+def test_matches_pong_sim():
+    n = 8
+    rng = np.random.RandomState(0)
+    env = PongVectorEnv(n, max_score=None)
+    obs, _ = env.reset()
+    sims = [PongSim() for _ in range(n)]
+    for tick in range(3000):
+        # Mostly track the ball so rallies (and power-up pickups) happen, with random spells
+        track = np.where(obs[:, 1] < obs[:, 9], 2, 0)
+        actions = np.where((np.arange(n) * 7 + tick) // 40 % 5 == 0, rng.randint(0, 3, n), track)
+        obs, rewards, _, _, _ = env.step(actions)
+        for i, sim in enumerate(sims):
+            before = sim.state()['scores']
+            state = sim.step(int(actions[i]) - 1)
+            np.testing.assert_array_equal(obs[i], wire.flatten_state(state))
+            assert rewards[i] == (state['scores']['player'] - before['player']) - (state['scores']['bot'] - before['bot'])
+
+def test_seeds():
+    seeds = [7, 42, 7, 1000]
+    env = PongVectorEnv(4, max_score=None, seed=seeds)
+    obs, _ = env.reset()
+    sims = [PongSim(seed=seed) for seed in seeds]
+    np.testing.assert_array_equal(obs, np.stack([wire.flatten_state(sim.state()) for sim in sims]))
+    for tick in range(2000):
+        track = np.where(obs[:, 1] < obs[:, 9], 2, 0)
+        obs, _, _, _, _ = env.step(track)
+        expected = [wire.flatten_state(sim.step(int(a) - 1)) for sim, a in zip(sims, track)]
+        np.testing.assert_array_equal(obs, np.stack(expected), err_msg=f"diverged at tick {tick + 1}")
+
+    # reset(seed=...) reseeds only the games it resets
+    obs, _ = env.reset(seed=3, options={'reset_mask': [True, False, True, False]})
+    assert env.seeds.tolist() == [3, 42, 3, 1000]
+    sims[0] = PongSim(seed=3)
+    sims[2] = PongSim(seed=3)
+    for tick in range(600):
+        obs, _, _, _, _ = env.step([1, 1, 1, 1])
+        expected = [wire.flatten_state(sim.step(0)) for sim in sims]
+        np.testing.assert_array_equal(obs, np.stack(expected), err_msg=f"diverged at tick {tick + 1}")
+
+def test_slot_buffers_grow():
+    env = PongVectorEnv(2, max_score=None)
+    env.reset()
+    sim = PongSim()
+    for _ in range(6):
+        env._apply_effect(1, SPLIT_BALL)
+        sim._apply_effect(SPLIT_BALL)
+    for _ in range(5):
+        env._apply_effect(1, SLOW_MOTION_TYPE)
+        sim._apply_effect(SLOW_MOTION_TYPE)
+    assert env.ball_count.tolist() == [1, 7]
+    for _ in range(600):
+        obs, _, _, _, _ = env.step([1, 1])
+        state = sim.step(0)
+        np.testing.assert_array_equal(obs[1], wire.flatten_state(state))
+    assert env.ball_x.shape[1] >= 7 and env.effect_active.shape[1] >= 5
+
+@pytest.mark.parametrize('limits', [{'max_score': 1}, {'max_score': None, 'max_episode_steps': 50}])
+def test_autoreset(limits):
+    env = PongVectorEnv(3, **limits)
+    initial, _ = env.reset()
+    for _ in range(1000):
+        obs, rewards, terminated, truncated, _ = env.step([1, 0, 2])
+        if (terminated | truncated).any():
+            break
+    done = terminated | truncated
+    assert done.any()
+    if 'max_score' in limits and limits['max_score']:
+        assert np.all(np.maximum(obs[done, 12], obs[done, 13]) == 1)
+    # Finished games restart on the next step, ignoring its action
+    obs, rewards, terminated, truncated, _ = env.step([0, 0, 0])
+    np.testing.assert_array_equal(obs[done], initial[done])
+    assert not rewards[done].any() and not terminated[done].any() and not truncated[done].any()